@@ -75,14 +75,4 @@ _symbols = [CustomItem,
             beet]
 _constants = ["REMOVED"]
 
-__all__ = [obj.__name__ for obj in _symbols].extend(_constants)
-
-# ╭───────────────────────────────────────────────────────────────────────────────╮
-# │                                     Config                                    │ 
-# ╰───────────────────────────────────────────────────────────────────────────────╯
-
-import warnings as _warnings
-def warning(message, category, filename, lineno, file=None, line=None):
-    print(f"{filename}\n  BeetSmith: {message}")
-
-_warnings.showwarning = warning
\ No newline at end of file
+__all__ = [obj.__name__ for obj in _symbols].extend(_constants)
\ No newline at end of file
@@ -1,7 +1,8 @@
 import beet
-import warnings
 import inspect, functools
 from typing import Callable, cast, TypeVar
+from beetsmith.core import tracing
+from beetsmith.core.diagnostics import report
 
 REGISTERED_IMPLEMENTATIONS: set[tuple[str, beet.DataPack]] = set()
 "Live action value"
@@ -19,7 +20,7 @@ def watch_out_for_duplicates(func):
         datapack: beet.DataPack = bound.arguments.get("datapack")
 
         if (id, datapack) in REGISTERED_IMPLEMENTATIONS:
-            warnings.warn(f"Multiple custom items with the id '{id}' were implemented")
+            report("duplicate-item", f"Multiple custom items with the id '{id}' were implemented", item=id)
         else:
             REGISTERED_IMPLEMENTATIONS.add((id, datapack))
 
@@ -35,14 +36,89 @@ def behavior(fn: F | None = None, *, warn_for_incompatibility: list[str] | None
             if warn_for_incompatibility:
                 for incompat in warn_for_incompatibility:
                     if incompat in getattr(self, "_applied_behaviours", []):
-                        warnings.warn(
+                        report(
+                            "incompatible-behaviours",
                             f"The two applied behaviours '{inner_fn.__name__}' and '{incompat}' "
-                            "may be incompatible or cause unexpected behavior."
+                            "may be incompatible or cause unexpected behavior.",
+                            item=getattr(self, "id", None)
                         )
             self._applied_behaviours.append(inner_fn.__name__)
-            return inner_fn(self, *args, **kwargs)
+            try:
+                if tracing.ACTIVE_TRACER is None:
+                    return inner_fn(self, *args, **kwargs)
+                with tracing.ACTIVE_TRACER.span(inner_fn.__name__, "behavior", item=getattr(self, "id", None)):
+                    return inner_fn(self, *args, **kwargs)
+            finally:
+                if touch := getattr(self, "touch", None):
+                    touch() # Behaviours may mutate attributes in place
+        wrapper.incompatibilities = tuple(warn_for_incompatibility or ()) # Read by `library.batch` alongside `__wrapped__`
         return cast(F, wrapper)
 
     if fn is None:
         return decorator
     return decorator(fn)
+
+# ╭───────────────────────────────────────────────────────────────────────────────╮
+# │                                  Pack Formats                                 │ 
+# ╰───────────────────────────────────────────────────────────────────────────────╯
+
+ComponentEmitter = Callable[[str, object], "tuple[str, object] | None"]
+"Function receiving a component's name (without namespace) and value and returning the emitted pair or `None` to drop the component"
+
+COMPONENT_EMITTERS: dict[str, list[tuple[int, float, ComponentEmitter]]] = {}
+"Emitters by component name with the range of pack formats they apply to"
+
+def component_emitter(component: str, *, since: int | None = None, until: int | None = None):
+    "Registers an emitter for `component` that is used for datapacks with a pack format from `since` up to and including `until`."
+    def decorator(fn: ComponentEmitter) -> ComponentEmitter:
+        COMPONENT_EMITTERS.setdefault(component, []).append((since or 0, until if until is not None else float("inf"), fn))
+        return fn
+    return decorator
+
+def introduced(pack_format: int, *components: str) -> None:
+    "Registers that `components` are unknown to (and thus dropped for) pack formats before `pack_format`."
+    for component in components:
+        component_emitter(component, until=pack_format - 1)(lambda name, value: None)
+
+def renamed(pack_format: int, old: str, new: str) -> None:
+    "Registers that the component `new` was called `old` before `pack_format`."
+    component_emitter(new, until=pack_format - 1)(lambda name, value: (old, value))
+
+introduced(71,  "weapon", "blocks_attacks", "break_sound", "tooltip_display")                       # 1.21.5
+introduced(94,  "use_effects", "kinetic_weapon", "piercing_weapon", "swing_animation",
+                "minimum_attack_charge", "damage_type")                                             # 1.21.11
+
+def _emitter(name: str, pack_format: int) -> ComponentEmitter | None:
+    for since, until, emit in COMPONENT_EMITTERS.get(name, ()):
+        if since <= pack_format <= until:
+            return emit
+    return None
+
+def emit_components(components: dict[str, object], pack_format: int, /) -> dict[str, object]:
+    "Applies all emitters registered for `pack_format` to a dict of components like it is returned by `ItemComponents.asDict()`."
+    out = {}
+    for key, value in components.items():
+        prefix = "!" if key.startswith("!") else ""
+        name = key.removeprefix("!").removeprefix("minecraft:")
+        if (emit := _emitter(name, pack_format)) is None:
+            out[key] = value
+        elif (emitted := emit(name, value)) is not None:
+            name, value = emitted
+            out[f"{prefix}minecraft:{name}"] = value
+    return out
+
+def dropped_components(components: dict[str, object], pack_format: int, /) -> list[str]:
+    "Returns the components of a dict like it is returned by `ItemComponents.asDict()` that `emit_components()` drops for `pack_format`."
+    dropped = []
+    for key, value in components.items():
+        name = key.removeprefix("!").removeprefix("minecraft:")
+        if (emit := _emitter(name, pack_format)) is not None and emit(name, value) is None:
+            dropped.append(key.removeprefix("!"))
+    return dropped
+
+def pack_format_of(datapack: beet.DataPack, /) -> int | None:
+    "Returns the major pack format a datapack targets (its oldest supported one), or `None` if it doesn't specify one."
+    pack_format = datapack.pack_format if datapack.pack_format is not None else datapack.min_format
+    if isinstance(pack_format, (tuple, list)):
+        return pack_format[0]
+    return pack_format
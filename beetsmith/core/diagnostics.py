@@ -0,0 +1,116 @@
+"""Submodule for collecting diagnostics of a build instead of warning about every single item.
+
+Diagnostics with the same code and message are only stored once, with the amount of occurrences, the amount of distinct affected items
+and the ids of the first ones.<br>
+While no collector is active, `report()` falls back to `warnings.warn()`:
+```
+collector = DiagnosticCollector()
+with collector.active():
+    report("pack-format", "The datapack's pack format 94 is not supported", item="custom:sword")
+print(collector.summary())  # -> 'warning[pack-format]: The datapack's pack format 94 is not supported (1x: custom:sword)'
+collector.export("./diagnostics.json")
+```
+"""
+
+from __future__ import annotations
+import json
+import pathlib
+import warnings
+import contextlib
+from dataclasses import dataclass, field
+from typing import Literal
+
+Severity = Literal["warning", "error"]
+
+ACTIVE_COLLECTOR: "DiagnosticCollector | None" = None
+"Live action value"
+
+MAX_ITEMS = 5
+"Amount of item ids kept per diagnostic"
+
+@dataclass
+class Diagnostic:
+    "A deduplicated diagnostic with the amount of its occurrences."
+    code:       str
+    message:    str
+    severity:   Severity                = "warning"
+    count:      int                     = 0
+    "Amount of occurrences, which may be several per item"
+    items:      list[str]               = field(default_factory=list)
+    "Ids of the first `MAX_ITEMS` affected items"
+    affected:   int                     = 0
+    "Amount of distinct affected items"
+    _ids:       set[str]                = field(default_factory=set, repr=False, compare=False)
+    "Ids of all affected items, so items reported again aren't counted twice, also when merging diagnostics of workers"
+
+    def __str__(self) -> str:
+        affected = f": {', '.join(self.items)}{', ...' if self.affected > len(self.items) else ''}" if self.items else ""
+        return f"{self.severity}[{self.code}]: {self.message} ({self.count}x{affected})"
+
+    def add(self, item: str, /) -> None:
+        "Records an affected item, if it wasn't recorded before."
+        if item in self._ids:
+            return
+        self._ids.add(item)
+        self.affected += 1
+        if len(self.items) < MAX_ITEMS:
+            self.items.append(item)
+
+    def asDict(self) -> dict:
+        return {"code": self.code, "message": self.message, "severity": self.severity, "count": self.count, "items": self.items, "affected": self.affected}
+
+class DiagnosticCollector:
+    "Class collecting the diagnostics of a build."
+
+    def __init__(self):
+        self.diagnostics: dict[tuple[str, str], Diagnostic] = {}
+
+    def __len__(self) -> int:
+        return len(self.diagnostics)
+
+    @contextlib.contextmanager
+    def active(self):
+        "Context manager making this the collector `report()` reports to."
+        global ACTIVE_COLLECTOR
+        previous, ACTIVE_COLLECTOR = ACTIVE_COLLECTOR, self
+        try:
+            yield self
+        finally:
+            ACTIVE_COLLECTOR = previous
+
+    def report(self, code: str, message: str, /, item: str | None = None, severity: Severity = "warning") -> None:
+        diagnostic = self.diagnostics.get((code, message))
+        if diagnostic is None:
+            diagnostic = self.diagnostics[(code, message)] = Diagnostic(code, message, severity)
+        diagnostic.count += 1
+        if item is not None:
+            diagnostic.add(item)
+
+    def extend(self, diagnostics: list[Diagnostic], /) -> None:
+        "Adds diagnostics collected by another collector, e.g. one of a worker process."
+        for other in diagnostics:
+            diagnostic = self.diagnostics.get((other.code, other.message))
+            if diagnostic is None:
+                diagnostic = self.diagnostics[(other.code, other.message)] = Diagnostic(other.code, other.message, other.severity)
+            diagnostic.count += other.count
+            for item in [*other.items, *sorted(other._ids.difference(other.items))]: # The first items stay first
+                diagnostic.add(item)
+
+    def summary(self) -> str:
+        "Returns a line per diagnostic, errors first."
+        return "\n".join(str(diagnostic) for diagnostic in sorted(self.diagnostics.values(), key=lambda diagnostic: diagnostic.severity != "error"))
+
+    def asDict(self) -> dict:
+        return {"diagnostics": [diagnostic.asDict() for diagnostic in self.diagnostics.values()]}
+
+    def export(self, path: str | pathlib.Path, /) -> None:
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.asDict(), indent=2), "utf-8")
+
+def report(code: str, message: str, /, item: str | None = None, severity: Severity = "warning") -> None:
+    "Reports a diagnostic to the active collector or warns about it if there is none."
+    if ACTIVE_COLLECTOR is not None:
+        ACTIVE_COLLECTOR.report(code, message, item=item, severity=severity)
+    else:
+        warnings.warn(message, category=UserWarning, stacklevel=2)
@@ -0,0 +1,117 @@
+"""Submodule for sharing identical component values between items.
+
+Values are interned as immutable, hashable equivalents of dicts and lists, which still serialize like them.<br>
+Interning is hash-consing: containers are interned after their contents, so identical values are stored once
+and equal interned values are the same object, which can be compared with `is`.
+"""
+
+from typing import Any
+
+class FrozenDict(dict):
+    "Immutable dict with a cached hash. It is still a `dict`, so it is serialized like one."
+    __slots__ = ("_hash",)
+
+    def __hash__(self) -> int:
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(frozenset(self.items()))
+            return self._hash
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(f"'{type(self).__name__}' object is immutable. Replace the value instead of mutating it.")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _immutable
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+    def __repr__(self) -> str:
+        return f"FrozenDict({dict.__repr__(self)})"
+
+class FrozenList(tuple):
+    "Immutable list. It is a `tuple`, so it is serialized like a list."
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return f"FrozenList({list(self)!r})"
+
+def freeze(value: Any, /) -> Any:
+    "Returns an immutable, hashable equivalent of a value made of dicts, lists and scalars."
+    if isinstance(value, dict):
+        return value if isinstance(value, FrozenDict) else FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+def thaw(value: Any, /) -> Any:
+    "Returns a mutable copy of a value made of dicts, lists and scalars, which may be frozen."
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, FrozenList)):
+        return [thaw(item) for item in value]
+    return value
+
+class ComponentInterner:
+    """Class storing each distinct component value of a build once.
+
+    Scalars are told apart by their type, so `1`, `1.0` and `True` don't get merged, and dicts by their key order,
+    so interning never changes serialized output.
+
+    Example
+    ---------
+    ```
+    interner = ComponentInterner()
+    a = interner.intern({"rules": [], "can_destroy_blocks_in_creative": False})
+    b = interner.intern({"rules": [], "can_destroy_blocks_in_creative": False})
+    a is b  # -> True
+    ```
+    """
+
+    def __init__(self):
+        self._values: dict[tuple, Any] = {}
+        self._canonical: dict[int, Any] = {}
+        "Interned values by their `id()`, so interning an interned value is a lookup"
+        self.requests = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def intern(self, value: Any, /) -> Any:
+        "Returns the shared, immutable equivalent of `value`."
+        if self._canonical.get(id(value)) is value:
+            self.requests += 1
+            self.hits += 1
+            return value
+
+        if isinstance(value, dict):
+            items = tuple((key, self.intern(item)) for key, item in value.items())
+            key = (FrozenDict, tuple((name, id(item)) for name, item in items))
+            create = lambda: FrozenDict(items)
+        elif isinstance(value, (list, tuple)):
+            items = tuple(self.intern(item) for item in value)
+            key = (FrozenList, tuple(id(item) for item in items))
+            create = lambda: FrozenList(items)
+        else:
+            try:
+                key = (type(value), value)
+                hash(key)
+            except TypeError:
+                return value
+            create = lambda: value
+
+        self.requests += 1
+        interned = self._values.get(key)
+        if interned is None:
+            interned = self._values[key] = create()
+            self._canonical[id(interned)] = interned
+        else:
+            self.hits += 1
+        return interned
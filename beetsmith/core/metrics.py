@@ -0,0 +1,154 @@
+"Submodule for collecting counters and latency histograms of a build"
+
+import os
+import json
+import time
+import bisect
+import pathlib
+import contextlib
+from typing import Iterator
+
+Labels = tuple[tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"Upper bounds of the histogram buckets in seconds"
+
+class Histogram:
+    "Cumulative latency histogram with fixed buckets."
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> Iterator[tuple[float, int]]:
+        "Yields each bucket's upper bound and the amount of observations less or equal to it"
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+
+class BuildMetrics:
+    """Class collecting counters, gauges and latency histograms of a BeetSmith build.
+
+    All metric names get the prefix `beetsmith_`. Labels are passed as keyword arguments.
+
+    Example
+    ---------
+    ```
+    metrics = BuildMetrics()
+    metrics.count("items_total", namespace="custom")
+    with metrics.timer("implement_seconds"):
+        ...
+    metrics.export_prometheus("./metrics/beetsmith.prom")
+    ```
+    """
+
+    prefix = "beetsmith_"
+
+    def __init__(self):
+        self.counters: dict[str, dict[Labels, float]] = {}
+        self.gauges: dict[str, dict[Labels, float]] = {}
+        self.histograms: dict[str, dict[Labels, Histogram]] = {}
+
+    def count(self, name: str, amount: float = 1, /, **labels: str) -> None:
+        "Increases a counter."
+        series = self.counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0) + amount
+
+    def gauge(self, name: str, value: float, /, **labels: str) -> None:
+        "Sets a gauge."
+        self.gauges.setdefault(name, {})[tuple(sorted(labels.items()))] = value
+
+    def observe(self, name: str, seconds: float, /, **labels: str) -> None:
+        "Adds an observation to a histogram."
+        series = self.histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        if (histogram := series.get(key)) is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, name: str, /, **labels: str):
+        "Context manager adding the time spent inside it to a histogram."
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def asDict(self) -> dict:
+        "Returns all metrics in a JSON-compatible format."
+        return {
+            "counters": {
+                self.prefix + name: [{"labels": dict(labels), "value": value} for labels, value in series.items()]
+                for name, series in self.counters.items()
+            },
+            "gauges": {
+                self.prefix + name: [{"labels": dict(labels), "value": value} for labels, value in series.items()]
+                for name, series in self.gauges.items()
+            },
+            "histograms": {
+                self.prefix + name: [
+                    {
+                        "labels": dict(labels),
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "buckets": {str(bound): count for bound, count in histogram.cumulative()}
+                    }
+                    for labels, histogram in series.items()
+                ]
+                for name, series in self.histograms.items()
+            }
+        }
+
+    def asPrometheus(self) -> str:
+        "Returns all metrics in the Prometheus text exposition format."
+        lines = []
+        for name, series in sorted(self.counters.items()):
+            lines.append(f"# TYPE {self.prefix}{name} counter")
+            for labels, value in series.items():
+                lines.append(f"{self.prefix}{name}{_labels(labels)} {value}")
+        for name, series in sorted(self.gauges.items()):
+            lines.append(f"# TYPE {self.prefix}{name} gauge")
+            for labels, value in series.items():
+                lines.append(f"{self.prefix}{name}{_labels(labels)} {value}")
+        for name, series in sorted(self.histograms.items()):
+            lines.append(f"# TYPE {self.prefix}{name} histogram")
+            for labels, histogram in series.items():
+                for bound, count in histogram.cumulative():
+                    lines.append(f"{self.prefix}{name}_bucket{_labels(labels + (('le', str(bound)),))} {count}")
+                lines.append(f"{self.prefix}{name}_bucket{_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                lines.append(f"{self.prefix}{name}_sum{_labels(labels)} {histogram.sum}")
+                lines.append(f"{self.prefix}{name}_count{_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def export_json(self, path: str | pathlib.Path, /) -> None:
+        _write_atomically(path, json.dumps(self.asDict(), indent=2))
+
+    def export_prometheus(self, path: str | pathlib.Path, /) -> None:
+        "Writes the metrics to a file that can be picked up by the textfile collector of the Prometheus node exporter."
+        _write_atomically(path, self.asPrometheus())
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+def _write_atomically(path: str | pathlib.Path, content: str) -> None:
+    "Collectors must never read half written files"
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + ".tmp")
+    temporary.write_text(content, "utf-8")
+    os.replace(temporary, path)
@@ -11,8 +11,10 @@
 #  - raise on multiple consecutive dots
 
 import re
+import functools
 
 regex = r"^[a-z0-9](?:[a-z0-9_-]*[a-z0-9])?:[a-z0-9](?:[a-z0-9._-]*[a-z0-9])?(?:\/[a-z0-9](?:[a-z0-9._-]*[a-z0-9])?)*$"
+_pattern = re.compile(regex)
 
 class ResourceLocationChecker:
     """Class for configurating a functor that can be used to check if a string is a valid resource location.
@@ -25,19 +27,25 @@ class ResourceLocationChecker:
     componentQueryValidator("stone")             # -> minecraft:stone
     componentQueryValidator("#minecraft:stones") # -> #minecraft:stones
     ```
+
+    The last `cache_size` valid strings are cached, so validating the same resource location again is a single lookup.
     """
 
     def __init__(self, *,
                  allow_tag: bool = False,
                  allow_negation: bool = False,
-                 allow_paths: bool = True
+                 allow_paths: bool = True,
+                 cache_size: int = 4096
                  ):
         self.allow_tag = allow_tag
         self.allow_negation = allow_negation
         self.allow_paths = allow_paths
+        self._cached = functools.lru_cache(maxsize=cache_size)(self._validate)
 
     def validate(self, string: str) -> str:
-        
+        return self._cached(string)
+
+    def _validate(self, string: str) -> str:
         # Building
         builtstring = string
         if not ":" in builtstring:
@@ -54,7 +62,7 @@ class ResourceLocationChecker:
         if not self.allow_paths and "/" in teststring:
             raise ValueError(f"'{string}' resource loactions cannot contain paths")
 
-        if re.match(regex, teststring) is None:
+        if _pattern.match(teststring) is None:
             raise ValueError(f"'{string}' does not match the pattern of a resource loactions")
         
         return builtstring
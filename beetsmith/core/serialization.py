@@ -0,0 +1,34 @@
+"""Submodule for compact binary serialization of custom items, e.g. for worker processes and persistent caches
+
+```
+data = dumps(item)  # -> b"BSMI\\x01..."
+loads(data)         # -> CustomItem(id='custom:sword', ...)
+```
+
+Items and component stacks are pickled as compact tuples of their state without any caches.
+Generated files are stored as specs and `REMOVED` is restored as the same constant.<br>
+Only load data you wrote yourself, since unpickling can execute arbitrary code.
+"""
+
+import pickle
+from typing import Any
+
+MAGIC = b"BSMI"
+
+FORMAT_VERSION = 1
+"Version of the layout of pickled states. Data of other versions can't be loaded."
+
+def check_version(version: int, /) -> None:
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Cannot load data of serialization format {version}, expected {FORMAT_VERSION}")
+
+def dumps(value: Any, /) -> bytes:
+    "Serializes a custom item, a component stack or any picklable structure of them."
+    return MAGIC + bytes([FORMAT_VERSION]) + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+def loads(data: bytes, /) -> Any:
+    "Deserializes data written by `dumps()`. Raises a `ValueError` if it was written in another format."
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("The data wasn't written by beetsmith.core.serialization")
+    check_version(data[len(MAGIC)])
+    return pickle.loads(data[len(MAGIC) + 1:])
@@ -0,0 +1,69 @@
+"""Submodule for serializing component values to SNBT, like it's used in the item stack syntax of commands
+
+```
+dumps({"rules": [], "can_destroy_blocks_in_creative": False})  # -> '{rules:[],can_destroy_blocks_in_creative:false}'
+```
+
+Strings are always quoted, so they are never read as numbers or booleans. An encoder only serializes each interned value once.
+"""
+
+from __future__ import annotations
+import re
+import math
+from typing import Any
+from beetsmith.core.interning import FrozenDict, FrozenList
+
+_unquoted_key = re.compile(r"[A-Za-z0-9._+\-]+")
+_escapes = str.maketrans({"\\": "\\\\", "\n": "\\n", "\r": "\\r", "\t": "\\t"})
+
+INT_MIN, INT_MAX = -2 ** 31, 2 ** 31 - 1
+
+def quote(text: str, /) -> str:
+    "Returns a quoted SNBT string, using single quotes if the text contains double quotes but no single quotes."
+    escaped = text.translate(_escapes)
+    if '"' in text and "'" not in text:
+        return f"'{escaped}'"
+    return '"' + escaped.replace('"', '\\"') + '"'
+
+def key(name: str, /) -> str:
+    "Returns a compound key, only quoted if needed."
+    return name if _unquoted_key.fullmatch(name) else quote(name)
+
+class SNBTEncoder:
+    """Class serializing values made of dicts, lists and scalars to SNBT.
+
+    Serialized interned values (see `core.interning`) are cached, so values shared by many items are only serialized once.
+    """
+
+    def __init__(self):
+        self._cache: dict[int, tuple[Any, str]] = {}
+
+    def encode(self, value: Any, /) -> str:
+        frozen = isinstance(value, (FrozenDict, FrozenList))
+        if frozen and (cached := self._cache.get(id(value))) is not None and cached[0] is value:
+            return cached[1]
+
+        if isinstance(value, dict):
+            out = "{" + ",".join(f"{key(str(name))}:{self.encode(item)}" for name, item in value.items()) + "}"
+        elif isinstance(value, (list, tuple)):
+            out = "[" + ",".join(self.encode(item) for item in value) + "]"
+        elif isinstance(value, bool):
+            out = "true" if value else "false"
+        elif isinstance(value, int):
+            out = str(value) if INT_MIN <= value <= INT_MAX else f"{value}L"
+        elif isinstance(value, float):
+            if not math.isfinite(value):
+                raise ValueError(f"{value} cannot be represented in SNBT")
+            out = repr(value) + "d"
+        elif isinstance(value, str):
+            out = quote(value)
+        else:
+            raise TypeError(f"Object of type '{type(value).__name__}' cannot be serialized to SNBT")
+
+        if frozen:
+            self._cache[id(value)] = (value, out) # Keeps the value alive, so its id isn't reused
+        return out
+
+def dumps(value: Any, /, encoder: SNBTEncoder | None = None) -> str:
+    "Serializes a value made of dicts, lists and scalars to SNBT. Pass an `encoder` to share its cache between calls."
+    return (encoder or SNBTEncoder()).encode(value)
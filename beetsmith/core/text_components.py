@@ -63,15 +63,8 @@ def get_plain_text(textcomponent: str | dict | list) -> str:
     "Returns a unformatted (and if the case multiline) string of a text component"
     textcomponent: list[list[dict]] = normalize(textcomponent)
 
-    result = ""
-    for line in textcomponent:
-        for segment in line:
-            for key, value in segment.items():
-                if key == "text":
-                    result += value
-                elif key in ["translate", "keybind"]:
-                    result += f"<{value}>"
-        if len(textcomponent) > 1:
-            result += "\n"
-    
-    return result
\ No newline at end of file
+    lines = [
+        "".join(value if key == "text" else f"<{value}>" for segment in line for key, value in segment.items() if key in ("text", "translate", "keybind"))
+        for line in textcomponent
+    ]
+    return "".join(line + "\n" for line in lines) if len(lines) > 1 else "".join(lines)
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""Submodule for recording spans of a build in the Chrome trace event format.
+
+Recorded traces can be opened with `chrome://tracing` or [Perfetto](https://ui.perfetto.dev).
+
+Spans are only recorded while a tracer is active, otherwise `span()` does nothing:
+```
+tracer = Tracer()
+with tracer.active():
+    with span("implement", item="custom:sword"):
+        ...
+tracer.export("./trace.json")
+```
+"""
+
+import os
+import json
+import time
+import pathlib
+import threading
+import contextlib
+from typing import Any
+
+ACTIVE_TRACER: "Tracer | None" = None
+"Live action value"
+
+class Tracer:
+    "Class collecting complete events (`ph: X`) of the current process."
+
+    def __init__(self):
+        self.events: list[dict[str, Any]] = []
+
+    @contextlib.contextmanager
+    def active(self):
+        "Context manager making this the tracer `span()` records to."
+        global ACTIVE_TRACER
+        previous, ACTIVE_TRACER = ACTIVE_TRACER, self
+        try:
+            yield self
+        finally:
+            ACTIVE_TRACER = previous
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str = "beetsmith", /, **args: Any):
+        "Context manager recording the time spent inside it. `args` are attached to the event (e.g. item ids)."
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start / 1000,
+                "dur": (time.perf_counter_ns() - start) / 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": args
+            })
+
+    def extend(self, events: list[dict[str, Any]], /) -> None:
+        """Adds events recorded by another tracer, e.g. one of a worker process.
+
+        Timestamps stay comparable between processes since they are taken from the system's monotonic clock.
+        """
+        self.events.extend(events)
+
+    def asDict(self) -> dict[str, Any]:
+        "Returns the recorded events in the JSON object format of Chrome traces."
+        names = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "beetsmith" if pid == os.getpid() else f"beetsmith worker {pid}"}}
+            for pid in sorted({event["pid"] for event in self.events})
+        ]
+        return {"traceEvents": names + self.events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str | pathlib.Path, /) -> None:
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.asDict()), "utf-8")
+
+_no_span = contextlib.nullcontext()
+
+def span(name: str, category: str = "beetsmith", /, **args: Any):
+    "Context manager recording a span to the active tracer. Does nothing if no tracer is active."
+    if ACTIVE_TRACER is None:
+        return _no_span
+    return ACTIVE_TRACER.span(name, category, **args)
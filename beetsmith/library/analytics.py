@@ -0,0 +1,188 @@
+"""Submodule for balancing the stats of a whole catalog at once, backed by NumPy arrays.
+
+NumPy is an optional dependency (`pip install beetsmith[analytics]`) and is only imported once stats are built.
+```
+stats = CatalogStats.fromCatalog(catalog)
+stats.dps()                              # -> array([11.2, nan, 9.6, ...])
+stats.ids[stats.outliers(stats.dps())]   # -> array(['custom:overpowered_sword'])
+stats.report()                           # -> {"items": 20000, "weapons": 8500, "dps": {"min": 4.0, "median": 9.6, ...}, ...}
+```
+
+Missing stats are `nan`, so items without e.g. a weapon drop out of all weapon statistics.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from beetsmith.library.catalog import ItemCatalog, PLAYER_BASE_ATTRIBUTES
+
+if TYPE_CHECKING:
+    import numpy as np
+
+ARMOR_SLOTS = ("head", "chest", "legs", "feet")
+
+ARMOR_DURABILITY_MULTIPLIERS = {"head": 11, "chest": 16, "legs": 15, "feet": 13}
+"Vanilla armor durability per slot is the material's base durability times these multipliers"
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Catalog analytics require NumPy. Install it with 'pip install beetsmith[analytics]'") from None
+    return numpy
+
+@dataclass
+class CatalogStats:
+    "Stats of all items of a catalog as columns of equal length."
+    ids:                np.ndarray
+    slot:               np.ndarray
+    "Equipment slot, `''` if the item isn't equippable"
+    attack_damage:      np.ndarray
+    attack_speed:       np.ndarray
+    durability:         np.ndarray
+    damage_per_attack:  np.ndarray
+    armor:              np.ndarray
+    toughness:          np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def fromCatalog(catalog: ItemCatalog, /) -> CatalogStats:
+        np = _numpy()
+        entries = sorted(catalog, key=lambda entry: entry.id)
+
+        def column(name: str, default: float = np.nan) -> np.ndarray:
+            return np.fromiter((entry.values.get(name, default) for entry in entries), dtype=np.float64, count=len(entries))
+
+        weapons = np.fromiter(("weapon" in entry.components for entry in entries), dtype=bool, count=len(entries))
+        damage_per_attack = column("damage_per_attack")
+        damage_per_attack[weapons & np.isnan(damage_per_attack)] = 1 # Default of the weapon component
+
+        return CatalogStats(
+            ids=np.array([entry.id for entry in entries], dtype=str),
+            slot=np.array([entry.values.get("slot", "") for entry in entries], dtype=str),
+            attack_damage=column("attack_damage"),
+            attack_speed=column("attack_speed"),
+            durability=column("durability"),
+            damage_per_attack=damage_per_attack,
+            armor=column("attribute:minecraft:armor"),
+            toughness=column("attribute:minecraft:armor_toughness")
+        )
+
+    # ╭────────────────────────────────────────────────────────────╮
+    # │                           Weapons                          │
+    # ╰────────────────────────────────────────────────────────────╯
+
+    def dps(self) -> np.ndarray:
+        "Damage per second of fully charged attacks. Items without attack speed modifier attack at the player's base speed."
+        np = _numpy()
+        return self.attack_damage * np.where(np.isnan(self.attack_speed), PLAYER_BASE_ATTRIBUTES["minecraft:attack_speed"], self.attack_speed)
+
+    def hits_to_break(self) -> np.ndarray:
+        "Amount of attacks until the item breaks, `inf` for items that don't lose durability on attacks."
+        np = _numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.damage_per_attack == 0, np.inf, self.durability / self.damage_per_attack)
+
+    def time_to_break(self) -> np.ndarray:
+        "Seconds of attacking with fully charged attacks until the item breaks."
+        np = _numpy()
+        return self.hits_to_break() / np.where(np.isnan(self.attack_speed), PLAYER_BASE_ATTRIBUTES["minecraft:attack_speed"], self.attack_speed)
+
+    # ╭────────────────────────────────────────────────────────────╮
+    # │                            Armor                           │
+    # ╰────────────────────────────────────────────────────────────╯
+
+    def armor_by_slot(self) -> dict[str, dict[str, float]]:
+        "Returns the count and the mean armor, toughness and durability of the items equippable in each armor slot."
+        np = _numpy()
+        result = {}
+        for slot in ARMOR_SLOTS:
+            mask = self.slot == slot
+            if not mask.any():
+                continue
+            result[slot] = {
+                "items": int(mask.sum()),
+                "armor": _nanmean(self.armor[mask]),
+                "toughness": _nanmean(self.toughness[mask]),
+                "durability": _nanmean(self.durability[mask])
+            }
+        return result
+
+    def armor_base_durability(self) -> np.ndarray:
+        """Durability of armor divided by the vanilla multiplier of its slot, `nan` for other items.
+
+        Pieces of one armor set have equal base durabilities if they are scaled like vanilla armor.
+        """
+        np = _numpy()
+        multipliers = np.zeros(len(self))
+        for slot, multiplier in ARMOR_DURABILITY_MULTIPLIERS.items():
+            multipliers[self.slot == slot] = multiplier
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(multipliers > 0, self.durability / multipliers, np.nan)
+
+    # ╭────────────────────────────────────────────────────────────╮
+    # │                          Balancing                         │
+    # ╰────────────────────────────────────────────────────────────╯
+
+    def tiers(self, values: np.ndarray, /, tiers: int = 5) -> tuple[np.ndarray, np.ndarray]:
+        """Splits `values` into `tiers` tiers of equal size. Returns the tier of every item (`-1` for `nan`) and the edges between the tiers.
+
+        The edges form the tier curve of the value, e.g. to place new items into an existing progression.
+        """
+        np = _numpy()
+        known = ~np.isnan(values)
+        if not known.any():
+            return np.full(len(values), -1), np.array([])
+        edges = np.quantile(values[known], np.linspace(0, 1, tiers + 1)[1:-1])
+        return np.where(known, np.searchsorted(edges, values, side="right"), -1), edges
+
+    def outliers(self, values: np.ndarray, /, threshold: float = 3.5, by: np.ndarray | None = None) -> np.ndarray:
+        """Returns a mask of the items whose value deviates more than `threshold` from the median, in median absolute deviations.
+
+        If `by` is given (e.g. `stats.slot`), items are only compared to items with the same value in it.
+        """
+        np = _numpy()
+        flagged = np.zeros(len(values), dtype=bool)
+        groups = [np.ones(len(values), dtype=bool)] if by is None else [by == group for group in np.unique(by)]
+        for group in groups:
+            group &= ~np.isnan(values)
+            if group.sum() < 3:
+                continue
+            median = np.median(values[group])
+            deviation = np.median(np.abs(values[group] - median))
+            if deviation == 0:
+                flagged[group] = values[group] != median
+                continue
+            flagged[group] = 0.6745 * np.abs(values[group] - median) / deviation > threshold # Modified z-score
+        return flagged
+
+    def report(self, threshold: float = 3.5) -> dict:
+        "Returns a summary of the weapon and armor stats with the ids of outliers."
+        np = _numpy()
+        dps, base = self.dps(), self.armor_base_durability()
+        return {
+            "items": len(self),
+            "weapons": int((~np.isnan(self.attack_damage)).sum()),
+            "dps": _describe(dps),
+            "time_to_break": _describe(self.time_to_break()),
+            "armor": self.armor_by_slot(),
+            "outliers": {
+                "dps": self.ids[self.outliers(dps, threshold)].tolist(),
+                "armor": self.ids[self.outliers(self.armor, threshold, by=self.slot)].tolist(),
+                "armor_durability": self.ids[self.outliers(base, threshold)].tolist()
+            }
+        }
+
+def _nanmean(values: np.ndarray) -> float | None:
+    np = _numpy()
+    return float(np.nanmean(values)) if (~np.isnan(values)).any() else None
+
+def _describe(values: np.ndarray) -> dict[str, float] | None:
+    np = _numpy()
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return None
+    low, median, high = np.percentile(values, [0, 50, 100])
+    return {"min": float(low), "median": float(median), "max": float(high), "mean": float(values.mean())}
@@ -0,0 +1,119 @@
+"""Bulk construction of custom items from records, e.g. from rows of a spreadsheet or a database.
+
+```
+records = [
+    ItemRecord("custom:sword", "Sword", "iron_sword", behaviours=[("weapon", {"attack_damage": 7, "attack_speed": 1.6, "can_sweep": True})]),
+    ItemRecord.fromDict({"id": "custom:apple", "name": "Apple", "model": "apple", "behavior": [{"rarity": {"rarity": "rare"}}]})
+]
+items = build_items(records)  # -> [CustomItem(id='custom:sword', ...), CustomItem(id='custom:apple', ...)]
+```
+
+Ids, models, behaviour names and behaviour arguments are validated once per distinct value for the whole batch,
+and items are constructed without validating their id and model again.
+Behaviours are then called without their `@behavior` wrapper and incompatibilities are looked up in a bitset matrix,
+so items are built a lot faster than by calling every behaviour on its own. The built items are the same.
+"""
+
+from __future__ import annotations
+import inspect
+from typing import Any, Callable, Iterable, Mapping, NamedTuple, Sequence
+from beetsmith.core.diagnostics import report
+from beetsmith.core.resourcelocations import ensureNoSpecialRL
+from beetsmith.core.tracing import span
+from beetsmith.library.item import CustomItem, _prevalidated_item
+
+class ItemRecord(NamedTuple):
+    "Description of a custom item: its constructor arguments and the behaviours to apply in order."
+    id:         str
+    name:       str | dict | list
+    model:      str
+    texture:    str | None                          = None
+    behaviours: Sequence[tuple[str, Mapping[str, Any]]] = ()
+
+    @staticmethod
+    def fromDict(dictionary: dict, /) -> ItemRecord:
+        "Creates a record from a dict shaped like a BeetSmith definition, with behaviours under `behavior`."
+        return ItemRecord(
+            dictionary["id"],
+            dictionary["name"],
+            dictionary["model"],
+            dictionary.get("texture"),
+            [next(iter(behaviour.items())) for behaviour in dictionary.get("behavior", [])]
+        )
+
+class Behaviour(NamedTuple):
+    "Unwrapped behaviour of `CustomItem` with what's needed to validate calls of it."
+    bit:            int
+    function:       Callable
+    parameters:     frozenset[str]
+    required:       frozenset[str]
+    incompatible:   int
+    "Bits of the behaviours this one warns about if they were applied before"
+
+def _behaviours() -> dict[str, Behaviour]:
+    wrapped = {name: method for name, method in vars(CustomItem).items() if hasattr(method, "__wrapped__") and hasattr(method, "incompatibilities")}
+    bits = {name: bit for bit, name in enumerate(wrapped)}
+    behaviours = {}
+    for name, method in wrapped.items():
+        parameters = list(inspect.signature(method.__wrapped__).parameters.values())[1:]
+        behaviours[name] = Behaviour(
+            bits[name],
+            method.__wrapped__,
+            frozenset(parameter.name for parameter in parameters),
+            frozenset(parameter.name for parameter in parameters if parameter.default is inspect.Parameter.empty),
+            sum(1 << bits[other] for other in method.incompatibilities if other in bits)
+        )
+    return behaviours
+
+BEHAVIOURS = _behaviours()
+"Behaviours of `CustomItem` by name"
+
+_BEHAVIOUR_NAMES = {behaviour.bit: name for name, behaviour in BEHAVIOURS.items()}
+
+def _validate(records: list[ItemRecord]) -> dict[str, str]:
+    "Validates the columns of all records, checking every distinct value once. Returns the validated ids and models by their value in the records."
+    locations = {location: ensureNoSpecialRL(location) for location in {record.id for record in records} | {record.model for record in records}}
+
+    calls = {(name, frozenset(arguments)) for record in records for name, arguments in record.behaviours}
+    for name, arguments in calls:
+        if (behaviour := BEHAVIOURS.get(name)) is None:
+            raise SyntaxError(f"Unknown behavior '{name}' for CustomItem")
+        if unexpected := sorted(arguments - behaviour.parameters):
+            raise SyntaxError(f"Parameter '{unexpected[0]}' for '{name}' was unexpected")
+        if missing := sorted(behaviour.required - arguments):
+            raise SyntaxError(f"Behaviour '{name}' is missing parameter '{missing[0]}'")
+    return locations
+
+def build_items(records: Iterable[ItemRecord], /) -> list[CustomItem]:
+    """Builds a custom item per record.
+
+    Exceptions raised while building an item get a note with the item's id.
+    """
+    records = list(records)
+    with span("batch", items=len(records)):
+        locations = _validate(records)
+
+        items = []
+        for record in records:
+            try:
+                item = _prevalidated_item(locations[record.id], record.name, locations[record.model], record.texture)
+                applied = 0
+                for name, arguments in record.behaviours:
+                    behaviour = BEHAVIOURS[name]
+                    if conflicts := applied & behaviour.incompatible:
+                        for bit, other in _BEHAVIOUR_NAMES.items():
+                            if conflicts >> bit & 1:
+                                report(
+                                    "incompatible-behaviours",
+                                    f"The two applied behaviours '{name}' and '{other}' may be incompatible or cause unexpected behavior.",
+                                    item=record.id
+                                )
+                    applied |= 1 << behaviour.bit
+                    item._applied_behaviours.append(name)
+                    behaviour.function(item, **arguments)
+                item.touch() # Behaviours may mutate attributes in place
+            except Exception as e:
+                e.add_note(f"While building '{record.id}'")
+                raise
+            items.append(item)
+        return items
@@ -0,0 +1,265 @@
+"""Submodule for indexing implemented custom items, so questions about a build can be answered without scripting over JSON
+
+```
+catalog = ItemCatalog.fromItems(items)
+catalog.query(behaviours=["weapon"], attack_damage=lambda damage: damage > 10)
+catalog.query(cooldown_group="custom:spells")
+catalog.export("./build/beetsmith_catalog.json")
+```
+"""
+
+from __future__ import annotations
+import json
+import pathlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+from beetsmith.library.item import CustomItem
+
+MANIFEST_VERSION = 1
+
+# ╭───────────────────────────────────────────────────────────────────────────────╮
+# │                                 Indexed Values                                │
+# ╰───────────────────────────────────────────────────────────────────────────────╯
+
+INDEXED_VALUES: dict[str, Callable[[dict[str, Any]], Any]] = {}
+"Functions deriving a queryable value from an item's components by the value's name. Values must be hashable, `None` means the item has no such value."
+
+def indexed_value(name: str, /):
+    "Decorator registering a function as deriving the value `name` for the catalog's index."
+    def decorator(fn: Callable[[dict[str, Any]], Any]):
+        INDEXED_VALUES[name] = fn
+        return fn
+    return decorator
+
+def _component_value(component: str, key: str | None = None) -> Callable[[dict[str, Any]], Any]:
+    def derive(components: dict[str, Any]):
+        value = components.get(component)
+        if isinstance(value, dict) and key is not None:
+            return value.get(key)
+        return value if key is None else None
+    return derive
+
+PLAYER_BASE_ATTRIBUTES = {"minecraft:attack_damage": 1.0, "minecraft:attack_speed": 4.0}
+"Base values of the player's attributes, which the modifiers of weapons are relative to"
+
+def attribute_sums(components: dict[str, Any], /, slot: str | None = None) -> dict[str, float]:
+    "Returns the summed `add_value` modifiers per attribute, optionally only of the modifiers in `slot`."
+    sums: dict[str, float] = {}
+    for modifier in components.get("attribute_modifiers") or []:
+        if modifier.get("operation") != "add_value" or (slot is not None and modifier.get("slot") != slot):
+            continue
+        attribute = modifier["type"] if ":" in modifier["type"] else f"minecraft:{modifier['type']}"
+        sums[attribute] = sums.get(attribute, 0) + modifier["amount"]
+    return sums
+
+def _mainhand_attribute(attribute: str) -> Callable[[dict[str, Any]], float | None]:
+    def derive(components: dict[str, Any]):
+        sums = attribute_sums(components, slot="mainhand")
+        if attribute not in sums:
+            return None
+        return PLAYER_BASE_ATTRIBUTES.get(attribute, 0) + sums[attribute]
+    return derive
+
+indexed_value("model")(_component_value("item_model"))
+indexed_value("rarity")(_component_value("rarity"))
+indexed_value("max_stack_size")(_component_value("max_stack_size"))
+indexed_value("durability")(_component_value("max_damage"))
+indexed_value("enchantability")(_component_value("enchantable", "value"))
+indexed_value("cooldown")(_component_value("use_cooldown", "seconds"))
+indexed_value("cooldown_group")(_component_value("use_cooldown", "cooldown_group"))
+indexed_value("slot")(_component_value("equippable", "slot"))
+indexed_value("damage_per_attack")(_component_value("weapon", "item_damage_per_attack"))
+indexed_value("attack_damage")(_mainhand_attribute("minecraft:attack_damage"))
+indexed_value("attack_speed")(_mainhand_attribute("minecraft:attack_speed"))
+
+# ╭───────────────────────────────────────────────────────────────────────────────╮
+# │                                    Catalog                                    │
+# ╰───────────────────────────────────────────────────────────────────────────────╯
+
+@dataclass(slots=True)
+class CatalogEntry:
+    "Summary of an implemented custom item, as it's stored in the catalog and its manifest."
+    id:         str
+    item:       str
+    behaviours: list[str]
+    components: list[str]
+    "Keys of the item's components without the `minecraft` namespace, with removed components prefixed by `!`"
+    values:     dict[str, Any]                  = field(default_factory=dict)
+    "Values derived by `INDEXED_VALUES` that the item has"
+
+    @property
+    def namespace(self) -> str:
+        return self.id.split(":")[0]
+
+    @staticmethod
+    def fromItem(item: CustomItem, /) -> CatalogEntry:
+        emitted = {key.replace("minecraft:", "", 1): value for key, value in item.components._asDict().items()}
+        components = {key: value for key, value in emitted.items() if not key.startswith("!")}
+        values = {name: value for name, derive in INDEXED_VALUES.items() if (value := derive(components)) is not None}
+        values.update({f"attribute:{attribute}": amount for attribute, amount in attribute_sums(components).items()})
+        return CatalogEntry(
+            id=item.id,
+            item=item.item,
+            behaviours=list(dict.fromkeys(item._applied_behaviours)),
+            components=list(emitted),
+            values=values
+        )
+
+    def asDict(self) -> dict:
+        return {"id": self.id, "item": self.item, "behaviours": self.behaviours, "components": self.components, "values": self.values}
+
+    @staticmethod
+    def fromDict(dictionary: dict, /) -> CatalogEntry:
+        return CatalogEntry(**dictionary)
+
+class ItemCatalog:
+    """Class indexing custom items by id, namespace, applied behaviours, component keys and the values of `INDEXED_VALUES`.
+
+    Queries intersect the index' sets of ids, starting with the smallest, and only check predicates on the remaining entries.
+
+    Example
+    ---------
+    ```
+    catalog = ItemCatalog.fromItems(items)
+    catalog.query(namespace="custom", components=["consumable"], rarity="epic")
+    catalog.query({"attribute:minecraft:armor": lambda armor: armor >= 5})
+    ```
+    """
+
+    def __init__(self):
+        self.entries: dict[str, CatalogEntry] = {}
+        self._namespaces: dict[str, set[str]] = {}
+        self._behaviours: dict[str, set[str]] = {}
+        self._components: dict[str, set[str]] = {}
+        self._values: dict[str, dict[Any, set[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self.entries
+
+    def __getitem__(self, id: str) -> CatalogEntry:
+        return self.entries[id]
+
+    def __iter__(self):
+        return iter(self.entries.values())
+
+    @staticmethod
+    def fromItems(items: Iterable[CustomItem], /) -> ItemCatalog:
+        catalog = ItemCatalog()
+        for item in items:
+            catalog.add(item)
+        return catalog
+
+    def add(self, item: CustomItem | CatalogEntry, /) -> CatalogEntry:
+        "Indexes an item. An item with the same id that is already indexed gets replaced."
+        entry = item if isinstance(item, CatalogEntry) else CatalogEntry.fromItem(item)
+        self.remove(entry.id)
+        self.entries[entry.id] = entry
+
+        self._namespaces.setdefault(entry.namespace, set()).add(entry.id)
+        for behaviour in entry.behaviours:
+            self._behaviours.setdefault(behaviour, set()).add(entry.id)
+        for component in entry.components:
+            self._components.setdefault(component, set()).add(entry.id)
+        for name, value in entry.values.items():
+            self._values.setdefault(name, {}).setdefault(value, set()).add(entry.id)
+        return entry
+
+    def remove(self, id: str, /) -> None:
+        "Removes an item from the index, if it is indexed."
+        entry = self.entries.pop(id, None)
+        if entry is None:
+            return
+        self._namespaces[entry.namespace].discard(id)
+        for behaviour in entry.behaviours:
+            self._behaviours[behaviour].discard(id)
+        for component in entry.components:
+            self._components[component].discard(id)
+        for name, value in entry.values.items():
+            self._values[name][value].discard(id)
+
+    def _matching_values(self, name: str, condition: Any) -> set[str]:
+        index = self._values.get(name, {})
+        if callable(condition):
+            return {id for value, ids in index.items() if ids and condition(value) for id in ids}
+        return index.get(condition, set())
+
+    def query(
+            self,
+            where: dict[str, Any] | None = None, /,
+            *,
+            namespace: str | None = None,
+            behaviours: Iterable[str] = (),
+            components: Iterable[str] = (),
+            **conditions: Any
+            ) -> list[CatalogEntry]:
+        """Returns the entries matching all given conditions, sorted by id.
+
+        Parameter
+        ----------
+        where : dict
+            Conditions on indexed values whose names aren't valid keyword arguments, like `attribute:minecraft:armor`
+        namespace : str
+            Namespace of the item's id
+        behaviours : list[str]
+            Names of behaviours that must have been applied
+        components : list[str]
+            Keys of components the item must have, like `consumable` or `other:component`. Prefixed by `!`, the component must be removed.
+        conditions :
+            Conditions on indexed values by their name. A condition is either a value or a predicate called with the value,
+            e.g. `attack_damage=lambda damage: damage > 10`
+        """
+        conditions = (where or {}) | conditions
+        unknown = {name for name in conditions if name not in INDEXED_VALUES and name not in self._values and not name.startswith("attribute:")}
+        if unknown:
+            raise KeyError(f"Cannot query unindexed values {sorted(unknown)}. Indexed values are {sorted(INDEXED_VALUES)}")
+
+        candidates: list[set[str]] = []
+        if namespace is not None:
+            candidates.append(self._namespaces.get(namespace, set()))
+        candidates += [self._behaviours.get(behaviour, set()) for behaviour in behaviours]
+        candidates += [self._components.get(component, set()) for component in components]
+        candidates += [self._matching_values(name, condition) for name, condition in conditions.items() if not callable(condition)]
+
+        predicates = {name: condition for name, condition in conditions.items() if callable(condition)}
+
+        if candidates:
+            candidates.sort(key=len)
+            ids = set(candidates[0]).intersection(*candidates[1:])
+        else:
+            ids = set(self.entries)
+
+        # Predicates are checked per remaining entry instead of per distinct value once few candidates are left
+        for name, predicate in sorted(predicates.items(), key=lambda pair: len(self._values.get(pair[0], ()))):
+            if not ids:
+                break
+            if len(ids) < len(self._values.get(name, ())):
+                ids = {id for id in ids if name in self.entries[id].values and predicate(self.entries[id].values[name])}
+            else:
+                ids &= self._matching_values(name, predicate)
+
+        return [self.entries[id] for id in sorted(ids)]
+
+    def asDict(self) -> dict:
+        return {"version": MANIFEST_VERSION, "items": [entry.asDict() for entry in sorted(self.entries.values(), key=lambda entry: entry.id)]}
+
+    @staticmethod
+    def fromDict(dictionary: dict, /) -> ItemCatalog:
+        if dictionary.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported catalog manifest version {dictionary.get('version')}, expected {MANIFEST_VERSION}")
+        catalog = ItemCatalog()
+        for entry in dictionary["items"]:
+            catalog.add(CatalogEntry.fromDict(entry))
+        return catalog
+
+    def export(self, path: str | pathlib.Path, /) -> None:
+        "Writes the catalog as a compact JSON manifest, which can be loaded with `.load()` without rebuilding."
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.asDict(), separators=(",", ":")), "utf-8")
+
+    @staticmethod
+    def load(path: str | pathlib.Path, /) -> ItemCatalog:
+        return ItemCatalog.fromDict(json.loads(pathlib.Path(path).read_text("utf-8")))
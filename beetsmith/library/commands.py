@@ -0,0 +1,34 @@
+"""Submodule for generating commands that give custom items
+
+```
+give_command(item)                                      # -> 'give @s minecraft:music_disc_11[...] 1'
+replace_command(item, "@p", "weapon.mainhand")          # -> 'item replace entity @p weapon.mainhand with minecraft:music_disc_11[...] 1'
+datapack["custom:give_all"] = give_function(items)
+```
+"""
+
+from __future__ import annotations
+import beet
+from typing import Iterable
+from beetsmith.core.snbt import SNBTEncoder
+from beetsmith.library.item import CustomItem
+from beetsmith.library.vanilla import VanillaSnapshot
+
+def give_command(item: CustomItem, /, target: str = "@s", count: int = 1, *, pack_format: int | None = None, vanilla: VanillaSnapshot | None = None, encoder: SNBTEncoder | None = None) -> str:
+    "Returns a `/give` command for the item."
+    return f"give {target} {item.asItemStack(pack_format, vanilla, encoder)} {count}"
+
+def replace_command(item: CustomItem, /, target: str, slot: str, count: int = 1, *, pack_format: int | None = None, vanilla: VanillaSnapshot | None = None, encoder: SNBTEncoder | None = None) -> str:
+    "Returns an `/item replace` command putting the item into the `slot` of the entity `target`."
+    return f"item replace entity {target} {slot} with {item.asItemStack(pack_format, vanilla, encoder)} {count}"
+
+def give_function(items: Iterable[CustomItem], /, target: str = "@s", count: int = 1, *, pack_format: int | None = None, vanilla: VanillaSnapshot | None = None) -> beet.Function:
+    """Returns a function giving all items, sorted by id.
+
+    All items are serialized in one pass with a shared encoder, so interned component values are only serialized once.
+    """
+    encoder = SNBTEncoder()
+    return beet.Function([
+        give_command(item, target, count, pack_format=pack_format, vanilla=vanilla, encoder=encoder)
+        for item in sorted(items, key=lambda item: item.id)
+    ])
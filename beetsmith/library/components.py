@@ -4,7 +4,10 @@
 from __future__ import annotations
 from dataclasses import dataclass, field, fields
 from beetsmith.core.resourcelocations import ensureComponent
-from typing import TypeAlias
+from beetsmith.core.compat import emit_components
+from beetsmith.core.interning import ComponentInterner, FrozenDict, thaw
+from beetsmith.core.serialization import FORMAT_VERSION, check_version
+from typing import TypeAlias, ClassVar
 
 class RemovedComponentState:
     "The Instance of this class is used to denote the state of removement to an item component.<br>Every instanciation of this class will result in identical objects."
@@ -18,6 +21,11 @@ class RemovedComponentState:
     def __str__(self) -> str:
         return "REMOVED"
 
+    __repr__ = __str__
+
+    def __reduce__(self):
+        return "REMOVED" # Pickled as a reference to the constant, so it's still identical after loading
+
 REMOVED = RemovedComponentState()
 """Constant denoting that an item's component is removed.<br>
 Similar to `None`, `REMOVED` can be checked on instance with `is`:
@@ -30,7 +38,7 @@ if component is REMOVED:
 ValidValueInComponent: TypeAlias = str | int | float | list["ValidValueInComponent"] | dict[str, "ValidValueInComponent"]
 ValidComponentValue:   TypeAlias = ValidValueInComponent | RemovedComponentState | None
 
-@dataclass
+@dataclass(slots=True)
 class ItemComponents():
     """Class representing a Minecraft item's components.
 
@@ -41,6 +49,9 @@ class ItemComponents():
 
     To remove a component, set it's value to the constant `REMOVED`. It can be imported from this same module.
 
+    Every assignment to a component increases `._version`, which is used to cache the dict of `.asDict()`.<br>
+    If a component value is mutated in place (e.g. `·.lore.append(...)`), call `.touch()` afterwards.
+
     Supported Magic
     ---------
     - `... = ·[...]`
@@ -48,8 +59,16 @@ class ItemComponents():
     - `str(·)`
     - `a | b`
     """
+    # Set first, since every assignment to the components below already reads `_version`
+    _version:                    int                            = field(default=0, init=False, repr=False, compare=False)
+    "Counter that is increased on every mutation of the component stack"
+    _dict_cache:                 tuple[int, dict] | None        = field(default=None, init=False, repr=False, compare=False)
+    "`(version, dict)` of the last `.asDict()` call"
+    _format_cache:               dict[int, tuple[int, dict]] | None = field(default=None, init=False, repr=False, compare=False)
+    "`{pack_format: (version, dict)}` of the last `.asDict(pack_format)` calls"
+
     attribute_modifiers:         list[dict]        | RemovedComponentState | None = None
-    block_attacks:               dict              | RemovedComponentState | None = None
+    blocks_attacks:              dict              | RemovedComponentState | None = None
     break_sound:                 str               | RemovedComponentState | None = None
     consumable:                  dict              | RemovedComponentState | None = None
     custom_data:                 dict              | RemovedComponentState | None = None
@@ -92,8 +111,31 @@ class ItemComponents():
     _other_components:           dict[str, ValidComponentValue] = field(default_factory=dict)
     "All components in the component stack that cannot be accessed by attribution. Complementary to `._builtin_components`"
 
+    _builtin_names: ClassVar[tuple[str, ...]] = ()
+    "Names of all components that can be accessed by attribution. Filled in after the class definition."
+    _aliases: ClassVar[dict[str, str]] = {"block_attacks": "blocks_attacks"}
+    "Former names of components that are still accepted"
+
+    @property
+    def block_attacks(self) -> dict | RemovedComponentState | None:
+        "Former name of `.blocks_attacks`"
+        return self.blocks_attacks
+
+    @block_attacks.setter
+    def block_attacks(self, value: dict | RemovedComponentState | None) -> None:
+        self.blocks_attacks = value
+
+    def __setattr__(self, name: str, value) -> None:
+        object.__setattr__(self, name, value)
+        if not name.startswith("_"):
+            object.__setattr__(self, "_version", self._version + 1) # Same as `.touch()`, inlined since it runs on every assignment
+
+    def touch(self) -> None:
+        "Marks the component stack as modified. Needed after mutating a component value in place."
+        object.__setattr__(self, "_version", self._version + 1)
+
     def __str__(self) -> str:
-        return str(self.asDict())
+        return str(self._asDict())
 
     def __getitem__(self, query: str) -> ValidComponentValue:
         return self.get_component(component=query)
@@ -102,18 +144,19 @@ class ItemComponents():
         self.set_component(component=query, value=value)
 
     def __or__(self, other: ItemComponents):
-        new = self.asDict()
-        new.update(other.asDict())
-        return ItemComponents.fromDict(new)
+        return ItemComponents.fromDict(self._asDict() | other._asDict())
+
+    def __reduce__(self):
+        builtins = {name: value for name in self._builtin_names if (value := getattr(self, name)) is not None}
+        return (_restore_components, (FORMAT_VERSION, builtins, self._other_components))
 
     @property
     def _builtin_components(self) -> dict[str, ValidComponentValue]:
         "All components in the component stack that can be accessed by attribution. Complementary to `._other_components`"
         return {
-            field.name: getattr(self, field.name)
-            for field
-            in fields(self)
-            if field.name not in ["_other_components"]
+            name: getattr(self, name)
+            for name
+            in self._builtin_names
         }
     
     @property
@@ -124,30 +167,40 @@ class ItemComponents():
     def set_component(self, component: str, value: ValidComponentValue) -> None:
         ensureComponent(component)
         id = component.split("minecraft:")[-1]
+        id = self._aliases.get(id, id)
         
-        if id in self._builtin_components:
+        if id in self._builtin_names:
             setattr(self, id, value)
         else:
             self._other_components[component] = value
+            self.touch()
 
     def get_component(self, component: str) -> ValidComponentValue:
         id = component.split("minecraft:")[-1]
+        id = self._aliases.get(id, id)
         return (
             getattr(self, id)
-            if id in self._builtin_components
+            if id in self._builtin_names
             else self._other_components.get(component)
         )
     
     @classmethod
     def empty(cls):
         "Item component stack with no components set"
-        return cls()
+        instance = object.__new__(cls) # Skips assigning every component through `__setattr__`
+        for name in cls._builtin_names:
+            object.__setattr__(instance, name, None)
+        object.__setattr__(instance, "_version", 0)
+        object.__setattr__(instance, "_dict_cache", None)
+        object.__setattr__(instance, "_format_cache", None)
+        object.__setattr__(instance, "_other_components", {})
+        return instance
     
     @classmethod
     def sterile(cls):
         "Item component stack with all components removed"
         instance = cls()
-        for id in instance._builtin_components:
+        for id in cls._builtin_names:
             setattr(instance, id, REMOVED)
         return instance
      
@@ -192,14 +245,75 @@ class ItemComponents():
         for component, value in other._all_components.items():
             self.set_component(component, value)
 
-    def asDict(self) -> dict[str, ValidValueInComponent]:
+    def _states(self) -> dict[str, ValidComponentValue]:
+        "All set components by their namespaced name"
+        states = {f"minecraft:{name}": value for name, value in self._builtin_components.items() if value is not None}
+        states.update((component, value) for component, value in self._other_components.items() if value is not None)
+        return states
+
+    def diff(self, other: ItemComponents, /) -> dict[str, ValidComponentValue]:
+        """Returns the minimal delta that turns this component stack into `other` when applied with `.patch()`.
+
+        Keys are the namespaced names of the components that differ.<br>
+        Values are the components' values in `other`, `REMOVED` if they are removed or `None` if they aren't set there.
+        """
+        mine, theirs = self._states(), other._states()
+        delta = {}
+        for component in mine.keys() | theirs.keys():
+            a, b = mine.get(component), theirs.get(component)
+            if a is b or (a is not REMOVED and b is not REMOVED and thaw(a) == thaw(b)):
+                continue
+            delta[component] = b
+        return dict(sorted(delta.items()))
+
+    def patch(self, delta: dict[str, ValidComponentValue], /) -> None:
+        "Applies a delta returned by `.diff()`."
+        for component, value in delta.items():
+            self.set_component(component, value)
+
+    def intern(self, interner: ComponentInterner, /) -> None:
+        """Replaces all component values with their shared, immutable equivalents from `interner`.
+
+        Afterwards component values can't be mutated in place anymore, they have to be replaced.
+        """
+        for name in self._builtin_names:
+            if (value := getattr(self, name)) is not None:
+                setattr(self, name, interner.intern(value))
+        self._other_components = {component: interner.intern(value) for component, value in self._other_components.items()}
+        self.touch()
+
+    def interned(self, interner: ComponentInterner, /, pack_format: int | None = None) -> FrozenDict:
+        """Returns `.asDict()` interned by `interner`.
+
+        Identical component stacks result in the same object, so they can be compared with `is` and hashed in O(1),<br>
+        e.g. for deduplicating items or as cache keys.
+        """
+        return interner.intern(self._asDict(pack_format))
+
+    def asDict(self, pack_format: int | None = None) -> dict[str, ValidValueInComponent]:
         """Return the item components as a dictionary.
         
         The type of dictionary produced is like the ones used in every JSON definition of item components like in recipes, item modifiers and loot tables, 
         whereby the keys are the names of the components which can have a leading `!` and their values are the components values.
+
+        If a `pack_format` is given, components are emitted like they are known to that pack format (see `core.compat.COMPONENT_EMITTERS`).
         """
-        out = {}
+        return dict(self._asDict(pack_format))
+
+    def _asDict(self, pack_format: int | None = None) -> dict[str, ValidValueInComponent]:
+        "Same as `.asDict()`, but the result is cached until the component stack is modified, so it must not be mutated."
+        if pack_format is not None:
+            if self._format_cache is None:
+                self._format_cache = {}
+            cached = self._format_cache.get(pack_format)
+            if cached is None or cached[0] != self._version:
+                cached = self._format_cache[pack_format] = (self._version, emit_components(self._asDict(), pack_format))
+            return cached[1]
+
+        if self._dict_cache is not None and self._dict_cache[0] == self._version:
+            return self._dict_cache[1]
 
+        out = {}
         for component, value in self._builtin_components.items():
             if value is not REMOVED and value is not None:
                 out["minecraft:" + component] = value
@@ -212,5 +326,16 @@ class ItemComponents():
             elif value is REMOVED and value is not None:
                 out["!" + component] = {}
         
+        self._dict_cache = (self._version, out)
         return out
-    
\ No newline at end of file
+
+def _restore_components(version: int, builtins: dict[str, ValidComponentValue], others: dict[str, ValidComponentValue]) -> ItemComponents:
+    "Restores a pickled component stack (see `core.serialization`)."
+    check_version(version)
+    instance = ItemComponents.empty()
+    for name, value in builtins.items():
+        object.__setattr__(instance, name, value)
+    instance._other_components = others
+    return instance
+
+ItemComponents._builtin_names = tuple(field.name for field in fields(ItemComponents) if not field.name.startswith("_"))
@@ -0,0 +1,102 @@
+"""Submodule for dispatching operations on custom items by a numeric index at runtime
+
+Every item gets an index (starting at 1, in order of their ids) stored as `index` in its `custom_data`.<br>
+For every operation, a balanced tree of functions compares the score `$index` against ranges of indices,
+so each call only runs O(log n) commands, no matter how many items there are.
+
+```
+scoreboard players set $index beetsmith.index 42
+function beetsmith:dispatch/give            # gives item 42 to @s
+function beetsmith:dispatch/replace         # replaces the mainhand of @s with a fresh item 42
+```
+There is no tree for looking items up, since their id can be read from `custom_data` directly.
+"""
+
+from __future__ import annotations
+import beet
+from typing import Iterable, Literal
+from beetsmith.library.item import CustomItem, technical_namespace
+
+Operation = Literal["give", "replace"]
+
+class DispatchTree:
+    """Class generating function trees that dispatch operations on custom items by their index.
+
+    Indices are assigned in order of the items' ids, so adding or removing items changes the indices of others.<br>
+    `.index_items()` has to be called before the items are implemented, since the index is part of their components.
+
+    Example
+    ---------
+    ```
+    tree = DispatchTree(items)
+    tree.index_items()
+    for item in items:
+        item.implement(datapack)
+    tree.implement(datapack)
+    ```
+    """
+
+    def __init__(
+            self,
+            items: Iterable[CustomItem],
+            base: str = f"{technical_namespace}:dispatch",
+            objective: str = f"{technical_namespace}.index",
+            operations: Iterable[Operation] = ("give", "replace")
+            ):
+        self.items = sorted(items, key=lambda item: item.id)
+        self.base = base
+        self.objective = objective
+        self.operations = tuple(operations)
+
+    def index_items(self) -> dict[str, int]:
+        "Stores the index of every item in its `custom_data`. Returns the indices by item id."
+        indices = {}
+        for index, item in enumerate(self.items, start=1):
+            item.components.custom_data = {**(item.components.custom_data or {}), "index": index} # Replaced, since it may be interned
+            indices[item.id] = index
+        return indices
+
+    def _leaf(self, operation: Operation, item: CustomItem) -> str:
+        loot_table = f"{item._id_namespace}:item/{item._id_short}"
+        match operation:
+            case "give":
+                return f"loot give @s loot {loot_table}"
+            case "replace":
+                return f"loot replace entity @s weapon.mainhand loot {loot_table}"
+        raise ValueError(f"Unknown operation '{operation}'")
+
+    def _check(self, low: int, high: int, command: str) -> str:
+        matches = str(low) if low == high else f"{low}..{high}"
+        return f"execute if score $index {self.objective} matches {matches} run return run {command}"
+
+    def _node(self, operation: Operation, low: int, high: int, functions: dict[str, beet.Function]) -> list[str]:
+        "Returns the commands of the node covering the indices `low` to `high`, adding the nodes below it to `functions`"
+        if high - low < 2:
+            return [self._check(index, index, self._leaf(operation, self.items[index - 1])) for index in range(low, high + 1)]
+
+        middle = (low + high) // 2
+        commands = []
+        for start, end in ((low, middle), (middle + 1, high)):
+            if start == end:
+                commands.append(self._check(start, end, self._leaf(operation, self.items[start - 1])))
+                continue
+            location = f"{self.base}/{operation}/{start}_{end}"
+            functions[location] = beet.Function(self._node(operation, start, end, functions))
+            commands.append(self._check(start, end, f"function {location}"))
+        return commands
+
+    def functions(self) -> dict[str, beet.Function]:
+        "Returns all functions of the trees by their resource location."
+        functions = {
+            f"{self.base}/load": beet.Function([f"scoreboard objectives add {self.objective} dummy"])
+        }
+        for operation in self.operations:
+            commands = self._node(operation, 1, len(self.items), functions) if self.items else []
+            functions[f"{self.base}/{operation}"] = beet.Function(commands)
+        return functions
+
+    def implement(self, datapack: beet.DataPack, /) -> None:
+        "Adds the functions of the trees to a datapack. The objective is created on load."
+        for location, function in self.functions().items():
+            datapack[location] = function
+        datapack.function_tags.setdefault("minecraft:load").merge(beet.FunctionTag({"values": [f"{self.base}/load"]}))
@@ -2,25 +2,43 @@
 
 from __future__ import annotations
 import beet
+import time
 import uuid
-import warnings
-from typing import Literal
-from dataclasses import dataclass, field, InitVar
+from typing import Literal, NamedTuple, Any
+from dataclasses import dataclass, field, fields, InitVar, MISSING
 from beetsmith.core.text_components import normalize
 from beetsmith.core.resourcelocations import ensureNoSpecialRL, ensureTagLikeRL, ensureNoTagPathRL
-from beetsmith.core.compat import watch_out_for_duplicates, behavior
+from beetsmith.core.compat import watch_out_for_duplicates, behavior, pack_format_of, dropped_components
+from beetsmith.core.diagnostics import report
+from beetsmith.core.metrics import BuildMetrics
+from beetsmith.core.serialization import FORMAT_VERSION, check_version
+from beetsmith.core.snbt import SNBTEncoder
+from beetsmith.core.tracing import span
 from beetsmith.library.components import ItemComponents, REMOVED
+from beetsmith.library.plan import BuildPlan, DataPackBackend, FileOperation
+from beetsmith.library.vanilla import VanillaSnapshot
 
 __minecraft_game_version__ = "1.21.9"
 __minecraft_data_version__ = 88
+__minimum_data_version__ = 71
+"Oldest pack format that components can be emitted for"
+__maximum_data_version__ = 94
+"Newest pack format that components can be emitted for"
 technical_namespace = "beetsmith"
 generated_file_pattern = "{technical_namespace}:{namespace}/{thing}/{id}"
 
+class FileSpec(NamedTuple):
+    "Lightweight description of a file an item requires. It's only lowered to a file operation when implementing."
+    location:   str
+    kind:       type[beet.NamespaceFile]
+    content:    Any
+    "Data the file is built from, like a dict for JSON files and a list of lines for functions"
+
 # ╭───────────────────────────────────────────────────────────────────────────────╮
 # │                                  CustomItem                                   │ 
 # ╰───────────────────────────────────────────────────────────────────────────────╯
 
-@dataclass
+@dataclass(slots=True)
 class CustomItem:
     """Class representing a custom item.
 
@@ -34,8 +52,18 @@ class CustomItem:
         Resource location of a model definition
     texture : str
         base64 encoded texture that will be used for the item if it has the `minecraft:player_head` model
-    
+
+    Derived outputs like `._required_files()` are cached until the item is modified.<br>
+    Behaviours do this on their own. After mutating attributes in place, call `.touch()`.
     """
+    # Set first, since every assignment to the attributes below already reads `_version`
+    _version:                   int                             = field(init=False, default=0, repr=False, compare=False)
+    "Counter that is increased on every mutation of the item"
+    _files_cache:               tuple[int, list[FileSpec]] | None = field(init=False, default=None, repr=False, compare=False)
+    "`(version, files)` of the last `._required_files()` call"
+    _stack_cache:               dict[tuple, tuple[tuple[int, int], str]] | None = field(init=False, default=None, repr=False, compare=False)
+    "`{(pack_format, vanilla, encoder class): (versions, stack)}` of the last `.asItemStack()` calls"
+
     id:                         str
     name:                       InitVar[str | dict | list]
     model:                      InitVar[str]
@@ -43,16 +71,21 @@ class CustomItem:
 
     item:                       str                             = field(init=False, default="minecraft:music_disc_11")
     components:                 ItemComponents                  = field(init=False, default_factory=ItemComponents.empty)
-    required_tags:              list[str]                       = field(init=False, default_factory=list)
+    required_tags:              tuple[str, ...]                 = field(init=False, default=())
+    "Item tags the item is added to. Replace the tuple to add tags."
     _applied_behaviours:        list[str]                       = field(init=False, default_factory=list)
-    _special_required_files:    list[tuple[str, beet.TextFile]] = field(init=False, default_factory=list)
+    _special_required_files:    list[FileSpec]                  = field(init=False, default_factory=list)
     "Don't use this. Use `.required_files()` instead."
 
     def __post_init__(self, name, model, texture):
         self.id = ensureNoSpecialRL(self.id)
+        self._initialize(name, ensureNoSpecialRL(model), texture)
+
+    def _initialize(self, name, model: str, texture) -> None:
+        "Sets the components every custom item starts with. `model` has to be validated already."
         self.components.custom_data = {"id": self.id}
         self.components.item_name = normalize(name)[0]
-        self.components.item_model = ensureNoSpecialRL(model)
+        self.components.item_model = model
         if texture is not None:
             self.components.profile = {
                 "properties": [{"name": "texture", "value": texture}]
@@ -61,8 +94,22 @@ class CustomItem:
         self.components.max_stack_size = 64
         self.components.jukebox_playable = REMOVED
 
+    def __setattr__(self, name: str, value) -> None:
+        object.__setattr__(self, name, value)
+        if not name.startswith("_"):
+            object.__setattr__(self, "_version", self._version + 1)
+
+    def touch(self) -> None:
+        "Marks the item and its components as modified. Needed after mutating attributes in place."
+        object.__setattr__(self, "_version", self._version + 1)
+        self.components.touch()
+
+    def __reduce__(self):
+        files = tuple((spec.location, spec.kind.__name__, spec.content) for spec in self._special_required_files)
+        return (_restore_item, (FORMAT_VERSION, self.id, self.item, self.components, self.required_tags, self._applied_behaviours, files))
+
     def __str__(self) -> str:
-        return f"<CustomItem '{self.id}' ('{self.item}' with {len(self.components.asDict())} components and {len(self._required_files())} additional files needed)>"
+        return f"<CustomItem '{self.id}' ('{self.item}' with {len(self.components._asDict())} components and {len(self._required_files())} additional files needed)>"
     
     @property
     def _id_namespace(self) -> str: return self.id.split(":")[0]
@@ -98,16 +145,17 @@ class CustomItem:
             Modifiers with the same identifier will overwrite each other<br>
             Some behaviours require specific identifiers [[Wiki](https://minecraft.wiki/w/Attribute#Vanilla_modifiers)]
         """
-        if id is uuid.UUID:
-            id = str(uuid.uuid4())
-        self.components.attribute_modifiers = self.components.attribute_modifiers or []
-        self.components.attribute_modifiers.append({
+        self._add_attribute_modifier(attribute, slot, value, operation, str(uuid.uuid4()) if id is uuid.UUID else id)
+
+    def _add_attribute_modifier(self, attribute: str, slot: str, value: float, operation: str, id: str) -> None:
+        "Same as `.add_attribute_modifier()`, but not applied as a behaviour of its own, so other behaviours can use it."
+        self.components.attribute_modifiers = [*(self.components.attribute_modifiers or []), {
             "id": id,
             "amount": value,
             "type": attribute,
             "operation": operation,
             "slot": slot
-        })
+        }] # Replaced instead of appended to, since the list may be interned
 
     @behavior(warn_for_incompatibility=["right_click_ability"])
     def consumable(
@@ -162,9 +210,9 @@ class CustomItem:
             ability_name = generated_file_pattern.format(technical_namespace=technical_namespace, namespace=self._id_namespace, thing="ability", id=self._id_short)
             ability_function = ensureNoTagPathRL(function)
             files = [
-                (
+                FileSpec(
                     ability_name,
-                    beet.Advancement({
+                    beet.Advancement, {
                         "criteria": { "use_item": {
                             "trigger": "minecraft:using_item",
                             "conditions": { "item": { "predicates": {
@@ -172,14 +220,14 @@ class CustomItem:
                             }}}
                         }},
                         "rewards": { "function": ability_name }
-                    })
+                    }
                 ),
-                (
+                FileSpec(
                     ability_name,
-                    beet.Function([
+                    beet.Function, [
                         f"function {ability_function}",
                         f"advancement revoke @s only {ability_name}",
-                    ])
+                    ]
                 )
             ]
             self._special_required_files.extend(files)
@@ -214,7 +262,7 @@ class CustomItem:
                 - Vanilla tags begin with `enchantable/` and are `armor`, `bow`, `chest_armor`, `crossbow`, `durability`, `equippable`, `fire_aspect`, `fishing`, `foot_armor`, `head_armor`, `leg_armor`, `mace`, `mining`, `mining_loot`, `sharp_weapon`, `sword`, `trident` and `weapon`
         """
         self.components.enchantable = {"value": enchantability}
-        self.required_tags.extend([ensureNoTagPathRL(tag) for tag in enchantable_tags]) # Needs to include enchantable/
+        self.required_tags += tuple(ensureNoTagPathRL(tag) for tag in enchantable_tags) # Needs to include enchantable/
     
     @behavior
     def damage_resistance(self, damage_types: list[str]) -> None:
@@ -226,7 +274,7 @@ class CustomItem:
         """
         if len(damage_types) > 1:
             tag_data = {"values": [f"#{ensureNoTagPathRL(damage_type)}" for damage_type in damage_types]}
-            self._special_required_files.append((self.id, beet.DamageTypeTag(tag_data)))
+            self._special_required_files.append(FileSpec(self.id, beet.DamageTypeTag, tag_data))
             self.components.damage_resistant = {"types": f"#{self.id}"}
         else:
             self.components.damage_resistant = {"types": f"#{damage_types[0]}"}
@@ -311,9 +359,9 @@ class CustomItem:
         ability_function = ensureNoTagPathRL(function)
 
         files = [
-            (
+            FileSpec(
                 ability_name,
-                beet.Advancement({
+                beet.Advancement, {
                     "criteria": { "use_item": {
                         "trigger": "minecraft:using_item",
                         "conditions": { "item": { "predicates": {
@@ -321,17 +369,17 @@ class CustomItem:
                         }}}
                     }},
                     "rewards": { "function": ability_name }
-                })
+                }
             ),
-            (
+            FileSpec(
                 ability_name,
-                beet.Function([
+                beet.Function, [
                     f"data modify storage {technical_namespace}:temp HandItem set from entity @s Inventory[{{Slot:0b}}]",
                     f"item replace entity @s weapon.mainhand with air",
                     f"function {ability_function}",
                     f"advancement revoke @s only {ability_name}",
                     f"data modify entity @s Inventory[{{Slot:0b}}] set from storage {technical_namespace}:temp HandItem",
-                ])
+                ]
             )
         ]
         self._special_required_files.extend(files)
@@ -362,13 +410,13 @@ class CustomItem:
             - disable_blocking (float): Number of seconds hit entity's blocking ability's are disabled when hitting while it was blocking
             - item_damage_per_attack (int): Amount of durability removed when performing an attack
         """        
-        self.add_attribute_modifier(attribute="minecraft:attack_damage",
+        self._add_attribute_modifier(attribute="minecraft:attack_damage",
                                 value=attack_damage - 1,
                                 slot="mainhand",
                                 operation="add_value",
                                 id="base_attack_damage"
                                 )
-        self.add_attribute_modifier(attribute="minecraft:attack_speed",
+        self._add_attribute_modifier(attribute="minecraft:attack_speed",
                                 value=attack_speed - 4,
                                 slot="mainhand",
                                 operation="add_value",
@@ -379,15 +427,32 @@ class CustomItem:
             }
         if can_sweep:
             self.components.tool = {"rules": [], "can_destroy_blocks_in_creative": False}
-            self.required_tags.append("minecraft:swords")
+            self.required_tags += ("minecraft:swords",)
 
     # ╭────────────────────────────────────────────────────────────╮
     # │                        Implementation                      │ 
     # ╰────────────────────────────────────────────────────────────╯
     
-    def asLootTablePoolEntry(self) -> dict:
+    def emittedComponents(self, pack_format: int | None = None, vanilla: VanillaSnapshot | None = None) -> dict:
+        """Returns the components as they are emitted into generated files.
+
+        If a `pack_format` is given, the components are emitted like they are known to that pack format.<br>
+        If a `vanilla` snapshot is given, components that equal the defaults of the base item are left out.
+        """
+        return dict(self._emittedComponents(pack_format, vanilla))
+
+    def _emittedComponents(self, pack_format: int | None = None, vanilla: VanillaSnapshot | None = None) -> dict:
+        "Same as `.emittedComponents()`, but the result may be cached by the component stack, so it must not be mutated."
+        components = self.components._asDict(pack_format)
+        if vanilla is not None:
+            components = vanilla.strip(components, self.item)
+        return components
+
+    def asLootTablePoolEntry(self, pack_format: int | None = None, vanilla: VanillaSnapshot | None = None) -> dict:
         """Returns a dict, like it can be used as an item in `pools/*/entries` in a loot table definition.
 
+        Components are emitted like by `.emittedComponents()`.
+
         Note that, depending on the application, other functions (`·.asLootTableEntry["functions"]`) or conditions (`·.asLootTableEntry["conditions"]`) may need to be set.<br>
         This must then be done separately. Otherwise, the entire loot table can be written by hand and (`·.components.asDict()`) can be used for the components.
         """
@@ -397,68 +462,143 @@ class CustomItem:
           "functions": [
             {
               "function": "minecraft:set_components",
-              "components": self.components.asDict()
+              "components": self.emittedComponents(pack_format, vanilla)
             }
           ]
         }
     
-    def asRecipeResult(self, amount: int = 1) -> dict:
+    def asRecipeResult(self, amount: int = 1, pack_format: int | None = None, vanilla: VanillaSnapshot | None = None) -> dict:
         """Returns a dict, like it can be used as the value of `result` in a recipe definition.
+
+        Components are emitted like by `.emittedComponents()`.
         """
         return {
             "id": self.item,
-            "components": self.components.asDict(),
+            "components": self.emittedComponents(pack_format, vanilla),
             "count": amount
         }
 
-    def _required_files(self) -> list[tuple[str, beet.TextFile]]:
+    def asItemStack(self, pack_format: int | None = None, vanilla: VanillaSnapshot | None = None, encoder: SNBTEncoder | None = None) -> str:
+        """Returns the item in the item stack syntax of commands, e.g. `minecraft:music_disc_11[minecraft:item_name="Test",!minecraft:jukebox_playable]`.
+
+        Components are emitted like by `.emittedComponents()` and serialized to SNBT by `encoder`.<br>
+        The result is cached per encoder class until the item or its components are modified,
+        so all instances of an encoder class have to serialize values the same way.
+        """
+        encoder = encoder or SNBTEncoder()
+        versions = (self._version, self.components._version)
+        key = (pack_format, vanilla, type(encoder))
+        if self._stack_cache is None:
+            self._stack_cache = {}
+        cached = self._stack_cache.get(key)
+        if cached is not None and cached[0] == versions:
+            return cached[1]
+
+        components = ",".join(
+            component if component.startswith("!") else f"{component}={encoder.encode(value)}"
+            for component, value in self._emittedComponents(pack_format, vanilla).items()
+        )
+        stack = f"{self.item}[{components}]" if components else self.item
+        self._stack_cache[key] = (versions, stack)
+        return stack
+
+    def _required_files(self) -> list[FileSpec]:
         """
-        Generates a list of 2-tuples whereby the first is the resourcelocation of the file and the second is a beet TextFile
+        Generates a list of specs of the files the item requires. They are only turned into file operations by `.lower()`.
         """
+        if self._files_cache is not None and self._files_cache[0] == self._version:
+            return list(self._files_cache[1])
+
         files = []
 
         # Tags
         files.extend([
-            (tag, beet.ItemTag({"replace": False, "values": [self.item]}))
+            FileSpec(tag, beet.ItemTag, {"replace": False, "values": [self.item]})
             for tag in self.required_tags
         ])
 
         # Explicitely needed files
         files.extend(self._special_required_files)
 
-        return files
+        self._files_cache = (self._version, files)
+        return list(files)
     
-    @watch_out_for_duplicates
-    def implement(self, datapack: beet.DataPack, /) -> None:
+    def lower(self, pack_format: int | None = None, vanilla: VanillaSnapshot | None = None) -> BuildPlan:
+        """Returns the build plan of the item for a pack format: its loot table and the files it requires.
+
+        Components are emitted like by `.emittedComponents()`. Components unknown to the pack format are left out and reported.
         """
-        Implement the custom item into a beet datapack
+        if pack_format is not None:
+            for component in dropped_components(self.components._asDict(), pack_format):
+                report("dropped-component", f"The component '{component}' is unknown to pack format {pack_format} and was left out", item=self.id)
+        plan = BuildPlan(pack_format)
+        plan.add("create", "LootTable", f"{self._id_namespace}:item/{self._id_short}", {
+            "pools": [{
+                "rolls": 1,
+                "entries": [
+                    self.asLootTablePoolEntry(pack_format, vanilla)
+                ]
+            }]
+        })
+        plan.operations.extend(FileOperation.fromFile(*spec) for spec in self._required_files())
+        return plan
+
+    @watch_out_for_duplicates
+    def implement(self, datapack: beet.DataPack, /, metrics: BuildMetrics | None = None, vanilla: VanillaSnapshot | None = None) -> BuildPlan:
         """
+        Implement the custom item into a beet datapack and return the build plan that was applied
 
-        pack_format = datapack.pack_format
-        if pack_format != __minecraft_data_version__:
-            warnings.warn(f"The datapack does not match the beetsmith pack format {__minecraft_data_version__}! Some content may not be loaded by Minecraft!", category=UserWarning)
+        Components are emitted like they are known to the pack format of the datapack.<br>
+        The same item can be implemented into several datapacks targeting different pack formats.
 
-        # Loottable
-        datapack[f"{self._id_namespace}:item/{self._id_short}"] = beet.LootTable(
-            {
-                "pools": [{
-                    "rolls": 1,
-                    "entries": [
-                        self.asLootTablePoolEntry()
-                    ]
-                }]
-            }
-        )
+        If a `vanilla` snapshot is given, components that equal the defaults of the base item are left out.
 
-        # Required Files
-        for file in self._required_files():
-            
-            match file[1]:
-                case beet.FunctionTag:
-                    datapack.function_tags.setdefault(file[0]).merge(file[1]) # Can either merge or create function tags
-            
-                case beet.Function:
-                    datapack.functions.setdefault(file[0]).append(file[1]) # Can either merge or create functions
-                
-                case _:
-                    datapack[file[0]] = file[1]
\ No newline at end of file
+        If `metrics` are given, the implementation is counted and timed in them.
+        """
+        start = time.perf_counter()
+        pack_format = pack_format_of(datapack)
+
+        with span("implement", item=self.id, pack_format=pack_format):
+            if pack_format is not None and not __minimum_data_version__ <= pack_format <= __maximum_data_version__:
+                report("pack-format", f"The datapack's pack format {pack_format} is not within the beetsmith pack formats {__minimum_data_version__} to {__maximum_data_version__}! Some content may not be loaded by Minecraft!", item=self.id)
+
+            plan = self.lower(pack_format, vanilla)
+            files = DataPackBackend(datapack).write(plan)
+
+        if metrics is not None:
+            metrics.observe("implement_seconds", time.perf_counter() - start)
+            metrics.count("implementations_total", namespace=self._id_namespace, pack_format=str(pack_format))
+            for behaviour in self._applied_behaviours:
+                metrics.count("behaviours_total", behaviour=behaviour)
+            for component in self._emittedComponents(pack_format, vanilla):
+                metrics.count("components_total", component=component)
+            for _, file in files:
+                raw = file.ensure_serialized()
+                metrics.count("generated_files_total", type=type(file).__name__)
+                metrics.count("generated_bytes_total", len(raw.encode("utf-8") if isinstance(raw, str) else raw), type=type(file).__name__)
+        return plan
+
+def _prevalidated_item(id: str, name: str | dict | list, model: str, texture: str | None = None) -> CustomItem:
+    "Creates a custom item like `CustomItem()` does, but without validating `id` and `model` again. Both have to be results of `ensureNoSpecialRL()`."
+    instance = object.__new__(CustomItem)
+    for attribute in fields(CustomItem):
+        if attribute.default_factory is not MISSING:
+            object.__setattr__(instance, attribute.name, attribute.default_factory())
+        elif attribute.default is not MISSING:
+            object.__setattr__(instance, attribute.name, attribute.default)
+    object.__setattr__(instance, "id", id)
+    instance._initialize(name, model, texture)
+    return instance
+
+def _restore_item(version: int, id: str, item: str, components: ItemComponents, required_tags: tuple[str, ...], applied_behaviours: list[str], files: tuple) -> CustomItem:
+    "Restores a pickled custom item (see `core.serialization`) without running its constructor again."
+    check_version(version)
+    instance = object.__new__(CustomItem)
+    for name, value in [
+        ("_version", 0), ("_files_cache", None), ("_stack_cache", None),
+        ("id", id), ("item", item), ("components", components), ("required_tags", tuple(required_tags)),
+        ("_applied_behaviours", applied_behaviours),
+        ("_special_required_files", [FileSpec(location, getattr(beet, kind), content) for location, kind, content in files])
+    ]:
+        object.__setattr__(instance, name, value)
+    return instance
@@ -0,0 +1,138 @@
+"""Submodule for build plans, the intermediate representation between custom items and datapacks
+
+A build plan is pure data: a list of file operations with the resource location, file type and content of the file.<br>
+Custom items are lowered to plans by `CustomItem.lower()`. Plans can be cached, merged, inspected and serialized,
+and are written by backends like `DataPackBackend` or the ones in `toolchain.backends`.
+"""
+
+from __future__ import annotations
+import json
+import pathlib
+import beet
+from dataclasses import dataclass, field
+from typing import Any, Literal, NamedTuple
+from beetsmith.core.interning import thaw
+
+Action = Literal["create", "merge_tag", "append_function"]
+
+PLAN_VERSION = 1
+
+class FileOperation(NamedTuple):
+    "Operation on a single file of a datapack."
+    action:     Action
+    "`create` (overwrites), `merge_tag` (merges tag values) or `append_function` (appends commands)"
+    kind:       str
+    "Name of the beet file class, e.g. `LootTable` or `ItemTag`"
+    location:   str
+    payload:    Any
+    "Data of the file, like a dict for JSON files and a list of lines for functions"
+
+    def file_type(self) -> type[beet.NamespaceFile]:
+        return getattr(beet, self.kind)
+
+    def materialize(self) -> beet.NamespaceFile:
+        """Builds the beet file. Its content is a copy, so the operation stays untouched when files get merged.
+
+        Interned values (see `core.interning`) are thawed, so the file only contains plain dicts and lists.
+        """
+        return self.file_type()(thaw(self.payload))
+
+    @staticmethod
+    def fromFile(location: str, file_type: type[beet.NamespaceFile], payload: Any, /) -> FileOperation:
+        "Creates the operation for a file, choosing the action by the file type."
+        if issubclass(file_type, beet.TagFile):
+            action = "merge_tag"
+        elif issubclass(file_type, beet.Function):
+            action = "append_function"
+        else:
+            action = "create"
+        return FileOperation(action, file_type.__name__, location, payload)
+
+@dataclass(slots=True)
+class BuildPlan:
+    """Class holding the file operations for a datapack of a pack format.
+
+    Example
+    ---------
+    ```
+    plan = BuildPlan(pack_format=88)
+    for item in items:
+        plan.extend(item.lower(88))
+    plan.export("./build/plan.json")
+    DataPackBackend(datapack).write(plan)
+    ```
+    """
+    pack_format:    int | None              = None
+    operations:     list[FileOperation]     = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+    def add(self, action: Action, kind: str, location: str, payload: Any) -> None:
+        self.operations.append(FileOperation(action, kind, location, payload))
+
+    def extend(self, other: BuildPlan, /) -> None:
+        "Appends the operations of another plan, e.g. one lowered by a worker."
+        if other.pack_format != self.pack_format and None not in (other.pack_format, self.pack_format):
+            raise ValueError(f"Cannot merge a plan for pack format {other.pack_format} into one for pack format {self.pack_format}")
+        self.operations.extend(other.operations)
+
+    def files(self) -> set[tuple[str, str]]:
+        "Returns the `(kind, location)` of every file the plan touches."
+        return {(operation.kind, operation.location) for operation in self.operations}
+
+    def asDict(self) -> dict:
+        return {
+            "version": PLAN_VERSION,
+            "pack_format": self.pack_format,
+            "operations": [list(operation) for operation in self.operations]
+        }
+
+    @staticmethod
+    def fromDict(dictionary: dict, /) -> BuildPlan:
+        if dictionary.get("version") != PLAN_VERSION:
+            raise ValueError(f"Unsupported build plan version {dictionary.get('version')}, expected {PLAN_VERSION}")
+        return BuildPlan(dictionary["pack_format"], [FileOperation(*operation) for operation in dictionary["operations"]])
+
+    def export(self, path: str | pathlib.Path, /) -> None:
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.asDict(), separators=(",", ":")), "utf-8")
+
+    @staticmethod
+    def load(path: str | pathlib.Path, /) -> BuildPlan:
+        return BuildPlan.fromDict(json.loads(pathlib.Path(path).read_text("utf-8")))
+
+def target_pack(name: str, pack_format: int, /) -> beet.DataPack:
+    "Creates an empty datapack that only supports `pack_format`."
+    pack = beet.DataPack(name=f"{name}_{pack_format}")
+    if pack_format < beet.DataPack.pack_format_switch_format:
+        pack.pack_format = pack_format
+        pack.min_format = pack.max_format = None
+    else:
+        pack.pack_format = None
+        pack.min_format = pack.max_format = pack_format
+    return pack
+
+class DataPackBackend:
+    "Backend applying build plans to a beet datapack."
+
+    def __init__(self, datapack: beet.DataPack, /):
+        self.datapack = datapack
+
+    def apply(self, operation: FileOperation, /) -> beet.NamespaceFile:
+        "Applies a single operation and returns the file it materialized."
+        file = operation.materialize()
+        proxy = self.datapack[type(file)]
+
+        if operation.location not in proxy or operation.action == "create":
+            proxy[operation.location] = file
+        elif operation.action == "merge_tag":
+            proxy[operation.location].merge(file) # Tags are shared between items
+        else:
+            proxy[operation.location].append(file)
+        return file
+
+    def write(self, plan: BuildPlan, /) -> list[tuple[str, beet.NamespaceFile]]:
+        "Applies all operations of the plan. Returns the location and the file materialized by every operation."
+        return [(operation.location, self.apply(operation)) for operation in plan.operations]
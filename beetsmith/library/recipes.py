@@ -0,0 +1,204 @@
+"Submodule for generating recipes that have custom items as their result"
+
+# https://minecraft.wiki/w/Recipe#JSON_format
+
+from __future__ import annotations
+import beet
+from typing import Literal, Iterable, Iterator, Mapping, Any
+from dataclasses import dataclass
+from beetsmith.core.compat import pack_format_of
+from beetsmith.core.diagnostics import report
+from beetsmith.core.interning import thaw
+from beetsmith.core.resourcelocations import ensureTagLikeRL, ensureNoTagPathRL
+from beetsmith.library.item import CustomItem
+from beetsmith.library.vanilla import VanillaSnapshot
+
+Category = Literal["building", "redstone", "equipment", "misc"]
+
+# ╭───────────────────────────────────────────────────────────────────────────────╮
+# │                                  Recipe Specs                                 │
+# ╰───────────────────────────────────────────────────────────────────────────────╯
+
+@dataclass
+class ShapedRecipe:
+    """Spec of a shaped crafting recipe.
+
+    Parameter
+    ----------
+    result : CustomItem
+        Item crafted by the recipe
+    pattern : list[list[str | None]]
+        Rows of ingredients (item ids or `#`-prefixed item tags), `None` denotes an empty slot
+    """
+    result:     CustomItem
+    pattern:    list[list[str | None]]
+    count:      int         = 1
+    category:   Category    = "misc"
+    id:         str         = None
+    kind = "crafting_shaped"
+
+@dataclass
+class ShapelessRecipe:
+    "Spec of a shapeless crafting recipe."
+    result:         CustomItem
+    ingredients:    list[str]
+    count:          int         = 1
+    category:       Category    = "misc"
+    id:             str         = None
+    kind = "crafting_shapeless"
+
+@dataclass
+class SmithingRecipe:
+    "Spec of a smithing table recipe transforming `base` into the result."
+    result:     CustomItem
+    template:   str
+    base:       str
+    addition:   str
+    count:      int = 1
+    id:         str = None
+    kind = "smithing_transform"
+
+@dataclass
+class StonecuttingRecipe:
+    "Spec of a stonecutter recipe."
+    result:     CustomItem
+    ingredient: str
+    count:      int = 1
+    id:         str = None
+    kind = "stonecutting"
+
+RecipeSpec = ShapedRecipe | ShapelessRecipe | SmithingRecipe | StonecuttingRecipe
+
+_spec_types: dict[str, type] = {
+    "shaped":       ShapedRecipe,
+    "shapeless":    ShapelessRecipe,
+    "smithing":     SmithingRecipe,
+    "stonecutting": StonecuttingRecipe
+}
+
+# ╭───────────────────────────────────────────────────────────────────────────────╮
+# │                                   Generator                                   │
+# ╰───────────────────────────────────────────────────────────────────────────────╯
+
+class RecipeGenerator:
+    """Class for turning many recipe specs into recipe files.
+
+    Ingredients are validated once and identical ingredients share their key in shaped patterns.<br>
+    The components of each result item are serialized once per pack format, no matter in how many recipes it is used.<br>
+    Results are emitted like they are known to the pack format of the datapack (see `core.compat.emit_components`).
+
+    Example
+    ---------
+    ```
+    generator = RecipeGenerator()
+    generator.implement(datapack, [
+        ShapedRecipe(sword, [[None, "diamond", None], [None, "diamond", None], [None, "stick", None]]),
+        StonecuttingRecipe(brick, "stone", count=2),
+    ])
+    ```
+    """
+
+    alphabet = "abcdefghi"
+
+    def __init__(self, vanilla: VanillaSnapshot | None = None):
+        self.vanilla = vanilla
+        "Snapshot of vanilla defaults, that components of results equal to are left out"
+        self._ingredients: dict[str, str] = {}
+        self._results: dict[tuple[int, int, int | None], tuple[CustomItem, tuple[int, int], dict]] = {}
+        self._ids: set[tuple[int | None, str]] = set()
+        "Generated recipes by pack format, so the same specs can be generated for several target packs"
+
+    def ingredient(self, ingredient: str) -> str:
+        "Returns the validated form of an ingredient. Results are cached."
+        if (validated := self._ingredients.get(ingredient)) is None:
+            validated = self._ingredients[ingredient] = ensureTagLikeRL(ingredient)
+        return validated
+
+    def result(self, item: CustomItem, count: int = 1, pack_format: int | None = None) -> dict:
+        """Returns `item.asRecipeResult(count, pack_format)`. Results are cached per item, count and pack format until the item or its components are modified.
+
+        Every call returns a copy, so recipes never share their results.
+        """
+        key = (id(item), count, pack_format)
+        versions = (item._version, item.components._version)
+        cached = self._results.get(key)
+        if cached is None or cached[0] is not item or cached[1] != versions:
+            cached = self._results[key] = (item, versions, item.asRecipeResult(count, pack_format, vanilla=self.vanilla))
+        return thaw(cached[2])
+
+    def recipe(self, spec: RecipeSpec, /, pack_format: int | None = None) -> tuple[str, beet.Recipe]:
+        "Builds the resource location and the recipe file described by the spec, with the result emitted for `pack_format`."
+        data: dict[str, Any] = {"type": f"minecraft:{spec.kind}"}
+
+        match spec:
+            case ShapedRecipe():
+                keys: dict[str, str] = {}
+                pattern = []
+                for row in spec.pattern:
+                    pattern_row = ""
+                    for ingredient in row:
+                        if ingredient is None:
+                            pattern_row += " "
+                            continue
+                        ingredient = self.ingredient(ingredient)
+                        if ingredient not in keys:
+                            if len(keys) >= len(self.alphabet):
+                                raise ValueError("Shaped recipes can't have more than 9 different ingredients")
+                            keys[ingredient] = self.alphabet[len(keys)]
+                        pattern_row += keys[ingredient]
+                    pattern.append(pattern_row)
+                data["category"] = spec.category
+                data["pattern"] = pattern
+                data["key"] = {key: ingredient for ingredient, key in keys.items()}
+            case ShapelessRecipe():
+                data["category"] = spec.category
+                data["ingredients"] = [self.ingredient(ingredient) for ingredient in spec.ingredients]
+            case SmithingRecipe():
+                data["template"] = self.ingredient(spec.template)
+                data["base"] = self.ingredient(spec.base)
+                data["addition"] = self.ingredient(spec.addition)
+            case StonecuttingRecipe():
+                data["ingredient"] = self.ingredient(spec.ingredient)
+            case _:
+                raise TypeError(f"'{type(spec).__name__}' is not a recipe spec")
+
+        data["result"] = self.result(spec.result, spec.count, pack_format)
+
+        location = ensureNoTagPathRL(spec.id) if spec.id is not None else f"{spec.result._id_namespace}:{spec.kind}/{spec.result._id_short}"
+        if (pack_format, location) in self._ids:
+            report("duplicate-recipe", f"Multiple recipes with the id '{location}' were generated", item=spec.result.id)
+        self._ids.add((pack_format, location))
+
+        return location, beet.Recipe(data)
+
+    def generate(self, specs: Iterable[RecipeSpec], /, pack_format: int | None = None) -> Iterator[tuple[str, beet.Recipe]]:
+        "Lazily builds the recipes of all specs."
+        for spec in specs:
+            yield self.recipe(spec, pack_format)
+
+    def implement(self, datapack: beet.DataPack, specs: Iterable[RecipeSpec], /) -> int:
+        "Writes the recipes of all specs into a beet datapack of any pack format as they are built. Returns the number of recipes."
+        amount = 0
+        for location, recipe in self.generate(specs, pack_format_of(datapack)):
+            datapack[location] = recipe
+            amount += 1
+        return amount
+
+def specs_from_table(rows: Iterable[Mapping[str, Any]], items: Mapping[str, CustomItem] | Iterable[CustomItem], /) -> Iterator[RecipeSpec]:
+    """Turns rows of a table (e.g. from a CSV, YAML or JSON file) into recipe specs.
+
+    Every row needs a `type` (`shaped`, `shapeless`, `smithing` or `stonecutting`) and a `result` holding the id of a custom item in `items`.<br>
+    All other keys are passed to the according spec.
+    """
+    if not isinstance(items, Mapping):
+        items = {item.id: item for item in items}
+
+    for row in rows:
+        row = dict(row)
+        kind = row.pop("type")
+        result = row.pop("result")
+        if kind not in _spec_types:
+            raise ValueError(f"Unknown recipe type '{kind}'")
+        if result not in items:
+            raise KeyError(f"No custom item with the id '{result}' is known")
+        yield _spec_types[kind](result=items[result], **row)
@@ -0,0 +1,250 @@
+"""Submodule for searching custom items by the text of their names, lore and ability descriptions
+
+```
+index = SearchIndex.fromItems(items)
+index.query("fire sword")          # -> ['custom:fire_sword']  (items containing all terms)
+index.query("fla*", fields=["lore"]) # -> ['custom:flame_staff', 'custom:flare']
+index.export("./build/beetsmith_search.bin")
+
+MappedSearchIndex("./build/beetsmith_search.bin").query("fire")  # Same results, read from the memory-mapped file
+```
+
+Terms are lowercased words. Translated and keybind segments are kept as single terms like `<key.use>`.
+"""
+
+from __future__ import annotations
+import re
+import abc
+import mmap
+import struct
+import bisect
+import pathlib
+from typing import Iterable, Iterator
+from beetsmith.core.interning import thaw
+from beetsmith.core.text_components import get_plain_text
+from beetsmith.library.item import CustomItem
+
+FIELDS = ("item_name", "lore", "description")
+"Searchable fields. Their position is their bit in the field masks of postings."
+
+MAGIC = b"BSSI"
+FORMAT_VERSION = 1
+
+_header = struct.Struct("<4sIIIII")
+"Magic, version, amount of documents and terms, offsets of the term table and of the strings"
+_document = struct.Struct("<II")
+"Offset and length of the id in the strings"
+_term = struct.Struct("<IIII")
+"Offset and length of the term in the strings, offset (in postings) and amount of its postings"
+_posting = struct.Struct("<II")
+"Document number and field mask"
+
+_token = re.compile(r"<[^<>\s]+>|\w+")
+
+def tokenize(text: str, /) -> list[str]:
+    "Splits plain text (see `core.text_components.get_plain_text`) into lowercased terms."
+    return [token.lower() for token in _token.findall(text)]
+
+def item_texts(item: CustomItem, /) -> dict[str, str]:
+    "Returns the plain text of the searchable fields of an item."
+    components = item.components
+    texts = {}
+    if components.item_name is not None:
+        texts["item_name"] = get_plain_text(thaw(components.item_name))
+    if isinstance(components.lore, (list, tuple)) and components.lore:
+        texts["lore"] = get_plain_text(thaw(components.lore))
+    if isinstance(components.instrument, dict) and components.instrument.get("description") is not None:
+        texts["description"] = get_plain_text(thaw(components.instrument["description"]))
+    return texts
+
+class _Searchable(abc.ABC):
+    "Queries shared by the in-memory and the memory-mapped index."
+
+    @abc.abstractmethod
+    def _document(self, number: int) -> str:
+        "Id of the item with the document number"
+
+    @abc.abstractmethod
+    def _postings(self, term: str) -> Iterable[tuple[int, int]]:
+        "Document numbers and field masks of the documents containing the term"
+
+    @abc.abstractmethod
+    def _prefixed(self, prefix: str) -> Iterator[tuple[int, int]]:
+        "Document numbers and field masks of the documents containing a term starting with the prefix"
+
+    def query(self, text: str, /, fields: Iterable[str] | None = None) -> list[str]:
+        """Returns the ids of the items containing all terms of `text`, sorted by id.
+
+        Terms ending with `*` match all terms starting with them. If `fields` are given, terms only match in them.
+        """
+        mask = sum(1 << FIELDS.index(field) for field in fields) if fields is not None else (1 << len(FIELDS)) - 1
+        matches: set[int] | None = None
+        for word in text.split():
+            terms = [(term, False) for term in tokenize(word)]
+            if word.endswith("*"): # Only the last term of a word like `fire-sw*` is a prefix
+                terms.append((terms.pop()[0] if terms else "", True))
+            for term, prefix in terms:
+                postings = self._prefixed(term) if prefix else self._postings(term)
+                found = {document for document, fields in postings if fields & mask}
+                matches = found if matches is None else matches & found
+                if not matches:
+                    return []
+        return sorted(self._document(number) for number in matches or ())
+
+class SearchIndex(_Searchable):
+    "Inverted index from terms to the items containing them, with a field mask per item."
+
+    def __init__(self):
+        self.documents: list[str] = []
+        "Ids of the indexed items by their document number"
+        self.postings: dict[str, dict[int, int]] = {}
+        "Field masks of the documents containing a term by document number"
+        self._numbers: dict[str, int] = {}
+        self._document_terms: dict[int, set[str]] = {}
+        "Terms of every indexed document by document number, so removing it only touches their postings"
+        self._terms: list[str] | None = None
+        "Sorted terms for prefix queries, built on the first one"
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    @staticmethod
+    def fromItems(items: Iterable[CustomItem], /) -> SearchIndex:
+        index = SearchIndex()
+        for item in items:
+            index.add(item)
+        return index
+
+    def add(self, item: CustomItem, /) -> None:
+        "Indexes the texts of an item. An item with the same id that is already indexed gets replaced."
+        self.remove(item.id)
+        number = self._numbers[item.id] = len(self.documents)
+        self.documents.append(item.id)
+        terms = self._document_terms[number] = set()
+        for field, text in item_texts(item).items():
+            bit = 1 << FIELDS.index(field)
+            for term in tokenize(text):
+                terms.add(term)
+                postings = self.postings.get(term)
+                if postings is None:
+                    postings = self.postings[term] = {}
+                    self._terms = None
+                postings[number] = postings.get(number, 0) | bit
+
+    def remove(self, id: str, /) -> None:
+        "Removes an item from the index, if it is indexed. Its document number stays unused."
+        number = self._numbers.pop(id, None)
+        if number is None:
+            return
+        for term in self._document_terms.pop(number):
+            postings = self.postings[term]
+            del postings[number]
+            if not postings:
+                del self.postings[term]
+                self._terms = None
+
+    def _document(self, number: int) -> str:
+        return self.documents[number]
+
+    def _postings(self, term: str) -> Iterable[tuple[int, int]]:
+        return self.postings.get(term, {}).items()
+
+    def _prefixed(self, prefix: str) -> Iterator[tuple[int, int]]:
+        if self._terms is None:
+            self._terms = sorted(self.postings)
+        start = bisect.bisect_left(self._terms, prefix)
+        for term in self._terms[start:]:
+            if not term.startswith(prefix):
+                break
+            yield from self.postings[term].items()
+
+    def export(self, path: str | pathlib.Path, /) -> None:
+        """Writes the index to a binary file that `MappedSearchIndex` queries without loading it.
+
+        All integers are unsigned 32 bit little endian. After a header follow the document table, the term table
+        sorted by the UTF-8 bytes of the terms, the postings sorted by document number and the UTF-8 strings.
+        """
+        live = sorted(self._numbers.items(), key=lambda pair: pair[1])
+        renumbered = {old: new for new, (_, old) in enumerate(live)}
+        strings = bytearray()
+
+        def string(text: str) -> tuple[int, int]:
+            encoded = text.encode("utf-8")
+            strings.extend(encoded)
+            return len(strings) - len(encoded), len(encoded)
+
+        documents = b"".join(_document.pack(*string(id)) for id, _ in live)
+        terms, postings, count = bytearray(), bytearray(), 0
+        for term in sorted(self.postings, key=lambda term: term.encode("utf-8")):
+            entries = sorted((renumbered[number], mask) for number, mask in self.postings[term].items())
+            terms += _term.pack(*string(term), count, len(entries))
+            postings += b"".join(_posting.pack(*entry) for entry in entries)
+            count += len(entries)
+
+        terms_offset = _header.size + len(documents)
+        strings_offset = terms_offset + len(terms) + len(postings)
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as file:
+            file.write(_header.pack(MAGIC, FORMAT_VERSION, len(live), len(terms) // _term.size, terms_offset, strings_offset))
+            file.write(documents)
+            file.write(terms)
+            file.write(postings)
+            file.write(strings)
+
+class MappedSearchIndex(_Searchable):
+    "Read-only index querying a file written by `SearchIndex.export()` through a memory map."
+
+    def __init__(self, path: str | pathlib.Path, /):
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._documents, self._terms, self._terms_offset, self._strings_offset = _header.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"'{path}' isn't a search index of format {FORMAT_VERSION}")
+        self._postings_offset = self._terms_offset + self._terms * _term.size
+
+    def __len__(self) -> int:
+        return self._documents
+
+    def close(self) -> None:
+        self._map.close()
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self._strings_offset + offset
+        return self._map[start:start + length]
+
+    def _term(self, position: int) -> tuple[bytes, int, int]:
+        offset, length, first, count = _term.unpack_from(self._map, self._terms_offset + position * _term.size)
+        return self._string(offset, length), first, count
+
+    def _search(self, term: bytes) -> int:
+        "Position of the first term not smaller than `term`."
+        low, high = 0, self._terms
+        while low < high:
+            middle = (low + high) // 2
+            if self._term(middle)[0] < term:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _entries(self, first: int, count: int) -> Iterator[tuple[int, int]]:
+        return _posting.iter_unpack(self._map[self._postings_offset + first * _posting.size:self._postings_offset + (first + count) * _posting.size])
+
+    def _document(self, number: int) -> str:
+        return self._string(*_document.unpack_from(self._map, _header.size + number * _document.size)).decode("utf-8")
+
+    def _postings(self, term: str) -> Iterable[tuple[int, int]]:
+        encoded = term.encode("utf-8")
+        position = self._search(encoded)
+        if position < self._terms and (found := self._term(position))[0] == encoded:
+            return self._entries(found[1], found[2])
+        return ()
+
+    def _prefixed(self, prefix: str) -> Iterator[tuple[int, int]]:
+        encoded = prefix.encode("utf-8")
+        for position in range(self._search(encoded), self._terms):
+            term, first, count = self._term(position)
+            if not term.startswith(encoded):
+                break
+            yield from self._entries(first, count)
@@ -0,0 +1,89 @@
+"""Submodule for the default components of vanilla items
+
+The defaults are read from a local copy of the item components summary of [misode/mcmeta](https://github.com/misode/mcmeta/tree/summary),
+which can be downloaded with `VanillaSnapshot.download()`.
+"""
+
+from __future__ import annotations
+import json
+import pathlib
+from typing import Any
+from beetsmith.core.interning import thaw
+from beetsmith.library.components import ItemComponents
+
+VANILLA_COMPONENTS_URL = "https://raw.githubusercontent.com/misode/mcmeta/{ref}/item_components/data.json"
+"URL of the item components summary. `ref` is `summary` for the latest version or e.g. `1.21.5-summary`."
+
+class VanillaSnapshot:
+    """Class holding the default components of all vanilla items of a Minecraft version.
+
+    Example
+    ---------
+    ```
+    vanilla = VanillaSnapshot.load("./vanilla/item_components.json")
+    vanilla.strip(item.components.asDict(), "minecraft:music_disc_11")
+    ```
+    """
+
+    def __init__(self, data: dict[str, dict[str, Any] | list[dict[str, Any]]], /):
+        self._data = data
+        self._defaults: dict[str, dict[str, Any]] = {}
+
+    def __contains__(self, item: str) -> bool:
+        return item.removeprefix("minecraft:") in self._data
+
+    @staticmethod
+    def load(path: str | pathlib.Path, /) -> VanillaSnapshot:
+        return VanillaSnapshot(json.loads(pathlib.Path(path).read_text("utf-8")))
+
+    @staticmethod
+    def download(path: str | pathlib.Path, /, ref: str = "summary") -> VanillaSnapshot:
+        """Downloads the item components summary (~800 kB) to `path` and loads it.
+
+        This will issue a HTTP request.
+        """
+        import requests
+
+        res = requests.get(VANILLA_COMPONENTS_URL.format(ref=ref))
+        res.raise_for_status()
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(res.content)
+        return VanillaSnapshot(res.json())
+
+    def defaults(self, item: str, /) -> dict[str, Any]:
+        """Returns the default components of a vanilla item like `ItemComponents.asDict()` does, or an empty dict for unknown items.
+
+        The result is cached, so it must not be mutated.
+        """
+        query = item.removeprefix("minecraft:")
+        if (cached := self._defaults.get(query)) is not None:
+            return cached
+
+        data = self._data.get(query, {})
+        if isinstance(data, list): # Older summaries list components as `{"type": ..., "value": ...}`
+            data = {entry["type"]: entry.get("value", {}) for entry in data}
+        defaults = self._defaults[query] = {
+            (component if ":" in component else f"minecraft:{component}"): value
+            for component, value in data.items()
+        }
+        return defaults
+
+    def components(self, item: str, /) -> ItemComponents:
+        "Returns the default components of a vanilla item as a new component stack."
+        return ItemComponents.fromDict(self.defaults(item))
+
+    def strip(self, components: dict[str, Any], item: str, /) -> dict[str, Any]:
+        """Returns `components` without the components that don't change anything on `item`.
+
+        These are components whose value equals the item's default and removals of components the item doesn't have by default.
+        """
+        defaults = self.defaults(item)
+        out = {}
+        for key, value in components.items():
+            if key.startswith("!"):
+                if key[1:] in defaults:
+                    out[key] = value
+            elif key not in defaults or defaults[key] != thaw(value):
+                out[key] = value
+        return out
@@ -0,0 +1,190 @@
+"""Backends writing build plans (see `library.plan`) without a beet project
+
+```
+plan = BuildPlan(88)
+for item in items:
+    plan.extend(item.lower(88))
+
+DirectoryBackend("./build/my_pack").write(plan)
+ZipBackend("./build/my_pack.zip").write(plan)
+DryRunBackend().write(plan)  # -> {"operations": 1250, "files": 1100, "bytes": 2345678, ...}
+```
+"""
+
+import os
+import pathlib
+import zipfile
+import warnings
+import beet
+from beet.library.base import get_output_scope
+from beetsmith.core.diagnostics import report
+from beetsmith.library.plan import BuildPlan, DataPackBackend, FileOperation, target_pack
+from beetsmith.toolchain.output import IncrementalWriter, pack_files
+
+def plan_datapack(plan: BuildPlan, /, name: str = "beetsmith", description: str = "") -> beet.DataPack:
+    "Applies a plan to a new datapack supporting the plan's pack format."
+    datapack = target_pack(name, plan.pack_format) if plan.pack_format is not None else beet.DataPack(name=name)
+    datapack.description = description
+    DataPackBackend(datapack).write(plan)
+    return datapack
+
+class DirectoryBackend:
+    "Backend writing plans to a datapack directory. Only new or changed files are written and stale ones deleted."
+
+    def __init__(self, directory: str | pathlib.Path, /, description: str = ""):
+        self.directory = pathlib.Path(directory)
+        self.description = description
+
+    def write(self, plan: BuildPlan, /) -> dict[str, int]:
+        datapack = plan_datapack(plan, self.directory.name, self.description)
+        return IncrementalWriter(self.directory).write(pack_files(datapack))
+
+ZIP_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+"Timestamp of all zip entries, the earliest one zip supports, so equal inputs result in byte-identical archives"
+
+def file_path(operation: FileOperation, pack_format: int | None, /) -> str:
+    "Returns the path of the file an operation targets inside a datapack of `pack_format`."
+    namespace, path = operation.location.split(":", 1) if ":" in operation.location else ("minecraft", operation.location)
+    file_type = operation.file_type()
+    scope = get_output_scope(file_type.scope, pack_format)
+    return f"data/{namespace}/{'/'.join(scope)}/{path}{file_type.extension}"
+
+class ZipStream:
+    """Class streaming build plans into a zipped datapack with bounded memory.
+
+    Created files are written as soon as they are added. Only tags and functions, which can still be merged with
+    files added later, are kept in memory until the stream is closed and are then written sorted by path.<br>
+    Like with all other backends, a file that is created again replaces the earlier one. The replaced entries are
+    dropped from the archive when the stream is closed.<br>
+    Entries get fixed timestamps and attributes, so adding the same plans in the same order results in a byte-identical zip.
+    The archive is written to a temporary file that only replaces `path` once the stream is closed.
+
+    Example
+    ---------
+    ```
+    with ZipStream("./build/my_pack.zip", 88) as stream:
+        for item in items:
+            stream.add(item.lower(88))
+    ```
+    """
+
+    def __init__(self, path: str | pathlib.Path, pack_format: int | None, /, description: str = ""):
+        self.path = pathlib.Path(path)
+        self.pack_format = pack_format
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._temporary = self.path.with_name(self.path.name + ".tmp")
+        self._archive = zipfile.ZipFile(self._temporary, "w", zipfile.ZIP_DEFLATED)
+        self._written: set[str] = set()
+        self._pending: dict[str, beet.NamespaceFile] = {}
+        self._created: set[str] = set()
+        "Paths of created tags and functions, which are still pending"
+        self._replaced = False
+        "Whether the archive has entries replaced by later ones"
+        self.report = {"written": 0, "duplicates": 0}
+
+        mcmeta = target_pack(self.path.stem, pack_format) if pack_format is not None else beet.DataPack(name=self.path.stem)
+        mcmeta.description = description
+        self._write("pack.mcmeta", mcmeta.mcmeta.ensure_serialized())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._archive.close()
+            self._temporary.unlink(missing_ok=True)
+
+    @staticmethod
+    def _entry(archive: zipfile.ZipFile, path: str, content: str | bytes) -> None:
+        info = zipfile.ZipInfo(path, date_time=ZIP_TIMESTAMP)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.create_system = 3
+        info.external_attr = 0o644 << 16
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning) # Duplicate names are dropped in `close()`
+            archive.writestr(info, content)
+
+    def _write(self, path: str, content: str | bytes) -> None:
+        self._entry(self._archive, path, content)
+        self._written.add(path)
+        self.report["written"] += 1
+
+    def _duplicate(self, operation: FileOperation) -> None:
+        report("duplicate-file", f"'{operation.location}' was created more than once in '{self.path}'. The latter overwrites the other")
+        self.report["duplicates"] += 1
+
+    def add(self, plan: BuildPlan, /) -> None:
+        "Writes the created files of a plan and keeps its tags and functions for merging."
+        if plan.pack_format is not None and plan.pack_format != self.pack_format:
+            raise ValueError(f"Cannot add a plan for pack format {plan.pack_format} to a zip for pack format {self.pack_format}")
+
+        for operation in plan.operations:
+            path = file_path(operation, self.pack_format)
+
+            if operation.action == "create":
+                if issubclass(operation.file_type(), (beet.TagFile, beet.Function)): # Files added later may still be merged into it
+                    if path in self._created:
+                        self._duplicate(operation)
+                    self._created.add(path)
+                    self._pending[path] = operation.materialize()
+                    continue
+                if path in self._written:
+                    self._duplicate(operation)
+                    self._replaced = True
+                    self.report["written"] -= 1
+                self._write(path, operation.materialize().ensure_serialized())
+
+            elif (pending := self._pending.get(path)) is None:
+                self._pending[path] = operation.materialize()
+            elif operation.action == "merge_tag":
+                pending.merge(operation.materialize())
+            else:
+                pending.append(operation.materialize())
+
+    def close(self) -> dict[str, int]:
+        "Writes the kept tags and functions and moves the archive to `path`. Returns the amount of written entries."
+        for path in sorted(self._pending):
+            self._write(path, self._pending[path].ensure_serialized())
+        self._pending.clear()
+        self._archive.close()
+        if self._replaced:
+            self._drop_replaced()
+        os.replace(self._temporary, self.path)
+        return self.report
+
+    def _drop_replaced(self) -> None:
+        "Rewrites the archive with only the last entry of every path."
+        compacted = self._temporary.with_name(self._temporary.name + ".compact")
+        with zipfile.ZipFile(self._temporary) as source, zipfile.ZipFile(compacted, "w", zipfile.ZIP_DEFLATED) as target:
+            entries = source.infolist()
+            last = {info.filename: index for index, info in enumerate(entries)}
+            for index, info in enumerate(entries):
+                if last[info.filename] == index:
+                    self._entry(target, info.filename, source.read(info))
+        os.replace(compacted, self._temporary)
+
+class ZipBackend:
+    "Backend writing plans to a zipped datapack. Use `ZipStream` to write plans while they are still being lowered."
+
+    def __init__(self, path: str | pathlib.Path, /, description: str = ""):
+        self.path = pathlib.Path(path)
+        self.description = description
+
+    def write(self, plan: BuildPlan, /) -> dict[str, int]:
+        with ZipStream(self.path, plan.pack_format, description=self.description) as stream:
+            stream.add(plan)
+        return stream.report
+
+class DryRunBackend:
+    "Backend only counting what a plan would write."
+
+    def write(self, plan: BuildPlan, /) -> dict[str, int]:
+        report = {"operations": len(plan), "files": 0, "bytes": 0}
+        for operation in plan.operations:
+            report[operation.action] = report.get(operation.action, 0) + 1
+        for _, content in pack_files(plan_datapack(plan)):
+            report["files"] += 1
+            report["bytes"] += len(content.encode("utf-8") if isinstance(content, str) else content)
+        return report
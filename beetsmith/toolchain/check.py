@@ -0,0 +1,138 @@
+"""Linter validating BeetSmith definition files without building them.
+
+Every definition is decoded, validated and instantiated, which checks its type, parameters, behaviour arguments,
+resource locations and text components, and is then lowered to a build plan.<br>
+Results are cached per content hash, so unchanged files are skipped on the next run.
+"""
+
+import json
+import hashlib
+import pathlib
+import functools
+import beetsmith
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ProcessPoolExecutor
+from beetsmith.core.diagnostics import DiagnosticCollector
+from beetsmith.library.item import __minecraft_data_version__
+from beetsmith.toolchain.file import BeetSmithDefinition, BeetSmithDefinitionFile
+
+CACHE = ".beetsmith-check.json"
+
+POOL_THRESHOLD = 64
+"Amount of files to check below which no worker processes are started, since starting them takes longer"
+
+@dataclass
+class CheckResult:
+    "Result of checking a single definition file."
+    id:         str | None                  = None
+    errors:     list[str]                   = field(default_factory=list)
+    warnings:   list[str]                   = field(default_factory=list)
+
+def check_text(text: str, /) -> CheckResult:
+    "Checks the content of a definition file."
+    result = CheckResult()
+    collector = DiagnosticCollector()
+    with collector.active():
+        try:
+            data = BeetSmithDefinitionFile.parse(text)
+            result.id = data.get("id") if isinstance(data, dict) else None
+            item = BeetSmithDefinition(**data).instance()
+            item.lower(__minecraft_data_version__)
+        except Exception as e:
+            result.errors.append(f"{type(e).__name__}: {e}")
+    result.warnings = [diagnostic.message for diagnostic in collector.diagnostics.values()]
+    return result
+
+@functools.cache
+def fingerprint() -> str:
+    "Identifies the installed BeetSmith source, so cached results are discarded when it changes."
+    root = pathlib.Path(beetsmith.__file__).parent
+    digest = hashlib.sha1()
+    for path in sorted(root.rglob("*.py")):
+        stat = path.stat()
+        digest.update(f"{path.relative_to(root)}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+    return digest.hexdigest()
+
+class CheckCache:
+    "Cache of check results by content hash, with the stat of every file to skip hashing unchanged files."
+
+    def __init__(self, path: str | pathlib.Path | None, /):
+        self.path = pathlib.Path(path) if path is not None else None
+        self.files: dict[str, tuple[int, int, str]] = {}
+        self.results: dict[str, CheckResult] = {}
+
+        if self.path is None:
+            return
+        try:
+            data = json.loads(self.path.read_text("utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if data.get("fingerprint") != fingerprint():
+            return
+        self.files = {path: tuple(entry) for path, entry in data["files"].items()}
+        self.results = {digest: CheckResult(**result) for digest, result in data["results"].items()}
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        used = {entry[2] for entry in self.files.values()}
+        data = {
+            "fingerprint": fingerprint(),
+            "files": self.files,
+            "results": {digest: asdict(result) for digest, result in self.results.items() if digest in used}
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(data, separators=(",", ":")), "utf-8")
+
+def check(paths: list[pathlib.Path], /, jobs: int = 1, cache: str | pathlib.Path | None = None) -> dict:
+    """Checks definition files, across `jobs` worker processes if there are enough files to check. Returns a report.
+
+    If a `cache` file is given, results of files whose content didn't change since the last check are taken from it.
+    """
+    store = CheckCache(cache)
+    files: dict[str, str] = {}
+    "Content hashes by path"
+    pending: dict[str, str] = {}
+    "Contents to check by content hash"
+
+    for path in paths:
+        key = str(path)
+        stat = path.stat()
+        entry = store.files.get(key)
+        if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size) and entry[2] in store.results:
+            files[key] = entry[2]
+            continue
+
+        content = path.read_bytes()
+        digest = hashlib.sha1(content).hexdigest()
+        store.files[key] = (stat.st_mtime_ns, stat.st_size, digest)
+        files[key] = digest
+        if digest not in store.results:
+            pending[digest] = content.decode("utf-8", errors="replace")
+
+    if jobs > 1 and len(pending) >= POOL_THRESHOLD:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(check_text, pending.values(), chunksize=max(1, len(pending) // (jobs * 4)))
+            store.results.update(zip(pending.keys(), results))
+    else:
+        store.results.update((digest, check_text(text)) for digest, text in pending.items())
+
+    for key in [key for key in store.files if key not in files]:
+        del store.files[key] # Files that don't exist anymore
+    store.save()
+
+    checked = sum(1 for digest in files.values() if digest in pending) # Per path, since files may share their content
+    report = {"checked": checked, "cached": len(files) - checked, "errors": {}, "warnings": {}}
+    ids: dict[str, str] = {}
+    for key, digest in files.items():
+        result = store.results[digest]
+        if result.errors:
+            report["errors"][key] = result.errors
+        if result.warnings:
+            report["warnings"][key] = result.warnings
+        if result.id is not None and not result.errors:
+            if result.id in ids:
+                report["errors"].setdefault(key, []).append(f"The id '{result.id}' is already used by '{ids[result.id]}'")
+            else:
+                ids[result.id] = key
+    return report
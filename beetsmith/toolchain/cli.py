@@ -0,0 +1,238 @@
+"""Standalone command line interface building datapacks from BeetSmith definitions without a beet project.
+
+---
+#### Usage
+```
+beetsmith build ./src ./build                        # writes ./build/beetsmith
+beetsmith build ./src ./build --target 71 --jobs 8   # additionally writes ./build/beetsmith_71
+beetsmith build ./src ./build --zip --dry-run
+beetsmith build ./src ./build --trace trace.json     # records spans of all worker processes
+beetsmith check ./src                                # validates definitions, e.g. in a pre-commit hook
+beetsmith build ./src ./part --shard 2/4             # builds a quarter of the items and writes a shard manifest
+beetsmith merge ./build ./part*/*.shard-*.json       # merges the manifests of all shards
+```
+`SRC` is either a datapack with definitions in `data/*/beetsmith/` or a directory of YAML and JSON definition files.
+"""
+
+import os
+import sys
+import time
+import pathlib
+import argparse
+import functools
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+from beetsmith.core.diagnostics import Diagnostic, DiagnosticCollector, report
+from beetsmith.core.tracing import Tracer, span
+from beetsmith.library.item import __minecraft_data_version__
+from beetsmith.library.plan import BuildPlan
+from beetsmith.toolchain.backends import DirectoryBackend, DryRunBackend, ZipBackend, ZipStream
+from beetsmith.toolchain.check import CACHE, check
+from beetsmith.toolchain.file import DEFINITION_EXTENSIONS, parse_from_file, definition_files
+from beetsmith.toolchain.shard import MergeConflict, Shard, ShardManifest, merge
+
+def source_files(directory: str | pathlib.Path, /) -> list[pathlib.Path]:
+    "Returns the definition files of a datapack, or all YAML and JSON files below `directory` if it isn't one. Hidden files are left out."
+    directory = pathlib.Path(directory)
+    if (directory / "data").is_dir():
+        return [path for _, path in definition_files(directory)]
+    return sorted(path for path in directory.rglob("*") if path.suffix in DEFINITION_EXTENSIONS and not path.name.startswith(".") and path.is_file())
+
+LoweredFile = tuple[pathlib.Path, str | None, dict[int, BuildPlan] | str, list[Diagnostic], list[dict]]
+
+def lower_file(path: pathlib.Path, pack_formats: tuple[int, ...], shard: Shard | None = None, trace: bool = False) -> LoweredFile:
+    """Loads a definition file and lowers the item to a plan per pack format.
+    Returns the path, the item id, the plans or an error, the diagnostics reported meanwhile and the recorded trace events.
+
+    Items that aren't in `shard` aren't lowered and get no plans. Trace events are only recorded if `trace` is set.
+    """
+    collector = DiagnosticCollector()
+    tracer = Tracer()
+    with collector.active(), tracer.active() if trace else contextlib.nullcontext(), span("lower_file", path=str(path)):
+        try:
+            item = parse_from_file(path)
+            if shard is not None and not shard.includes(item.id):
+                result = {}
+            else:
+                result = {pack_format: item.lower(pack_format) for pack_format in pack_formats}
+            id = item.id
+        except Exception as e:
+            id, result = None, f"{type(e).__name__}: {e}"
+    return path, id, result, list(collector.diagnostics.values()), tracer.events
+
+def lower_files(paths: list[pathlib.Path], pack_formats: tuple[int, ...], jobs: int, shard: Shard | None = None, trace: bool = False) -> Iterator[LoweredFile]:
+    "Lowers all files, across `jobs` worker processes if more than one. Results are yielded in the order of `paths`."
+    lower = functools.partial(lower_file, pack_formats=pack_formats, shard=shard, trace=trace)
+    if jobs <= 1 or len(paths) <= 1:
+        yield from map(lower, paths)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(lower, paths, chunksize=max(1, len(paths) // (jobs * 4)))
+
+def build(source: str | pathlib.Path, output: str | pathlib.Path, /, name: str = "beetsmith", pack_format: int = __minecraft_data_version__, targets: list[int] = [], jobs: int = 1, zip: bool = False, dry_run: bool = False, shard: Shard | None = None, trace: str | pathlib.Path | None = None) -> dict:
+    """Builds the definitions in `source` and writes a datapack per pack format to `output`. Returns a report of the build.
+
+    The datapack for `pack_format` is called `name`, the ones for `targets` get their pack format appended.<br>
+    If a `shard` is given, only its items are built and a shard manifest is written next to every datapack (see `toolchain.shard`).
+    Warnings of all files are deduplicated in the report's `diagnostics`.<br>
+    If a `trace` file is given, spans of the build and of every lowered file are written to it, keeping the process and thread of each worker (see `core.tracing`).
+    """
+    start = time.perf_counter()
+    output = pathlib.Path(output)
+    pack_formats = tuple(dict.fromkeys([pack_format, *targets]))
+    pack_names = {format: name if format == pack_format else f"{name}_{format}" for format in pack_formats}
+    plans = {format: BuildPlan(format) for format in pack_formats}
+    errors: dict[str, str] = {}
+    ids: dict[str, pathlib.Path] = {}
+    written = {}
+    streams: dict[int, ZipStream] = {}
+    manifests = {format: ShardManifest(pack_names[format], shard, plan=BuildPlan(format)) for format in pack_formats} if shard is not None else {}
+    collector = DiagnosticCollector()
+    tracer = Tracer() if trace is not None else None
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(collector.active())
+        if tracer is not None:
+            stack.enter_context(tracer.active())
+        stack.enter_context(span("build"))
+        if zip and not dry_run: # Zips are written while items are still being lowered
+            streams = {format: stack.enter_context(ZipStream(output / f"{pack_names[format]}.zip", format)) for format in pack_formats}
+
+        paths = source_files(source)
+        for path, id, result, diagnostics, events in lower_files(paths, pack_formats, jobs, shard, trace=tracer is not None):
+            collector.extend(diagnostics)
+            if tracer is not None:
+                tracer.extend(events)
+            if isinstance(result, str):
+                errors[str(path)] = result
+                continue
+            if not result: # In another shard
+                continue
+            if id in ids:
+                report("duplicate-definition", f"'{id}' is defined in both '{ids[id]}' and '{path}'. The latter overwrites the other", item=id)
+            ids[id] = path
+            for format, plan in result.items():
+                if format in manifests:
+                    manifests[format].items.append(id)
+                    manifests[format].plan.extend(plan)
+                if streams:
+                    streams[format].add(plan)
+                else:
+                    plans[format].extend(plan)
+
+    if streams:
+        written = {pack_names[format]: stream.report for format, stream in streams.items()}
+    else:
+        with tracer.active() if tracer is not None else contextlib.nullcontext(), span("write"):
+            for format, plan in plans.items():
+                backend = DryRunBackend() if dry_run else DirectoryBackend(output / pack_names[format])
+                written[pack_names[format]] = backend.write(plan)
+
+    if not dry_run:
+        for format, manifest in manifests.items():
+            manifest.export(output / shard.manifest_name(pack_names[format]))
+    if tracer is not None:
+        tracer.export(trace)
+
+    return {
+        "items":    len(ids),
+        "errors":   errors,
+        "diagnostics": collector,
+        "packs":    written,
+        "seconds":  time.perf_counter() - start
+    }
+
+def merge_shards(manifests: list[str | pathlib.Path], output: str | pathlib.Path, /, zip: bool = False, partial: bool = False) -> dict:
+    """Merges shard manifests and writes a datapack per datapack name to `output`. Returns a report of the merge.
+
+    Raises a `MergeConflict` if shards are missing, unless `partial` is set, or write different contents to the same file.
+    """
+    start = time.perf_counter()
+    output = pathlib.Path(output)
+    packs: dict[str, list[ShardManifest]] = {}
+    for path in manifests:
+        manifest = ShardManifest.load(path)
+        packs.setdefault(manifest.name, []).append(manifest)
+
+    plans = {name: merge(shards, partial=partial) for name, shards in sorted(packs.items())} # Nothing is written unless all packs merge
+    written = {}
+    for name, plan in plans.items():
+        backend = ZipBackend(output / f"{name}.zip") if zip else DirectoryBackend(output / name)
+        written[name] = backend.write(plan)
+
+    return {
+        "items":    len({id for shards in packs.values() for manifest in shards for id in manifest.items}),
+        "packs":    written,
+        "seconds":  time.perf_counter() - start
+    }
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="beetsmith", description="Build datapacks from BeetSmith definitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="Build datapacks from definitions")
+    build_parser.add_argument("source", help="Datapack or directory containing definitions")
+    build_parser.add_argument("output", help="Directory the datapacks are written to")
+    build_parser.add_argument("--name", default="beetsmith", help="Name of the datapack")
+    build_parser.add_argument("--pack-format", type=int, default=__minecraft_data_version__, help="Pack format of the datapack")
+    build_parser.add_argument("--target", type=int, action="append", default=[], help="Pack format of an additional datapack")
+    build_parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="Amount of worker processes")
+    build_parser.add_argument("--zip", action="store_true", help="Write zipped datapacks")
+    build_parser.add_argument("--dry-run", action="store_true", help="Only count what would be written")
+    build_parser.add_argument("--shard", default=None, metavar="K/N", help="Only build shard K of N and write a shard manifest")
+    build_parser.add_argument("--shard-by", choices=["namespace", "id"], default="namespace", help="Whether items are sharded by their namespace or their whole id")
+    build_parser.add_argument("--trace", default=None, metavar="FILE", help="Write a Chrome trace of the build to FILE")
+    check_parser = commands.add_parser("check", help="Validate definitions without building them")
+    check_parser.add_argument("source", help="Datapack or directory containing definitions")
+    check_parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="Amount of worker processes")
+    check_parser.add_argument("--cache", default=None, help=f"Cache file of results (default: '{CACHE}' in the source directory)")
+    check_parser.add_argument("--no-cache", action="store_true", help="Check all files again")
+    merge_parser = commands.add_parser("merge", help="Merge the shard manifests of a sharded build")
+    merge_parser.add_argument("output", help="Directory the datapacks are written to")
+    merge_parser.add_argument("manifests", nargs="+", help="Shard manifests written by 'build --shard'")
+    merge_parser.add_argument("--zip", action="store_true", help="Write zipped datapacks")
+    merge_parser.add_argument("--partial", action="store_true", help="Merge even if shards are missing")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        try:
+            shard = Shard.parse(args.shard, by=args.shard_by) if args.shard is not None else None
+        except ValueError as e:
+            parser.error(f"argument --shard: {e}")
+        report = build(args.source, args.output, name=args.name, pack_format=args.pack_format, targets=args.target, jobs=args.jobs, zip=args.zip, dry_run=args.dry_run, shard=shard, trace=args.trace)
+        for path, error in report["errors"].items():
+            print(f"{path}: {error}", file=sys.stderr)
+        if report["diagnostics"]:
+            print(report["diagnostics"].summary(), file=sys.stderr)
+        for pack, written in report["packs"].items():
+            print(f"{pack}: {', '.join(f'{value} {key}' for key, value in written.items())}")
+        print(f"{report['items']} items in {report['seconds']:.2f}s")
+        return 1 if report["errors"] else 0
+
+    if args.command == "merge":
+        try:
+            report = merge_shards(args.manifests, args.output, zip=args.zip, partial=args.partial)
+        except MergeConflict as e:
+            print(e, file=sys.stderr)
+            return 1
+        for pack, written in report["packs"].items():
+            print(f"{pack}: {', '.join(f'{value} {key}' for key, value in written.items())}")
+        print(f"{report['items']} items in {report['seconds']:.2f}s")
+        return 0
+
+    if args.command == "check":
+        start = time.perf_counter()
+        cache = None if args.no_cache else (args.cache or pathlib.Path(args.source) / CACHE)
+        report = check(source_files(args.source), jobs=args.jobs, cache=cache)
+        for path, messages in report["warnings"].items():
+            for message in messages:
+                print(f"{path}: warning: {message}", file=sys.stderr)
+        for path, messages in report["errors"].items():
+            for message in messages:
+                print(f"{path}: {message}", file=sys.stderr)
+        print(f"{report['checked']} checked, {report['cached']} cached, {len(report['errors'])} with errors in {time.perf_counter() - start:.2f}s")
+        return 1 if report["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
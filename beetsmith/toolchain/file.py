@@ -1,31 +1,47 @@
 import re
+import time
 import yaml, json
 import pathlib
 import beet
 import inspect
 from pydantic import BaseModel, RootModel, Field, field_validator, model_validator, ConfigDict
-from typing import Any, Dict, List, Optional, ClassVar
-from beetsmith.library.item import Item
+from typing import Any, Dict, List, Optional, ClassVar, Iterator
+from beetsmith.library.item import CustomItem
+from beetsmith.core.metrics import BuildMetrics
+from beetsmith.core.tracing import span
 
-_available_types = [Item]
+_available_types = [CustomItem]
 
-def parse_from_file(file: str | pathlib.Path, /) -> Item:
-    """Instanciates an Item object from a file.
+DEFINITION_EXTENSIONS = (".yaml", ".yml", ".json")
+"File extensions of definition files, both inside and outside of datapacks"
+
+def parse_from_file(file: str | pathlib.Path, /) -> CustomItem:
+    """Instanciates an item object from a file.
 
     Supported are YAML and JSON.
     """
 
-    suffix = file.suffix if isinstance(file, pathlib.Path) else file.split(":")[-1]
+    suffix = pathlib.Path(file).suffix
+    if suffix not in DEFINITION_EXTENSIONS:
+        raise ValueError(f"Unsupported definition file type '{suffix}'")
 
     with open(file, 'r', encoding="utf-8") as f:
         match suffix:
-            case ".yml" | "yaml":
-                data: dict = yaml.safe_load(f)
             case ".json":
                 data: dict = json.load(f)
+            case _:
+                data: dict = yaml.safe_load(f)
 
     return BeetSmithDefinition(**data).instance()
 
+def definition_files(directory: str | pathlib.Path, /) -> Iterator[tuple[str, pathlib.Path]]:
+    "Yields the resource location and the path of every BeetSmith definition file in the datapack at `directory` in a stable order."
+    root = pathlib.Path(directory)
+    for path in sorted(path for path in root.glob("data/*/beetsmith/**/*") if path.suffix in DEFINITION_EXTENSIONS and path.is_file()):
+        namespace = path.relative_to(root).parts[1]
+        location = path.relative_to(root / "data" / namespace / "beetsmith").with_suffix("").as_posix()
+        yield f"{namespace}:{location}", path
+
 class BeetSmithBehavior(RootModel[Dict[str, Dict[str, Any]]]):
 
     @field_validator('root')
@@ -62,12 +78,12 @@ class BeetSmithDefinition(BaseModel):
 
         return values
 
-    def instance(self) -> Item:
+    def instance(self) -> CustomItem:
         "Returns an Instance of the object described in the definition."
 
         obj_cls: type = next(t for t in _available_types if t.__name__ == self.type)
         try:
-            instance: Item = obj_cls(**self.params)
+            instance: CustomItem = obj_cls(**self.params)
         except TypeError as e:
             msg = str(e)
             if match := re.search(r"missing (\d+) required positional argument: '([^']+)'", msg):
@@ -101,11 +117,15 @@ class BeetSmithDefinition(BaseModel):
                 setattr(instance.components, component, override)
             else:
                 raise NotImplementedError(f"Can't override component of type '{type(current).__name__}' with '{type(override).__name__}'")
+        instance.touch() # Overrides are partly applied in place
 
         return instance
 
 class BeetSmithDefinitionFile(beet.YamlFile):
-    "Class representing a BeetSmith YAML definition file inside a datapack."
+    """Class representing a BeetSmith YAML definition file inside a datapack.
+
+    Beet assigns file types by extension, so `.yml` and `.json` definitions are loaded as the subclasses in `DEFINITION_FILE_TYPES`.
+    """
     
     scope: ClassVar[beet.NamespaceFileScope] = ("beetsmith",)
     extension: ClassVar[str] = ".yaml"
@@ -113,22 +133,71 @@ class BeetSmithDefinitionFile(beet.YamlFile):
 
     def __post_init__(self):
         super().__post_init__()
-        self.decoder = BeetSmithDefinitionFile.decoder
-        self.encoder = BeetSmithDefinitionFile.encoder
+        self.decoder = type(self).decoder
+        self.encoder = type(self).encoder
 
     @staticmethod
     def decoder(str: str) -> BeetSmithDefinition:
+        return BeetSmithDefinition(**BeetSmithDefinitionFile.parse(str))
+
+    @staticmethod
+    def parse(str: str) -> dict:
+        "Parses the content of a definition file without validating it."
         try:
             data: dict = yaml.safe_load(str)
         except:
             data: dict = json.loads(str)
 
-        return BeetSmithDefinition(**data)
+        return data
 
     @staticmethod
     def encoder(data: BeetSmithDefinition) -> str:
         return yaml.dump(data.model_dump())
     
     @property
-    def instance(self) -> Item:
+    def instance(self) -> CustomItem:
         return self.data.instance()
+
+class BeetSmithYmlDefinitionFile(BeetSmithDefinitionFile):
+    "Class representing a BeetSmith YAML definition file with the extension `.yml` inside a datapack."
+    extension: ClassVar[str] = ".yml"
+
+class BeetSmithJsonDefinitionFile(BeetSmithDefinitionFile):
+    "Class representing a BeetSmith JSON definition file inside a datapack."
+    extension: ClassVar[str] = ".json"
+
+    @staticmethod
+    def encoder(data: BeetSmithDefinition) -> str:
+        return json.dumps(data.model_dump(), indent=2)
+
+DEFINITION_FILE_TYPES: tuple[type[BeetSmithDefinitionFile], ...] = (BeetSmithDefinitionFile, BeetSmithYmlDefinitionFile, BeetSmithJsonDefinitionFile)
+"File types of definition files by extension, see `DEFINITION_EXTENSIONS`"
+
+def load_definition(file: BeetSmithDefinitionFile, /, metrics: BuildMetrics | None = None) -> CustomItem:
+    """Decodes and validates a definition file and instanciates the object described in it.
+
+    If `metrics` are given, the phases are counted and timed in them. They are also traced as spans (see `core.tracing`).
+    """
+    start = time.perf_counter()
+    try:
+        with span("decode", file=file.source_path and str(file.source_path)):
+            data = BeetSmithDefinitionFile.parse(file.text)
+        decoded = time.perf_counter()
+        with span("validate", id=data.get("id")):
+            definition = BeetSmithDefinition(**data)
+        validated = time.perf_counter()
+        with span("instantiate", item=data.get("id")):
+            instance = definition.instance()
+        instantiated = time.perf_counter()
+    except Exception:
+        if metrics is not None:
+            metrics.count("definitions_total", status="failed")
+        raise
+
+    file.data = definition
+    if metrics is not None:
+        metrics.count("definitions_total", status="loaded")
+        metrics.observe("decode_seconds", decoded - start)
+        metrics.observe("validate_seconds", validated - decoded)
+        metrics.observe("instantiate_seconds", instantiated - validated)
+    return instance
@@ -0,0 +1,79 @@
+"""Dependency graph from definition files to the files generated for them.
+
+Every definition's build plan is kept, together with the generated files each of its operations targets.<br>
+When definitions change, only the files they touched before or touch now are rendered again.
+Shared files like tags and functions are merged from the operations of all definitions contributing to them.
+"""
+
+import beet
+import pathlib
+from beetsmith.library.plan import BuildPlan, FileOperation
+from beetsmith.toolchain.backends import file_path
+
+def definition_order(definition: str, /) -> tuple[str, ...]:
+    "Sort key of definitions by the parts of their path, which is the order `sorted()` gives paths and full builds process files in."
+    return pathlib.PurePath(definition).parts
+
+class DependencyGraph:
+    """Class mapping definitions to the generated files they contribute to and back.
+
+    Example
+    ---------
+    ```
+    graph = DependencyGraph(pack_format=88)
+    graph.patch({"custom:sword": sword.lower(88)})  # -> {"data/custom/loot_table/item/sword.json": "...", ...}
+    graph.patch({"custom:sword": None})              # -> {"data/custom/loot_table/item/sword.json": None, ...}
+    ```
+    """
+
+    def __init__(self, pack_format: int | None):
+        self.pack_format = pack_format
+        self.operations: dict[str, dict[str, list[FileOperation]]] = {}
+        "Operations of every definition by the path of the file they target"
+        self.contributors: dict[str, set[str]] = {}
+        "Definitions contributing to every generated file by its path"
+
+    def __len__(self) -> int:
+        return len(self.contributors)
+
+    def update(self, definition: str, plan: BuildPlan | None, /) -> set[str]:
+        "Replaces the plan of a definition or removes the definition if `plan` is `None`. Returns the paths of all affected files."
+        affected = set(self.operations.pop(definition, {}))
+        for path in affected:
+            contributors = self.contributors[path]
+            contributors.discard(definition)
+            if not contributors:
+                del self.contributors[path]
+
+        if plan is not None:
+            operations: dict[str, list[FileOperation]] = {}
+            for operation in plan.operations:
+                operations.setdefault(file_path(operation, self.pack_format), []).append(operation)
+            self.operations[definition] = operations
+            for path in operations:
+                self.contributors.setdefault(path, set()).add(definition)
+            affected.update(operations)
+        return affected
+
+    def render(self, path: str, /) -> str | bytes | None:
+        """Returns the content of a generated file, or `None` if no definition contributes to it anymore.
+
+        Operations are applied in order of the definitions' paths (see `definition_order()`), like a full build does.
+        """
+        file: beet.NamespaceFile | None = None
+        for definition in sorted(self.contributors.get(path, ()), key=definition_order):
+            for operation in self.operations[definition][path]:
+                if file is None or operation.action == "create":
+                    file = operation.materialize()
+                elif operation.action == "merge_tag":
+                    file.merge(operation.materialize())
+                else:
+                    file.append(operation.materialize())
+        return None if file is None else file.ensure_serialized()
+
+    def patch(self, plans: dict[str, BuildPlan | None], /) -> dict[str, str | bytes | None]:
+        "Updates several definitions at once. Returns the new content of every affected file, `None` for files to delete."
+        affected = set()
+        for definition, plan in plans.items():
+            affected |= self.update(definition, plan)
+        return {path: self.render(path) for path in sorted(affected)}
@@ -0,0 +1,121 @@
+"""Output stage writing generated files to a directory while only touching files that changed.
+
+A manifest with the content hashes of all written files is stored next to them.<br>
+On the next write, files with an unchanged hash are skipped and files that aren't generated anymore are deleted.<br>
+Files that weren't written by this stage are never touched, and neither are files outside of the output directory.
+"""
+
+import os
+import json
+import hashlib
+import pathlib
+import beet
+from typing import Iterable, Iterator, Mapping
+
+MANIFEST = ".beetsmith-manifest.json"
+
+def pack_files(datapack: beet.DataPack, /) -> Iterator[tuple[str, str | bytes]]:
+    "Yields the relative path and the serialized content of every file in a datapack."
+    for path, file in datapack.list_files():
+        yield path, file.ensure_serialized()
+
+class IncrementalWriter:
+    """Class for writing generated files to a directory, only writing new or changed files and deleting stale ones.
+
+    Example
+    ---------
+    ```
+    writer = IncrementalWriter("./build/my_pack")
+    writer.write(pack_files(datapack))  # -> {"written": 3, "unchanged": 1250, "deleted": 0}
+    ```
+    """
+
+    def __init__(self, directory: str | pathlib.Path, /, manifest: str = MANIFEST):
+        self.directory = pathlib.Path(directory)
+        self.manifest_path = self.directory / manifest
+        self._manifest: dict[str, str] | None = None
+        "Manifest kept in memory between `.patch()` calls"
+
+    def manifest(self) -> dict[str, str]:
+        "Returns the content hashes of the files written last time by their relative path."
+        try:
+            return json.loads(self.manifest_path.read_text("utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def write(self, files: Mapping[str, str | bytes] | Iterable[tuple[str, str | bytes]], /) -> dict[str, int]:
+        "Writes all new or changed files and deletes the files that were written last time but aren't part of `files`. Returns the amount of each."
+        if isinstance(files, Mapping):
+            files = files.items()
+
+        previous = self.manifest()
+        current: dict[str, str] = {}
+        written = 0
+
+        for path, content in files:
+            raw = content.encode("utf-8") if isinstance(content, str) else content
+            digest = hashlib.sha1(raw).hexdigest()
+            current[path] = digest
+
+            target = self.directory / path
+            if previous.get(path) == digest and target.is_file():
+                continue
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(raw)
+            written += 1
+
+        deleted = sum(self._delete(path) for path in previous.keys() - current.keys())
+        self._save(current)
+
+        return {"written": written, "unchanged": len(current) - written, "deleted": deleted}
+
+    def patch(self, files: Mapping[str, str | bytes | None], /) -> dict[str, int]:
+        """Writes the given files if they changed and deletes the ones whose content is `None`. All other files are left untouched.
+
+        Returns the amount of each.
+        """
+        manifest = self._manifest if self._manifest is not None else self.manifest()
+        written = deleted = 0
+
+        for path, content in files.items():
+            if content is None:
+                if manifest.pop(path, None) is not None:
+                    deleted += self._delete(path)
+                continue
+
+            raw = content.encode("utf-8") if isinstance(content, str) else content
+            digest = hashlib.sha1(raw).hexdigest()
+            target = self.directory / path
+            if manifest.get(path) == digest and target.is_file():
+                continue
+            manifest[path] = digest
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(raw)
+            written += 1
+
+        self._save(manifest)
+        return {"written": written, "unchanged": len(files) - written - deleted, "deleted": deleted}
+
+    def _delete(self, path: str) -> int:
+        "Deletes a file listed in the manifest. Paths leading outside of the directory (absolute or with `..`) are never touched."
+        root = self.directory.resolve()
+        target = (root / path).resolve()
+        if not target.is_relative_to(root) or target == root:
+            return 0
+        deleted = 0
+        if target.is_file():
+            target.unlink()
+            deleted = 1
+        for parent in target.parents: # Clean up directories that became empty
+            if parent == root or not parent.is_dir() or any(parent.iterdir()):
+                break
+            parent.rmdir()
+        return deleted
+
+    def _save(self, manifest: dict[str, str]) -> None:
+        self._manifest = manifest
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary = self.manifest_path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(manifest, indent=0, sort_keys=True), "utf-8")
+        os.replace(temporary, self.manifest_path)
@@ -1,51 +1,244 @@
 import beet
-import warnings
+import time
+import logging
+import contextlib
 import pydantic
-from beetsmith.library.item import Item
-from beetsmith.toolchain.file import BeetSmithDefinitionFile
+from beetsmith.core.compat import pack_format_of
+from beetsmith.core.diagnostics import DiagnosticCollector, report
+from beetsmith.core.interning import ComponentInterner
+from beetsmith.core.metrics import BuildMetrics
+from beetsmith.core.tracing import Tracer, span
+from beetsmith.library.catalog import ItemCatalog
+from beetsmith.library.commands import give_function
+from beetsmith.library.dispatch import DispatchTree
+from beetsmith.library.item import CustomItem
+from beetsmith.library.plan import BuildPlan, target_pack
+from beetsmith.library.search import SearchIndex
+from beetsmith.library.vanilla import VanillaSnapshot
+from beetsmith.toolchain.file import DEFINITION_FILE_TYPES, BeetSmithDefinitionFile, load_definition
+from beetsmith.toolchain.output import IncrementalWriter, pack_files
+from beetsmith.toolchain.profiling import MemoryProfiler
+from beetsmith.toolchain.shard import Shard, ShardKey, ShardManifest
+
+logger = logging.getLogger("beetsmith")
 
 class BeetSmithConfig(pydantic.BaseModel):
     auto: bool = True
     debug: bool = False
+    targets: list[int] = []
+    output: str | None = None
+    metrics: str | None = None
+    trace: str | None = None
+    memory: str | None = None
+    catalog: str | None = None
+    vanilla: str | None = None
+    give: str | None = None
+    dispatch: str | None = None
+    shard: str | None = None
+    shard_by: ShardKey = "namespace"
+    diagnostics: str | None = None
+    search: str | None = None
 
 @beet.configurable(validator=BeetSmithConfig)
 def beet_default(ctx: beet.Context, opts: BeetSmithConfig) -> None:
     if opts.auto:
         ctx.require(
-            auto_item(debug=opts.debug)
+            auto_item(opts)
         )
 
-def auto_item(debug: bool = False) -> beet.Plugin:
+def auto_item(opts: BeetSmithConfig | None = None, /, **options) -> beet.Plugin:
+    """Beet plugin implementing all BeetSmith definitions of the datapack.
+
+    Takes a `BeetSmithConfig` or its fields as keyword arguments, e.g. `auto_item(debug=True, targets=[71])`.
+
+    For every pack format in `targets` an additional datapack is built from the same instances.<br>
+    They can be found in `ctx.meta["beetsmith"]["targets"]` and are saved next to the output of beet.
+
+    If an `output` directory is given, the generated files aren't added to beet's datapack but are written to their own datapack in that directory.<br>
+    All datapacks written by BeetSmith itself only get new or changed files written and stale ones deleted.
+
+    If a `metrics` directory is given, counters and latency histograms of the build are written to it
+    as `beetsmith_metrics.json` and as `beetsmith.prom` for the textfile collector of the Prometheus node exporter.<br>
+    They can also be found in `ctx.meta["beetsmith"]["metrics"]`.
+
+    If a `trace` file is given, spans of all phases, behaviours and implementations are written to it in the Chrome trace event format.
+
+    If a `memory` file is given, the build runs with memory profiling (which makes it a lot slower).<br>
+    A report of the memory allocated per phase, the BeetSmith source lines allocating the most, peak RSS and bytes per item is written to it.
+
+    All implemented items are indexed in an `ItemCatalog` found in `ctx.meta["beetsmith"]["catalog"]`.<br>
+    If a `catalog` file is given, the catalog is written to it as a manifest that can be loaded with `ItemCatalog.load()`.
+
+    The names, lore and ability descriptions of all implemented items are indexed in a `SearchIndex` found in `ctx.meta["beetsmith"]["search"]`.<br>
+    If a `search` file is given, the index is written to it in a binary format that can be queried with `MappedSearchIndex`.
+
+    If a `vanilla` file is given, components equal to the base item's defaults are left out of generated files.<br>
+    The file has to be a local copy of the item components summary of misode/mcmeta, see `VanillaSnapshot.download()`.
+
+    If a `give` function is given (e.g. `custom:give_all`), a function giving all implemented items is generated at that location.
+
+    If a `dispatch` location is given (e.g. `custom:dispatch`), every item gets an index in its `custom_data`
+    and function trees giving and replacing items by index are generated below it (see `library.dispatch`).
+
+    If a `shard` like `2/4` is given, only items in that shard of all definitions are implemented, assigned by a stable hash of their namespace
+    or, with `shard_by: id`, of their whole id. Next to every datapack, a manifest with the plan of its items is written,
+    so the partial outputs of all shards can be merged with `beetsmith merge` (see `toolchain.shard`). Shards can't be combined with `dispatch`,
+    since item indices span all items.
+
+    Warnings and failed items of the build are collected, deduplicated and logged as one summary at the end of the build.<br>
+    They can be found in `ctx.meta["beetsmith"]["diagnostics"]` and, if a `diagnostics` file is given, are written to it as JSON.
+    """
+    if opts is None:
+        opts = BeetSmithConfig(**options)
+    sharding = Shard.parse(opts.shard, by=opts.shard_by) if opts.shard is not None else None
+    if sharding is not None and opts.dispatch is not None:
+        raise beet.PluginError("BeetSmith plugin cannot be executed: Sharded builds cannot generate a dispatch tree")
 
     def plugin(ctx: beet.Context):
+        tracer = Tracer() if opts.trace is not None else None
+        sink = DiagnosticCollector()
+        with tracer.active() if tracer is not None else contextlib.nullcontext(), sink.active():
+            with span("build"):
+                generated, packs, manifests = build(ctx)
+        if tracer is not None:
+            tracer.export(ctx.directory / opts.trace)
+
+        ctx.meta["beetsmith"]["diagnostics"] = sink
+        if sink:
+            logger.warning(f"{len(sink)} distinct diagnostics\n{sink.summary()}")
+        if opts.diagnostics is not None:
+            sink.export(ctx.directory / opts.diagnostics)
+
+        yield
+
+        directory = ctx.directory / opts.output if opts.output is not None else ctx.output_directory
+        if directory:
+            for datapack in [*([generated] if opts.output is not None else []), *packs.values()]:
+                IncrementalWriter(directory / datapack.name).write(pack_files(datapack))
+            for name, manifest in manifests.items():
+                manifest.export(directory / sharding.manifest_name(name))
+
+    def build(ctx: beet.Context) -> tuple[beet.DataPack, dict[int, beet.DataPack], dict[str, ShardManifest]]:
 
         if BeetSmithDefinitionFile not in ctx.data.extend_namespace:
             raise beet.PluginError("BeetSmith plugin cannot be executed: The requirements are missing in require")
 
-        instances: list[Item] = []
+        start = time.perf_counter()
+        snapshot = VanillaSnapshot.load(ctx.directory / opts.vanilla) if opts.vanilla is not None else None
+        collector = BuildMetrics() if opts.metrics is not None else None
+        profiler = MemoryProfiler() if opts.memory is not None else None
+        instances: list[CustomItem] = []
+
+        if profiler is not None:
+            profiler.start()
+
+        try:
+            for file_type in DEFINITION_FILE_TYPES:
+                for resource_location, file in ctx.data[file_type].items():
+                    try:
+                        instances.append(load_definition(file, metrics=collector))
+
+                    except Exception as e:
+                        if opts.debug:
+                            raise e
+                        report("load-failed", f"File '{file}' could not be loaded and implemented: {e}", severity="error")
+
+            if sharding is not None:
+                instances = [instance for instance in instances if sharding.includes(instance.id)]
+
+            interner = ComponentInterner() # Identical component values are only stored once per build
+            with span("intern"):
+                for instance in instances:
+                    instance.components.intern(interner)
+            if collector is not None:
+                collector.gauge("interned_values", len(interner))
+                collector.gauge("interned_hits", interner.hits)
+
+            if profiler is not None:
+                profiler.snapshot("instantiate", items=len(instances))
+
+            packs = {pack_format: target_pack(ctx.project_id, pack_format) for pack_format in opts.targets}
+            ctx.meta.setdefault("beetsmith", {})["targets"] = packs
+            ctx.meta["beetsmith"]["metrics"] = collector
+
+            index = ItemCatalog()
+            ctx.meta["beetsmith"]["catalog"] = index
+            texts = SearchIndex()
+            ctx.meta["beetsmith"]["search"] = texts
+
+            generated = ctx.data
+            if opts.output is not None:
+                generated = beet.DataPack(name=ctx.project_id)
+                generated.mcmeta = ctx.data.mcmeta.copy()
+
+            manifests: dict[str, ShardManifest] = {}
+            if sharding is not None:
+                for name, datapack in [(ctx.project_id, generated), *((datapack.name, datapack) for datapack in packs.values())]:
+                    manifests[name] = ShardManifest(name, sharding, plan=BuildPlan(pack_format_of(datapack)))
+                ctx.meta["beetsmith"]["shard"] = manifests
+
+            tree = DispatchTree(instances, base=opts.dispatch) if opts.dispatch is not None else None
+            if tree is not None:
+                tree.index_items()
+
+            implemented_instances: list[CustomItem] = []
+            for instance in instances:
+                implemented = False
+                for name, datapack in [(ctx.project_id, generated), *((datapack.name, datapack) for datapack in packs.values())]:
+                    try:
+                        plan = instance.implement(datapack, metrics=collector, vanilla=snapshot)
+                        implemented = True
+                        if name in manifests:
+                            manifests[name].items.append(instance.id)
+                            manifests[name].plan.extend(plan)
+
+                    except Exception as e:
+                        if opts.debug:
+                            raise e
+                        report("implement-failed", f"'{instance.id}' could not be implemented: {e}", item=instance.id, severity="error")
+                if implemented:
+                    index.add(instance)
+                    texts.add(instance)
+                    implemented_instances.append(instance)
+
+            if opts.give is not None:
+                with span("give_function"):
+                    for datapack in [generated, *packs.values()]:
+                        datapack[opts.give] = give_function(implemented_instances, pack_format=pack_format_of(datapack), vanilla=snapshot)
+
+            if tree is not None:
+                with span("dispatch"):
+                    for datapack in [generated, *packs.values()]:
+                        tree.implement(datapack)
+
+            # del ctx.data[YAMLDefinition]
+
+            if profiler is not None:
+                profiler.snapshot("implement", items=len(instances))
+        finally: # tracemalloc must not keep slowing down the process after a failed build
+            if profiler is not None:
+                profiler.stop()
 
-        for resource_location, file in ctx.data[BeetSmithDefinitionFile].items():
-            try:
-                instances.append(file.instance)
+        if profiler is not None:
+            profiler.export(ctx.directory / opts.memory)
+            if collector is not None:
+                profiler.record(collector)
 
-            except Exception as e:
-                if debug:
-                    raise e
-                warnings.warn(f"File '{file}' could not be loaded and implemented: {e}", category=UserWarning)
-            
-        for instance in instances:
-            try:
-                instance.implement(ctx.data)
+        if opts.catalog is not None:
+            index.export(ctx.directory / opts.catalog)
+        if opts.search is not None:
+            texts.export(ctx.directory / opts.search)
 
-            except Exception as e:
-                if debug:
-                    raise e
-                warnings.warn(f"File '{file}' could not be implemented: {e}", category=UserWarning)
+        if collector is not None:
+            collector.observe("build_seconds", time.perf_counter() - start)
+            directory = ctx.directory / opts.metrics
+            collector.export_json(directory / "beetsmith_metrics.json")
+            collector.export_prometheus(directory / "beetsmith.prom")
 
-        # del ctx.data[YAMLDefinition]
+        return generated, packs, manifests
 
     return plugin
 
 def requirements(ctx: beet.Context):
     "Beet plugin fullfilling requirements for the BeetSmith plugin"
-    ctx.data.extend_namespace.append(BeetSmithDefinitionFile)
\ No newline at end of file
+    ctx.data.extend_namespace.extend(DEFINITION_FILE_TYPES)
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""Memory profiling of builds.
+
+Allocation snapshots are taken between the phases of a build.<br>
+Allocations are attributed to the innermost BeetSmith source line in their traceback,
+so e.g. a dict allocated by beet on behalf of `CustomItem.implement` counts towards the line in `implement`.
+"""
+
+import sys
+import json
+import pathlib
+import tracemalloc
+import beetsmith
+from dataclasses import dataclass, field
+from beetsmith.core.metrics import BuildMetrics
+
+try:
+    import resource
+except ImportError: # Not available on Windows
+    resource = None
+
+_package_directory = str(pathlib.Path(beetsmith.__file__).parent)
+
+def peak_rss() -> int | None:
+    "Returns the peak resident set size of the process in bytes, if it can be determined."
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+@dataclass
+class PhaseSnapshot:
+    "Memory state after a phase of a build."
+    phase:      str
+    items:      int
+    traced:     int
+    "Bytes currently allocated and traced"
+    peak:       int
+    "Most bytes allocated and traced at once so far"
+    rss:        int | None
+    top:        list[dict] = field(default_factory=list)
+    "BeetSmith source lines that allocated the most memory during the phase"
+
+class MemoryProfiler:
+    """Class taking allocation snapshots between the phases of a build.
+
+    Example
+    ---------
+    ```
+    profiler = MemoryProfiler()
+    profiler.start()
+    instances = [...]
+    profiler.snapshot("instantiate", items=len(instances))
+    profiler.stop()
+    print(profiler.summary())
+    ```
+    """
+
+    def __init__(self, top: int = 10, frames: int = 32):
+        self.top = top
+        self.frames = frames
+        self.phases: list[PhaseSnapshot] = []
+        self._previous: tracemalloc.Snapshot | None = None
+        self._baseline = 0
+
+    def start(self) -> None:
+        tracemalloc.start(self.frames)
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        self._previous = self._take()
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self._previous = None
+
+    def _take(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(True, f"{_package_directory}/*", all_frames=True),
+            tracemalloc.Filter(False, tracemalloc.__file__, all_frames=True)
+        ])
+
+    def snapshot(self, phase: str, /, items: int = 0) -> PhaseSnapshot:
+        "Records the memory state after `phase` and the allocations made by BeetSmith since the last snapshot."
+        current = self._take()
+        traced, peak = tracemalloc.get_traced_memory()
+
+        attributed: dict[str, list[int]] = {}
+        for stat in current.compare_to(self._previous, "traceback"):
+            if stat.size_diff <= 0:
+                continue
+            frame = next((frame for frame in reversed(stat.traceback) if frame.filename.startswith(_package_directory)), None)
+            if frame is None:
+                continue
+            location = f"{pathlib.Path(frame.filename).relative_to(_package_directory).as_posix()}:{frame.lineno}"
+            entry = attributed.setdefault(location, [0, 0])
+            entry[0] += stat.size_diff
+            entry[1] += stat.count_diff
+
+        top = sorted(attributed.items(), key=lambda pair: pair[1][0], reverse=True)[:self.top]
+        snapshot = PhaseSnapshot(
+            phase=phase,
+            items=items,
+            traced=traced - self._baseline,
+            peak=peak - self._baseline,
+            rss=peak_rss(),
+            top=[{"line": line, "bytes": size, "blocks": count} for line, (size, count) in top]
+        )
+        self.phases.append(snapshot)
+        self._previous = current
+        return snapshot
+
+    def bytes_per_item(self) -> float | None:
+        "Returns the traced bytes retained after the last phase divided by its amount of items."
+        if not self.phases or not self.phases[-1].items:
+            return None
+        return self.phases[-1].traced / self.phases[-1].items
+
+    def asDict(self) -> dict:
+        return {
+            "bytes_per_item": self.bytes_per_item(),
+            "peak_rss": peak_rss(),
+            "phases": [vars(phase) for phase in self.phases]
+        }
+
+    def export(self, path: str | pathlib.Path, /) -> None:
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.asDict(), indent=2), "utf-8")
+
+    def record(self, metrics: BuildMetrics, /) -> None:
+        "Adds the memory state of all phases as gauges to build metrics."
+        for phase in self.phases:
+            metrics.gauge("memory_traced_bytes", phase.traced, phase=phase.phase)
+            metrics.gauge("memory_traced_peak_bytes", phase.peak, phase=phase.phase)
+        if (per_item := self.bytes_per_item()) is not None:
+            metrics.gauge("memory_bytes_per_item", per_item)
+        if (rss := peak_rss()) is not None:
+            metrics.gauge("memory_peak_rss_bytes", rss)
+
+    def summary(self) -> str:
+        "Returns a human readable report."
+        lines = []
+        for phase in self.phases:
+            lines.append(f"{phase.phase}: {phase.traced / 1024:.1f} KiB traced, {phase.peak / 1024:.1f} KiB peak, {phase.items} items")
+            for entry in phase.top:
+                lines.append(f"    {entry['bytes'] / 1024:>10.1f} KiB  {entry['blocks']:>8} blocks  {entry['line']}")
+        if (per_item := self.bytes_per_item()) is not None:
+            lines.append(f"{per_item:.0f} bytes per item")
+        if (rss := peak_rss()) is not None:
+            lines.append(f"{rss / 1024 ** 2:.1f} MiB peak RSS")
+        return "\n".join(lines)
@@ -0,0 +1,301 @@
+"""Long-running build server keeping the parsed BeetSmith catalog in memory.
+
+The server only redoes decoding, instantiation and implementation for definition files that changed since the last build,
+and only writes the files generated for them.
+
+---
+#### Usage
+```
+python -m beetsmith.toolchain.server serve ./src ./build   # keeps running
+python -m beetsmith.toolchain.server rebuild                # e.g. from an editor's save hook
+python -m beetsmith.toolchain.server stop
+python -m beetsmith.toolchain.server watch ./src ./build   # rebuilds on every change without a server
+```
+Every server generates a random key and writes it to `~/.beetsmith/server-<port>.key`, readable only by the user.
+Clients authenticate with it by answering a challenge. Requests and answers are JSON.
+The server handles one connection at a time and drops clients that stay silent for longer than `TIMEOUT` seconds.
+"""
+
+import os
+import sys
+import json
+import hmac
+import time
+import secrets
+import hashlib
+import pathlib
+import argparse
+import beet
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection, Listener, Client
+from beetsmith.core.compat import pack_format_of
+from beetsmith.library.item import CustomItem
+from beetsmith.library.plan import BuildPlan
+from beetsmith.toolchain.file import BeetSmithDefinition, BeetSmithDefinitionFile, definition_files
+from beetsmith.toolchain.graph import DependencyGraph
+from beetsmith.toolchain.output import IncrementalWriter
+
+DEFAULT_ADDRESS = ("localhost", 6029)
+TIMEOUT = 5.0
+"Seconds the server waits for a client's answer to the challenge and for its request"
+MAX_MESSAGE = 1 << 16
+"Longest request the server accepts, in bytes"
+
+def key_file(address=DEFAULT_ADDRESS) -> pathlib.Path:
+    "Returns the path of the key file of the server at `address`."
+    return pathlib.Path.home() / ".beetsmith" / f"server-{address[1]}.key"
+
+def write_key(path: pathlib.Path, /) -> bytes:
+    "Generates a random key and writes it to a file only the user can read."
+    key = secrets.token_bytes(32)
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, "wb") as file:
+        os.chmod(path, 0o600) # The file may have existed with other permissions
+        file.write(key)
+    return key
+
+def _send(connection: Connection, message: dict) -> None:
+    connection.send_bytes(json.dumps(message).encode("utf-8"))
+
+def _receive(connection: Connection, timeout: float | None = None) -> dict:
+    if timeout is not None and not connection.poll(timeout):
+        raise TimeoutError("No message received in time")
+    message = json.loads(connection.recv_bytes(MAX_MESSAGE if timeout is not None else None).decode("utf-8"))
+    if not isinstance(message, dict):
+        raise ValueError("Messages have to be JSON objects")
+    return message
+
+def _authenticate(connection: Connection, authkey: bytes, timeout: float) -> bool:
+    "Sends a random challenge and checks that the client answers it with the HMAC of the shared key."
+    challenge = secrets.token_bytes(32)
+    connection.send_bytes(challenge)
+    if not connection.poll(timeout):
+        return False
+    answer = connection.recv_bytes(64)
+    return hmac.compare_digest(answer, hmac.digest(authkey, challenge, "sha256"))
+
+@dataclass
+class ResidentDefinition:
+    "State kept for a single definition file between builds."
+    location:   str
+    stat:       tuple[int, int]
+    digest:     str
+    definition: BeetSmithDefinition | None  = None
+    instance:   CustomItem | None           = None
+    plan:       BuildPlan | None            = None
+    "Operations generating the files of this definition"
+    error:      str | None                  = None
+
+@dataclass
+class BuildServer:
+    """Class holding the resident state of a datapack's BeetSmith definitions.
+
+    A dependency graph (see `toolchain.graph`) maps every definition to the files generated for it,
+    so a rebuild only renders and writes the files of changed definitions and the shared files they touch.
+
+    Parameter
+    ----------
+    source : Path
+        Directory of the datapack containing the definitions in `data/*/beetsmith/`
+    output : Path
+        Directory the generated datapack is written to
+    """
+    source:     pathlib.Path
+    output:     pathlib.Path
+    name:       str                                     = "beetsmith"
+    definitions: dict[pathlib.Path, ResidentDefinition] = field(default_factory=dict)
+    mcmeta:     str | None                              = None
+    "Content of the source's `pack.mcmeta`, which determines the pack format items are implemented for"
+    graph:      DependencyGraph                         = field(default_factory=lambda: DependencyGraph(None))
+    writer:     IncrementalWriter | None                = None
+
+    def __post_init__(self):
+        self.source = pathlib.Path(self.source)
+        self.output = pathlib.Path(self.output)
+        self.writer = IncrementalWriter(self.output / self.name)
+
+    def _datapack(self) -> beet.DataPack:
+        "Empty datapack with the source's `pack.mcmeta`"
+        datapack = beet.DataPack(name=self.name)
+        if self.mcmeta is not None:
+            datapack.mcmeta = beet.Mcmeta(self.mcmeta)
+        return datapack
+
+    def _load(self, entry: ResidentDefinition, text: str) -> None:
+        entry.definition = entry.instance = entry.plan = entry.error = None
+        try:
+            entry.definition = BeetSmithDefinitionFile.decoder(text)
+            entry.instance = entry.definition.instance()
+            entry.plan = entry.instance.lower(self.graph.pack_format)
+        except Exception as e:
+            entry.error = f"{type(e).__name__}: {e}"
+
+    def update(self) -> dict[str, BuildPlan | None]:
+        "Reloads all added or changed definition files and forgets removed ones. Returns the new plans of the changed definitions by location."
+        seen = set()
+        changes: dict[str, BuildPlan | None] = {}
+
+        path = self.source / "pack.mcmeta"
+        mcmeta = path.read_text("utf-8") if path.is_file() else None
+        if mcmeta != self.mcmeta:
+            self.mcmeta = mcmeta
+            self.graph = DependencyGraph(pack_format_of(self._datapack()))
+            for entry in self.definitions.values():
+                entry.stat = entry.digest = None # Pack format may have changed
+
+        for location, path in definition_files(self.source):
+            seen.add(path)
+            stat = path.stat()
+            stat = (stat.st_mtime_ns, stat.st_size)
+            entry = self.definitions.get(path)
+            if entry is not None and entry.stat == stat:
+                continue
+
+            content = path.read_bytes()
+            digest = hashlib.sha1(content).hexdigest()
+            if entry is not None and entry.digest == digest:
+                entry.stat = stat
+                continue
+
+            if entry is None:
+                entry = self.definitions[path] = ResidentDefinition(location, stat, digest)
+            entry.stat, entry.digest = stat, digest
+            self._load(entry, content.decode("utf-8"))
+            changes[str(path)] = entry.plan
+
+        for path in [path for path in self.definitions if path not in seen]:
+            del self.definitions[path]
+            changes[str(path)] = None
+
+        return changes
+
+    def rebuild(self) -> dict:
+        "Updates the resident state and writes the files affected by changed definitions. Returns a report of the build."
+        start = time.perf_counter()
+        graph = self.graph
+        changes = self.update()
+
+        files = {}
+        if self.graph is not graph: # Everything is rendered again for the new pack format, which may use other paths
+            files = {path: None for path in self.writer.manifest()}
+        files["pack.mcmeta"] = self._datapack().mcmeta.ensure_serialized()
+        files.update(self.graph.patch(changes))
+        written = self.writer.patch(files)
+        reloaded = sum(pathlib.Path(path) in self.definitions for path in changes)
+
+        return {
+            "reloaded": reloaded,
+            "removed":  len(changes) - reloaded,
+            "files":    written,
+            "items":    sum(entry.instance is not None for entry in self.definitions.values()),
+            "errors":   {entry.location: entry.error for entry in self.definitions.values() if entry.error},
+            "seconds":  time.perf_counter() - start
+        }
+
+    def watch(self, interval: float = 0.5) -> None:
+        "Rebuilds whenever definition files change, until interrupted."
+        while True:
+            report = self.rebuild()
+            if report["reloaded"] or report["removed"]:
+                print(f"{report['reloaded']} reloaded, {report['removed']} removed, {report['files']['written']} files written, {report['files']['deleted']} deleted in {report['seconds']:.3f}s")
+                for location, error in report["errors"].items():
+                    print(f"{location}: {error}", file=sys.stderr)
+            time.sleep(interval)
+
+    def serve(self, address=DEFAULT_ADDRESS, key: pathlib.Path | None = None, timeout: float = TIMEOUT) -> None:
+        """Builds once and then answers requests until it receives `{"command": "stop"}`.
+
+        Available commands are `rebuild`, `status` and `stop`.<br>
+        The key clients have to authenticate with is written to `key` (default: `key_file(address)`) and deleted when the server stops.
+        Clients that do not answer the challenge or send their request within `timeout` seconds are disconnected.
+        A failing build is answered with `{"error": ...}` and does not stop the server.
+        """
+        key = key or key_file(address)
+        authkey = write_key(key)
+        try:
+            error = self._try_rebuild().get("error")
+            if error:
+                print(error, file=sys.stderr)
+            with Listener(address) as listener:
+                while True:
+                    try:
+                        connection = listener.accept()
+                    except OSError:
+                        continue
+                    with connection:
+                        try:
+                            if not _authenticate(connection, authkey, timeout):
+                                continue
+                            request = _receive(connection, timeout)
+                        except (EOFError, OSError, ValueError):
+                            continue
+                        try:
+                            match request.get("command"):
+                                case "rebuild":
+                                    _send(connection, self._try_rebuild())
+                                case "status":
+                                    _send(connection, {"items": len(self.definitions), "source": str(self.source), "output": str(self.output)})
+                                case "stop":
+                                    _send(connection, {"stopped": True})
+                                    return
+                                case command:
+                                    _send(connection, {"error": f"Unknown command '{command}'"})
+                        except OSError: # The client went away before the answer
+                            continue
+        finally:
+            key.unlink(missing_ok=True)
+
+    def _try_rebuild(self) -> dict:
+        "`rebuild()`, answering with an `error` entry instead of raising when the build fails"
+        try:
+            return self.rebuild()
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+
+def request(command: str, address=DEFAULT_ADDRESS, key: pathlib.Path | None = None) -> dict:
+    "Sends a command to a running build server, authenticating with the key in `key` (default: `key_file(address)`), and returns its answer."
+    authkey = (key or key_file(address)).read_bytes()
+    with Client(address) as connection:
+        challenge = connection.recv_bytes(64)
+        connection.send_bytes(hmac.digest(authkey, challenge, "sha256"))
+        _send(connection, {"command": command})
+        return _receive(connection)
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="beetsmith-server", description="Resident BeetSmith build server")
+    parser.add_argument("--port", type=int, default=DEFAULT_ADDRESS[1])
+    parser.add_argument("--key-file", type=pathlib.Path, default=None, help="File with the server's key (default: ~/.beetsmith/server-<port>.key)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="Start the server")
+    serve.add_argument("source")
+    serve.add_argument("output")
+    serve.add_argument("--name", default="beetsmith")
+    watch = commands.add_parser("watch", help="Rebuild on every change")
+    watch.add_argument("source")
+    watch.add_argument("output")
+    watch.add_argument("--name", default="beetsmith")
+    watch.add_argument("--interval", type=float, default=0.5)
+    commands.add_parser("rebuild", help="Ask the server for a rebuild")
+    commands.add_parser("status", help="Ask the server for its state")
+    commands.add_parser("stop", help="Stop the server")
+    args = parser.parse_args(argv)
+
+    address = (DEFAULT_ADDRESS[0], args.port)
+    if args.command == "serve":
+        BuildServer(args.source, args.output, args.name).serve(address, args.key_file)
+        return 0
+    if args.command == "watch":
+        try:
+            BuildServer(args.source, args.output, args.name).watch(args.interval)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    answer = request(args.command, address, args.key_file)
+    for key, value in answer.items():
+        print(f"{key}: {value}")
+    return 1 if answer.get("errors") or answer.get("error") else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""Sharded builds, splitting the definitions of a catalog between several builds by a stable hash.
+
+Every shard writes a manifest with the build plan of its items. Manifests of all shards are merged deterministically:
+tags are united, functions are concatenated in order of the shards and conflicting writes of the same file are reported.
+
+```
+beetsmith build ./src ./build --shard 1/3     # on three runners
+beetsmith build ./src ./build --shard 2/3
+beetsmith build ./src ./build --shard 3/3
+beetsmith merge ./dist ./build/*.shard-*.json   # writes ./dist/beetsmith
+```
+"""
+
+from __future__ import annotations
+import json
+import hashlib
+import pathlib
+from dataclasses import dataclass, field
+from typing import Literal
+from beetsmith.library.plan import BuildPlan, FileOperation
+
+ShardKey = Literal["namespace", "id"]
+
+MANIFEST_VERSION = 1
+
+def shard_of(key: str, shards: int, /) -> int:
+    "Returns the shard (from 1 to `shards`) of a key. Unlike `hash()`, the result is the same in every process and on every machine."
+    return int.from_bytes(hashlib.sha1(key.encode("utf-8")).digest()[:8], "big") % shards + 1
+
+@dataclass(frozen=True)
+class Shard:
+    """Shard `index` of `count` shards.
+
+    Parameter
+    ----------
+    by : `"namespace"` | `"id"`
+        Whether items are assigned by the namespace of their id, keeping namespaces together, or by their whole id, which spreads more evenly
+    """
+    index:  int
+    count:  int
+    by:     ShardKey    = "namespace"
+
+    def __post_init__(self):
+        if not 1 <= self.index <= self.count:
+            raise ValueError(f"Shard {self.index} doesn't exist, shards go from 1 to {self.count}")
+        if self.by not in ("namespace", "id"):
+            raise ValueError(f"Items cannot be sharded by '{self.by}'")
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    @staticmethod
+    def parse(text: str, /, by: ShardKey = "namespace") -> Shard:
+        "Parses a shard like `2/4`."
+        index, _, count = text.partition("/")
+        return Shard(int(index), int(count), by)
+
+    def includes(self, id: str, /) -> bool:
+        "Whether the item with the id `id` belongs to this shard."
+        return shard_of(id.split(":")[0] if self.by == "namespace" else id, self.count) == self.index
+
+    def manifest_name(self, name: str, /) -> str:
+        return f"{name}.shard-{self.index}-of-{self.count}.json"
+
+@dataclass
+class ShardManifest:
+    "Partial output of a shard for the datapack `name`: the ids of its items and their build plan."
+    name:   str
+    shard:  Shard
+    items:  list[str]               = field(default_factory=list)
+    plan:   BuildPlan               = field(default_factory=BuildPlan)
+
+    def asDict(self) -> dict:
+        return {
+            "version": MANIFEST_VERSION,
+            "name": self.name,
+            "shard": self.shard.index,
+            "shards": self.shard.count,
+            "by": self.shard.by,
+            "items": sorted(self.items),
+            "plan": self.plan.asDict()
+        }
+
+    @staticmethod
+    def fromDict(dictionary: dict, /) -> ShardManifest:
+        if dictionary.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported shard manifest version {dictionary.get('version')}, expected {MANIFEST_VERSION}")
+        return ShardManifest(
+            dictionary["name"],
+            Shard(dictionary["shard"], dictionary["shards"], dictionary["by"]),
+            dictionary["items"],
+            BuildPlan.fromDict(dictionary["plan"])
+        )
+
+    def export(self, path: str | pathlib.Path, /) -> None:
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.asDict(), separators=(",", ":")), "utf-8")
+
+    @staticmethod
+    def load(path: str | pathlib.Path, /) -> ShardManifest:
+        return ShardManifest.fromDict(json.loads(pathlib.Path(path).read_text("utf-8")))
+
+class MergeConflict(Exception):
+    "Raised when shards can't be merged, e.g. because they write different contents to the same file."
+
+def merge(manifests: list[ShardManifest], /, partial: bool = False) -> BuildPlan:
+    """Merges the plans of all shards of a datapack into one plan. The order of `manifests` doesn't matter.
+
+    Operations are kept in order of the shards, so applying the plan unites tags and concatenates functions.<br>
+    Files created by several shards with different contents and items built by several shards raise a `MergeConflict`,
+    as do missing shards unless `partial` is set. Files created identically by several shards are only kept once.
+    """
+    if not manifests:
+        raise MergeConflict("There are no shards to merge")
+    manifests = sorted(manifests, key=lambda manifest: manifest.shard.index)
+    first = manifests[0]
+
+    problems = []
+    for manifest in manifests:
+        if (manifest.name, manifest.shard.count, manifest.shard.by, manifest.plan.pack_format) != (first.name, first.shard.count, first.shard.by, first.plan.pack_format):
+            problems.append(f"Shard {manifest.shard} of '{manifest.name}' (by {manifest.shard.by}, pack format {manifest.plan.pack_format}) doesn't belong to the same build as shard {first.shard} of '{first.name}' (by {first.shard.by}, pack format {first.plan.pack_format})")
+    indices = [manifest.shard.index for manifest in manifests]
+    if duplicates := sorted({index for index in indices if indices.count(index) > 1}):
+        problems.append(f"Shards {duplicates} are given more than once")
+    if not partial and (missing := sorted(set(range(1, first.shard.count + 1)) - set(indices))):
+        problems.append(f"Shards {missing} of {first.shard.count} are missing")
+
+    owners: dict[str, Shard] = {}
+    for manifest in manifests:
+        for id in manifest.items:
+            if id in owners:
+                problems.append(f"'{id}' was built by shard {owners[id]} and shard {manifest.shard}")
+            owners.setdefault(id, manifest.shard)
+
+    merged = BuildPlan(first.plan.pack_format)
+    created: dict[tuple[str, str], tuple[Shard, FileOperation]] = {}
+    for manifest in manifests:
+        for operation in manifest.plan.operations:
+            if operation.action == "create":
+                key = (operation.kind, operation.location)
+                previous = created.get(key)
+                if previous is not None and previous[0] != manifest.shard: # Within a shard, later files replace earlier ones like in a regular build
+                    if previous[1].payload != operation.payload:
+                        problems.append(f"{operation.kind} '{operation.location}' is written differently by shard {previous[0]} and shard {manifest.shard}")
+                    continue
+                created[key] = (manifest.shard, operation)
+            merged.operations.append(operation)
+
+    if problems:
+        raise MergeConflict("\n".join(problems))
+    return merged
@@ -0,0 +1,42 @@
+import beet
+import json
+import yaml
+import pytest
+
+SWORD = {
+    "type": "CustomItem",
+    "id": "custom:sword",
+    "name": "Sword",
+    "model": "iron_sword",
+    "behavior": [{"weapon": {"attack_damage": 6, "attack_speed": 1.6, "can_sweep": True}}]
+}
+
+WAND = {
+    "type": "CustomItem",
+    "id": "custom:wand",
+    "name": "Wand",
+    "model": "stick",
+    "behavior": [{"right_click_ability": {"description": "Casts a spell", "cooldown": 5, "function": "custom:spell"}}]
+}
+
+def write_definitions(directory, definitions: dict[str, dict], /, suffix: str = ".yaml") -> None:
+    "Writes definitions by their resource location, e.g. `custom:sword`, into the datapack at `directory`."
+    for location, definition in definitions.items():
+        namespace, path = location.split(":")
+        file = directory / "data" / namespace / "beetsmith" / f"{path}{suffix}"
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(json.dumps(definition) if suffix == ".json" else yaml.dump(definition), "utf-8")
+
+@pytest.fixture
+def project(tmp_path):
+    "Returns a function running a beet project with the BeetSmith plugin on definitions. Use its result as a context manager."
+    def run(definitions: dict[str, dict], /, **options):
+        write_definitions(tmp_path / "src", definitions)
+        config = {
+            "data_pack": {"load": ["src"]},
+            "require": ["beetsmith.toolchain.plugin.requirements"],
+            "pipeline": ["beetsmith.toolchain.plugin"],
+            "meta": {"beet_default": options}
+        }
+        return beet.run_beet(config, directory=tmp_path)
+    return run
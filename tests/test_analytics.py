@@ -0,0 +1,64 @@
+import pytest
+from beetsmith.library.catalog import ItemCatalog
+from beetsmith.library.item import CustomItem
+
+np = pytest.importorskip("numpy")
+from beetsmith.library.analytics import CatalogStats
+
+def weapon(id: str, damage: float, speed: float, durability: int | None = None, per_attack: int = 1) -> CustomItem:
+    item = CustomItem(id, id, "iron_sword")
+    item.weapon(attack_damage=damage, attack_speed=speed, can_sweep=False, item_damage_per_attack=per_attack)
+    if durability is not None:
+        item.damagable(durability=durability)
+    return item
+
+def armor(id: str, slot: str, durability: int, points: float) -> CustomItem:
+    item = CustomItem(id, id, "iron_chestplate")
+    item.equippable(slot=slot, asset="minecraft:iron")
+    item.damagable(durability=durability)
+    item.add_attribute_modifier(attribute="minecraft:armor", slot=slot, value=points, operation="add_value")
+    return item
+
+def stats(*items: CustomItem) -> CatalogStats:
+    return CatalogStats.fromCatalog(ItemCatalog.fromItems(items))
+
+def test_weapon_math():
+    result = stats(weapon("custom:a", 6, 1.6, durability=250), weapon("custom:b", 8, 1, durability=100, per_attack=2), CustomItem("custom:c", "C", "apple"))
+    assert result.ids.tolist() == ["custom:a", "custom:b", "custom:c"]
+    np.testing.assert_allclose(result.dps()[:2], [9.6, 8])
+    assert np.isnan(result.dps()[2])
+    np.testing.assert_allclose(result.hits_to_break()[:2], [250, 50])
+    np.testing.assert_allclose(result.time_to_break()[:2], [250 / 1.6, 50])
+
+def test_items_without_durability_loss_never_break():
+    result = stats(weapon("custom:a", 6, 1.6, durability=250, per_attack=0))
+    assert result.hits_to_break()[0] == np.inf
+
+def test_armor_math():
+    result = stats(armor("custom:helmet", "head", 165, 2), armor("custom:chestplate", "chest", 240, 6), armor("custom:boots", "feet", 195, 2))
+    np.testing.assert_allclose(result.armor_base_durability(), [15, 15, 15]) # Scaled like vanilla iron armor
+    by_slot = result.armor_by_slot()
+    assert sorted(by_slot) == ["chest", "feet", "head"]
+    assert by_slot["chest"] == {"items": 1, "armor": 6, "toughness": None, "durability": 240}
+
+def test_tiers():
+    result = stats(*(weapon(f"custom:w{index}", index + 2, 1) for index in range(10)))
+    tiers, edges = result.tiers(result.dps(), tiers=5)
+    assert tiers.tolist() == [0, 0, 1, 1, 2, 2, 3, 3, 4, 4]
+    assert len(edges) == 4 and np.all(np.diff(edges) > 0)
+
+def test_outliers():
+    result = stats(*(weapon(f"custom:w{index}", 6 + index % 3 * 0.1, 1.6) for index in range(12)), weapon("custom:overpowered", 60, 1.6))
+    assert result.ids[result.outliers(result.dps())].tolist() == ["custom:overpowered"]
+    assert result.report()["outliers"]["dps"] == ["custom:overpowered"]
+    assert result.report()["weapons"] == 13
+
+def test_loaded_catalogs_give_the_same_report(tmp_path):
+    catalog = ItemCatalog.fromItems([weapon("custom:a", 6, 1.6, durability=250), armor("custom:helmet", "head", 165, 2)])
+    catalog.export(tmp_path / "catalog.json")
+    assert CatalogStats.fromCatalog(ItemCatalog.load(tmp_path / "catalog.json")).report() == CatalogStats.fromCatalog(catalog).report()
+
+def test_empty_catalogs():
+    result = stats()
+    assert len(result) == 0
+    assert result.report()["weapons"] == 0
@@ -0,0 +1,50 @@
+import json
+import zipfile
+from beetsmith.library.plan import BuildPlan
+from beetsmith.toolchain.backends import DirectoryBackend, DryRunBackend, ZipBackend, ZipStream
+
+def duplicated() -> BuildPlan:
+    plan = BuildPlan(94)
+    plan.add("create", "LootTable", "custom:a", {"pools": [], "version": 1})
+    plan.add("create", "LootTable", "custom:b", {"pools": []})
+    plan.add("create", "LootTable", "custom:a", {"pools": [], "version": 2})
+    plan.add("merge_tag", "ItemTag", "custom:tag", {"values": ["custom:x"]})
+    plan.add("create", "ItemTag", "custom:tag", {"values": ["custom:y"]})
+    plan.add("merge_tag", "ItemTag", "custom:tag", {"values": ["custom:z"]})
+    return plan
+
+def test_last_create_wins_in_every_backend(tmp_path, recwarn):
+    DirectoryBackend(tmp_path / "pack").write(duplicated())
+    report = ZipBackend(tmp_path / "pack.zip").write(duplicated())
+
+    with zipfile.ZipFile(tmp_path / "pack.zip") as archive:
+        names = archive.namelist()
+        assert len(names) == len(set(names))
+        for name in names:
+            assert archive.read(name) == (tmp_path / "pack" / name).read_bytes()
+    assert json.loads((tmp_path / "pack/data/custom/loot_table/a.json").read_text())["version"] == 2
+    assert json.loads((tmp_path / "pack/data/custom/tags/item/tag.json").read_text())["values"] == ["custom:y", "custom:z"]
+    assert report == {"written": len(names), "duplicates": 1}
+
+def test_zips_are_reproducible(tmp_path, recwarn):
+    ZipBackend(tmp_path / "a.zip").write(duplicated())
+    ZipBackend(tmp_path / "b.zip").write(duplicated())
+    assert (tmp_path / "a.zip").read_bytes() == (tmp_path / "b.zip").read_bytes()
+
+def test_streams_merge_plans_added_later(tmp_path):
+    first, second = BuildPlan(94), BuildPlan(94)
+    first.add("append_function", "Function", "custom:f", ["say a"])
+    second.add("append_function", "Function", "custom:f", ["say b"])
+    with ZipStream(tmp_path / "pack.zip", 94) as stream:
+        stream.add(first)
+        stream.add(second)
+        assert not (tmp_path / "pack.zip").exists() # Only moved into place once closed
+    with zipfile.ZipFile(tmp_path / "pack.zip") as archive:
+        assert archive.read("data/custom/function/f.mcfunction").decode().split() == ["say", "a", "say", "b"]
+        assert "pack.mcmeta" in archive.namelist()
+
+def test_dry_runs_only_count(tmp_path):
+    report = DryRunBackend().write(duplicated())
+    assert report["operations"] == 6 and report["create"] == 4 and report["merge_tag"] == 2
+    assert report["files"] == 4 # Both loot tables, the tag and pack.mcmeta
+    assert report["bytes"] > 0
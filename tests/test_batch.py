@@ -0,0 +1,65 @@
+import pytest
+from beetsmith.core.diagnostics import DiagnosticCollector
+from beetsmith.core.resourcelocations import ResourceLocationChecker
+from beetsmith.library import batch
+from beetsmith.library import item as item_module
+from beetsmith.library.batch import ItemRecord, build_items
+from beetsmith.library.item import CustomItem
+
+SWORD = {"id": "custom:sword", "name": "Sword", "model": "iron_sword", "behavior": [{"weapon": {"attack_damage": 7, "attack_speed": 1.6, "can_sweep": True}}]}
+
+def records(amount: int) -> list[ItemRecord]:
+    return [ItemRecord.fromDict(SWORD | {"id": f"custom:sword_{index}"}) for index in range(amount)]
+
+def test_batches_build_the_same_items():
+    built, = build_items([ItemRecord.fromDict(SWORD)])
+    item = CustomItem("custom:sword", "Sword", "iron_sword")
+    item.weapon(attack_damage=7, attack_speed=1.6, can_sweep=True)
+    assert built == item
+    assert built.components.asDict() == item.components.asDict()
+    assert built.lower(94) == item.lower(94)
+
+def test_locations_are_validated_once_per_distinct_value(monkeypatch):
+    calls = []
+    checker = ResourceLocationChecker(allow_paths=False)
+    counting = lambda location: calls.append(location) or checker(location)
+    monkeypatch.setattr(batch, "ensureNoSpecialRL", counting)
+    monkeypatch.setattr(item_module, "ensureNoSpecialRL", counting)
+    items = build_items(records(3))
+    assert sorted(calls) == ["custom:sword_0", "custom:sword_1", "custom:sword_2", "iron_sword"]
+    assert items[0].components.item_model == "minecraft:iron_sword"
+
+def test_invalid_records_are_rejected_before_building():
+    with pytest.raises(ValueError):
+        build_items([*records(2), ItemRecord("custom:Sword", "Sword", "iron_sword")])
+    with pytest.raises(SyntaxError, match="Unknown behavior"):
+        build_items([ItemRecord("custom:sword", "Sword", "iron_sword", behaviours=[("sharpness", {})])])
+    with pytest.raises(SyntaxError, match="missing parameter"):
+        build_items([ItemRecord("custom:sword", "Sword", "iron_sword", behaviours=[("weapon", {"attack_damage": 7})])])
+
+def test_failing_items_are_named():
+    with pytest.raises(Exception) as info:
+        build_items([ItemRecord("custom:sword", "Sword", "iron_sword", behaviours=[("rarity", {"rarity": "legendary"})])])
+    assert "While building 'custom:sword'" in info.value.__notes__
+
+def test_incompatible_behaviours_are_reported_like_without_batches():
+    wand = ItemRecord("custom:wand", "Wand", "stick", behaviours=[
+        ("right_click_ability", {"description": "Casts a spell", "cooldown": 5, "function": "custom:spell"}),
+        ("consumable", {"animation": "eat", "consume_always": True, "nutrition": 1, "particles": True, "saturation": 1, "time": 1.6})
+    ])
+    collector = DiagnosticCollector()
+    with collector.active():
+        build_items([wand])
+    diagnostic, = [diagnostic for diagnostic in collector.diagnostics.values() if diagnostic.code == "incompatible-behaviours"]
+    assert diagnostic.items == ["custom:wand"]
+
+def test_validated_locations_are_cached():
+    checker = ResourceLocationChecker(cache_size=2)
+    assert checker("stone") == "minecraft:stone"
+    assert checker("stone") == "minecraft:stone"
+    assert checker._cached.cache_info().hits == 1
+    with pytest.raises(ValueError):
+        checker("minecraft:Stone")
+    with pytest.raises(ValueError):
+        checker("minecraft:Stone") # Errors are never cached
+    assert checker._cached.cache_info().currsize == 1
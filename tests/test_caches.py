@@ -0,0 +1,38 @@
+from beetsmith.library.components import ItemComponents
+from beetsmith.library.item import CustomItem
+
+def test_components_dict_is_cached_until_modified():
+    components = ItemComponents.fromDict({"minecraft:item_model": "minecraft:diamond"})
+    cached = components._asDict()
+    assert components._asDict() is cached
+    components.rarity = "rare"
+    assert components._asDict() is not cached
+    assert components._asDict()["minecraft:rarity"] == "rare"
+
+def test_components_dict_is_a_copy():
+    components = ItemComponents.fromDict({"minecraft:item_model": "minecraft:diamond"})
+    components.asDict()["minecraft:rarity"] = "epic"
+    assert "minecraft:rarity" not in components.asDict()
+
+def test_touch_invalidates_after_in_place_mutation():
+    components = ItemComponents.fromDict({"minecraft:lore": [{"text": "a"}]})
+    components.asDict()
+    components.lore.append({"text": "b"})
+    components.touch()
+    assert components.asDict()["minecraft:lore"] == [{"text": "a"}, {"text": "b"}]
+
+def test_removed_components_are_emitted_with_an_exclamation_mark():
+    components = ItemComponents.fromDict({"!minecraft:food": {}})
+    assert components.asDict() == {"!minecraft:food": {}}
+
+def test_required_files_follow_required_tags():
+    item = CustomItem("custom:sword", "Sword", "iron_sword")
+    assert item._required_files() == []
+    item.required_tags += ("minecraft:swords",)
+    assert [spec.location for spec in item._required_files()] == ["minecraft:swords"]
+
+def test_behaviours_invalidate_required_files():
+    item = CustomItem("custom:sword", "Sword", "iron_sword")
+    item._required_files()
+    item.enchantable(10, ["minecraft:enchantable/weapon"])
+    assert [spec.location for spec in item._required_files()] == ["minecraft:enchantable/weapon"]
@@ -0,0 +1,52 @@
+import pytest
+from conftest import SWORD, WAND
+from beetsmith.library.catalog import CatalogEntry, ItemCatalog
+
+def entry(id: str, behaviours=(), **values) -> CatalogEntry:
+    return CatalogEntry(id, "minecraft:stick", list(behaviours), [], values)
+
+@pytest.fixture
+def catalog() -> ItemCatalog:
+    catalog = ItemCatalog()
+    catalog.add(entry("custom:sword", ["weapon"], attack_damage=6.0, rarity="epic"))
+    catalog.add(entry("custom:axe", ["weapon"], attack_damage=9.0, rarity="rare"))
+    catalog.add(entry("other:dagger", ["weapon"], attack_damage=3.0))
+    catalog.add(entry("custom:wand", ["right_click_ability"], cooldown=5))
+    return catalog
+
+def test_queries_intersect_conditions(catalog):
+    ids = lambda entries: [entry.id for entry in entries]
+    assert ids(catalog.query(behaviours=["weapon"])) == ["custom:axe", "custom:sword", "other:dagger"]
+    assert ids(catalog.query(namespace="custom", behaviours=["weapon"], attack_damage=lambda damage: damage > 5)) == ["custom:axe", "custom:sword"]
+    assert ids(catalog.query(rarity="epic")) == ["custom:sword"]
+    assert ids(catalog.query({"cooldown": 5}, namespace="other")) == []
+
+def test_unknown_values_cannot_be_queried(catalog):
+    with pytest.raises(KeyError):
+        catalog.query(sharpness=5)
+
+def test_replaced_and_removed_items_leave_the_index(catalog):
+    catalog.add(entry("custom:sword", ["weapon"], attack_damage=1.0))
+    assert [entry.id for entry in catalog.query(rarity="epic")] == []
+    catalog.remove("custom:axe")
+    catalog.remove("custom:missing")
+    assert [entry.id for entry in catalog.query(attack_damage=lambda damage: damage > 2)] == ["other:dagger"]
+    assert len(catalog) == 3 and "custom:axe" not in catalog
+
+def test_manifests_round_trip(catalog, tmp_path):
+    catalog.export(tmp_path / "catalog.json")
+    loaded = ItemCatalog.load(tmp_path / "catalog.json")
+    assert loaded.asDict() == catalog.asDict()
+    assert [entry.id for entry in loaded.query(attack_damage=9.0)] == ["custom:axe"]
+    with pytest.raises(ValueError):
+        ItemCatalog.fromDict({"version": 0, "items": []})
+
+def test_builds_catalog_their_items(project, tmp_path):
+    with project({"custom:sword": SWORD, "custom:wand": WAND}, catalog="catalog.json") as ctx:
+        catalog = ctx.meta["beetsmith"]["catalog"]
+    sword = catalog["custom:sword"]
+    assert sword.behaviours == ["weapon"]
+    assert sword.values["attack_damage"] == 6.0 # The player's base damage of 1 plus the modifier of 5
+    assert sword.values["attack_speed"] == pytest.approx(1.6)
+    assert catalog["custom:wand"].values["cooldown"] == 5
+    assert ItemCatalog.load(tmp_path / "catalog.json").asDict() == catalog.asDict()
@@ -0,0 +1,43 @@
+import json
+from conftest import SWORD, WAND, write_definitions
+from beetsmith.toolchain import check as checking
+from beetsmith.toolchain.check import check, check_text
+from beetsmith.toolchain.cli import main, source_files
+
+def test_results_of_single_files():
+    assert check_text(json.dumps(SWORD)).errors == []
+    assert check_text(json.dumps(SWORD)).id == "custom:sword"
+    broken = check_text(json.dumps(SWORD | {"model": "Not A Model"}))
+    assert broken.id == "custom:sword" and broken.errors
+    assert check_text("- not\n- a mapping").errors
+    assert check_text(json.dumps(WAND)).warnings # use_effects is unknown to the default pack format
+
+def test_unchanged_files_are_taken_from_the_cache(tmp_path):
+    write_definitions(tmp_path / "src", {"custom:sword": SWORD, "custom:wand": WAND})
+    paths, cache = source_files(tmp_path / "src"), tmp_path / "cache.json"
+    assert check(paths, cache=cache)["checked"] == 2
+    assert check(paths, cache=cache) | {"errors": None, "warnings": None} == {"checked": 0, "cached": 2, "errors": None, "warnings": None}
+
+    write_definitions(tmp_path / "src", {"custom:sword": SWORD | {"name": "Blade"}})
+    assert (report := check(paths, cache=cache))["checked"] == 1
+    assert report["warnings"] == check(paths)["warnings"]
+
+def test_duplicate_ids_are_errors(tmp_path):
+    write_definitions(tmp_path / "src", {"custom:sword": SWORD, "custom:copy": SWORD})
+    report = check(source_files(tmp_path / "src"))
+    assert list(report["errors"]) == [str(tmp_path / "src" / "data" / "custom" / "beetsmith" / "sword.yaml")]
+
+def test_workers_check_like_the_process(tmp_path, monkeypatch):
+    write_definitions(tmp_path / "src", {f"custom:sword_{i}": SWORD | {"id": f"custom:sword_{i}"} for i in range(3)} | {"custom:broken": {"type": "CustomItem"}})
+    paths = source_files(tmp_path / "src")
+    expected = check(paths)
+    monkeypatch.setattr(checking, "POOL_THRESHOLD", 1)
+    assert check(paths, jobs=2) == expected
+
+def test_main(tmp_path, capsys):
+    write_definitions(tmp_path / "src", {"custom:sword": SWORD})
+    assert main(["check", str(tmp_path / "src"), "--jobs", "1"]) == 0
+    assert (tmp_path / "src" / ".beetsmith-check.json").is_file()
+    write_definitions(tmp_path / "src", {"custom:broken": {"type": "CustomItem"}})
+    assert main(["check", str(tmp_path / "src"), "--jobs", "1", "--no-cache"]) == 1
+    assert "broken.yaml" in capsys.readouterr().err
@@ -0,0 +1,57 @@
+import json
+import pytest
+from conftest import SWORD, WAND, write_definitions
+from beetsmith.toolchain.cli import build, main, source_files
+from beetsmith.toolchain.file import definition_files, parse_from_file
+
+def test_definition_files_of_every_extension(tmp_path):
+    write_definitions(tmp_path, {"custom:sword": SWORD})
+    write_definitions(tmp_path, {"custom:tools/wand": WAND}, suffix=".yml")
+    write_definitions(tmp_path, {"other:wand": WAND | {"id": "other:wand"}}, suffix=".json")
+    (tmp_path / "data" / "custom" / "beetsmith" / "notes.txt").write_text("not a definition")
+    assert [location for location, _ in definition_files(tmp_path)] == ["custom:sword", "custom:tools/wand", "other:wand"]
+    assert [parse_from_file(path).id for _, path in definition_files(tmp_path)] == ["custom:sword", "custom:wand", "other:wand"]
+    with pytest.raises(ValueError):
+        parse_from_file(tmp_path / "data" / "custom" / "beetsmith" / "notes.txt")
+
+def test_plugin_loads_every_extension(project, tmp_path):
+    write_definitions(tmp_path / "src", {"custom:wand": WAND}, suffix=".yml")
+    write_definitions(tmp_path / "src", {"other:wand": WAND | {"id": "other:wand"}}, suffix=".json")
+    with project({"custom:sword": SWORD}) as ctx:
+        assert {"custom:item/sword", "custom:item/wand", "other:item/wand"} <= set(ctx.data.loot_tables)
+
+def test_sources_outside_of_datapacks(tmp_path):
+    (tmp_path / "items").mkdir()
+    (tmp_path / "items" / "sword.yml").write_text(json.dumps(SWORD))
+    (tmp_path / "items" / "wand.json").write_text(json.dumps(WAND))
+    (tmp_path / "items" / ".hidden.yaml").write_text(json.dumps(SWORD))
+    assert [path.name for path in source_files(tmp_path)] == ["sword.yml", "wand.json"]
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_builds(tmp_path, jobs):
+    write_definitions(tmp_path / "src", {"custom:sword": SWORD, "custom:wand": WAND, "custom:broken": {"type": "CustomItem"}})
+    report = build(tmp_path / "src", tmp_path / "build", name="pack", targets=[94], jobs=jobs)
+    assert report["items"] == 2
+    assert [path.rsplit("/", 1)[-1] for path in report["errors"]] == ["broken.yaml"]
+    assert set(report["packs"]) == {"pack", "pack_94"}
+    for pack in ("pack", "pack_94"):
+        assert (tmp_path / "build" / pack / "data" / "custom" / "loot_table" / "item" / "sword.json").is_file()
+
+def test_duplicate_ids_are_reported(tmp_path):
+    write_definitions(tmp_path / "src", {"custom:sword": SWORD, "custom:copy": SWORD})
+    report = build(tmp_path / "src", tmp_path / "build", dry_run=True)
+    assert report["items"] == 1
+    assert "duplicate-definition" in {diagnostic.code for diagnostic in report["diagnostics"].diagnostics.values()}
+    assert not (tmp_path / "build").exists()
+
+def test_zipped_builds(tmp_path):
+    write_definitions(tmp_path / "src", {"custom:sword": SWORD})
+    build(tmp_path / "src", tmp_path / "build", name="pack", zip=True)
+    assert (tmp_path / "build" / "pack.zip").is_file()
+
+def test_main(tmp_path, capsys):
+    write_definitions(tmp_path / "src", {"custom:sword": SWORD})
+    assert main(["build", str(tmp_path / "src"), str(tmp_path / "build"), "--jobs", "1"]) == 0
+    assert "1 items" in capsys.readouterr().out
+    write_definitions(tmp_path / "src", {"custom:broken": {"type": "CustomItem"}})
+    assert main(["build", str(tmp_path / "src"), str(tmp_path / "build"), "--jobs", "1"]) == 1
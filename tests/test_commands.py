@@ -0,0 +1,46 @@
+import pytest
+from beetsmith.core.interning import freeze
+from beetsmith.core.snbt import SNBTEncoder, dumps
+from beetsmith.library.commands import give_command, give_function, replace_command
+from beetsmith.library.item import CustomItem
+
+def test_snbt():
+    assert dumps({"rules": [], "can_destroy_blocks_in_creative": False}) == "{rules:[],can_destroy_blocks_in_creative:false}"
+    assert dumps({"a b": 1, "c": 2 ** 40, "d": 0.5}) == '{"a b":1,c:1099511627776L,d:0.5d}'
+    assert dumps(['say "hi"', "it's", "1"]) == """['say "hi"',"it's","1"]"""
+    with pytest.raises(ValueError):
+        dumps(float("nan"))
+    with pytest.raises(TypeError):
+        dumps(object())
+
+def test_encoders_serialize_interned_values_once():
+    encoder, value = SNBTEncoder(), freeze({"rules": [{"speed": 1.0}]})
+    assert encoder.encode(value) is encoder.encode(value)
+
+def test_item_stacks():
+    item = CustomItem("custom:sword", "Sword", "iron_sword")
+    stack = item.asItemStack()
+    assert stack.startswith("minecraft:music_disc_11[")
+    assert 'minecraft:custom_data={id:"custom:sword"}' in stack
+    assert stack.endswith(",!minecraft:jukebox_playable,minecraft:max_stack_size=64,minecraft:unbreakable={}]")
+    assert give_command(item, "@p", 2) == f"give @p {stack} 2"
+    assert replace_command(item, "@p", "weapon.mainhand") == f"item replace entity @p weapon.mainhand with {stack} 1"
+
+class UpperEncoder(SNBTEncoder):
+    def encode(self, value, /):
+        return super().encode(value.upper() if isinstance(value, str) else value)
+
+def test_item_stacks_are_cached_per_encoder_class():
+    item = CustomItem("custom:sword", "Sword", "iron_sword")
+    default = item.asItemStack()
+    assert item.asItemStack(encoder=SNBTEncoder()) is default
+    assert "MINECRAFT:IRON_SWORD" in item.asItemStack(encoder=UpperEncoder())
+    assert item.asItemStack() is default
+    item.components.rarity = "epic"
+    assert "minecraft:rarity" in item.asItemStack()
+
+def test_give_functions_are_sorted_by_id():
+    items = [CustomItem("custom:wand", "Wand", "stick"), CustomItem("custom:sword", "Sword", "iron_sword")]
+    lines = give_function(items, "@a").lines
+    assert [line.split()[1] for line in lines] == ["@a", "@a"]
+    assert "custom:sword" in lines[0] and "custom:wand" in lines[1]
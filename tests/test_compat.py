@@ -0,0 +1,66 @@
+from beetsmith.core.compat import dropped_components, emit_components, pack_format_of
+from beetsmith.core.diagnostics import DiagnosticCollector
+from beetsmith.library.components import ItemComponents
+from beetsmith.library.item import CustomItem, __minecraft_data_version__, __maximum_data_version__
+from beetsmith.library.plan import target_pack
+from conftest import SWORD, WAND
+
+def test_components_are_dropped_before_they_were_introduced():
+    components = {"minecraft:swing_animation": {"type": "stab"}, "!minecraft:use_effects": {}, "minecraft:weapon": {}}
+    assert emit_components(components, 88) == {"minecraft:weapon": {}}
+    assert emit_components(components, 94) == components
+    assert emit_components(components, 70) == {}
+    assert dropped_components(components, 88) == ["minecraft:swing_animation", "minecraft:use_effects"]
+    assert dropped_components(components, 94) == []
+
+def test_emitted_components_are_cached_per_pack_format():
+    components = ItemComponents.fromDict({"minecraft:use_effects": {}})
+    assert components.asDict(88) == {}
+    assert components.asDict(94) == {"minecraft:use_effects": {}}
+    components.use_effects = {"can_sprint": True}
+    assert components.asDict(94) == {"minecraft:use_effects": {"can_sprint": True}}
+
+def test_blocks_attacks_keeps_its_former_name():
+    components = ItemComponents.empty()
+    components.block_attacks = {"block_delay_seconds": 0.25}
+    assert components.blocks_attacks == {"block_delay_seconds": 0.25}
+    assert components.get_component("minecraft:block_attacks") is components.blocks_attacks
+    components.set_component("minecraft:block_attacks", {})
+    assert components.asDict(71) == {"minecraft:blocks_attacks": {}}
+    assert ItemComponents.fromDict({"!minecraft:block_attacks": {}}).asDict() == {"!minecraft:blocks_attacks": {}}
+
+def test_lowering_reports_dropped_components():
+    item = CustomItem("custom:spear", "Spear", "stick")
+    item.components.set_component("minecraft:kinetic_weapon", {})
+    collector = DiagnosticCollector()
+    with collector.active():
+        item.lower(88)
+        item.lower(94)
+    [diagnostic] = collector.diagnostics.values()
+    assert diagnostic.code == "dropped-component"
+    assert diagnostic.items == ["custom:spear"]
+    assert "minecraft:kinetic_weapon" in diagnostic.message
+
+def test_supported_pack_formats():
+    assert __minecraft_data_version__ == 88
+    assert __maximum_data_version__ >= 94
+    collector = DiagnosticCollector()
+    with collector.active():
+        for pack_format in (71, 88, 94):
+            CustomItem("custom:sword", "Sword", "iron_sword").implement(target_pack("test", pack_format))
+    assert "pack-format" not in {diagnostic.code for diagnostic in collector.diagnostics.values()}
+
+def test_target_packs(project):
+    with project({"custom:sword": SWORD, "custom:wand": WAND}, targets=[71, 94]) as ctx:
+        packs = ctx.meta["beetsmith"]["targets"]
+        assert {pack_format: pack_format_of(pack) for pack_format, pack in packs.items()} == {71: 71, 94: 94}
+        for pack in packs.values():
+            assert set(pack.loot_tables) == {"custom:item/sword", "custom:item/wand"}
+
+        def components(pack):
+            return pack.loot_tables["custom:item/wand"].data["pools"][0]["entries"][0]["functions"][0]["components"]
+
+        assert "minecraft:use_effects" not in components(packs[71])
+        assert "minecraft:use_effects" in components(packs[94])
+        dropped = [diagnostic for diagnostic in ctx.meta["beetsmith"]["diagnostics"].diagnostics.values() if diagnostic.code == "dropped-component"]
+        assert dropped and all(diagnostic.items == ["custom:wand"] for diagnostic in dropped)
@@ -0,0 +1,56 @@
+import json
+import pytest
+from beetsmith.core.diagnostics import MAX_ITEMS, DiagnosticCollector, report
+
+def test_diagnostics_are_deduplicated():
+    collector = DiagnosticCollector()
+    with collector.active():
+        for item in ["custom:a", "custom:b", "custom:a"]:
+            report("dropped-component", "Dropped", item=item)
+        report("load-failed", "Broken", severity="error")
+    assert len(collector) == 2
+    assert collector.summary().splitlines() == ["error[load-failed]: Broken (1x)", "warning[dropped-component]: Dropped (3x: custom:a, custom:b)"]
+
+def test_items_reported_twice_are_only_affected_once():
+    collector = DiagnosticCollector()
+    with collector.active():
+        report("duplicate-file", "Duplicate", item="custom:a")
+        report("duplicate-file", "Duplicate", item="custom:a")
+    diagnostic, = collector.diagnostics.values()
+    assert (diagnostic.count, diagnostic.affected, diagnostic.items) == (2, 1, ["custom:a"])
+    assert str(diagnostic) == "warning[duplicate-file]: Duplicate (2x: custom:a)"
+
+def test_only_the_first_items_are_listed():
+    collector = DiagnosticCollector()
+    with collector.active():
+        for index in range(MAX_ITEMS + 2):
+            report("dropped-component", "Dropped", item=f"custom:{index}")
+    diagnostic, = collector.diagnostics.values()
+    assert diagnostic.affected == MAX_ITEMS + 2 and len(diagnostic.items) == MAX_ITEMS
+    assert str(diagnostic).endswith(", custom:4, ...)")
+
+def test_diagnostics_of_workers_are_merged():
+    main, worker = DiagnosticCollector(), DiagnosticCollector()
+    with main.active():
+        report("dropped-component", "Dropped", item="custom:a")
+    with worker.active():
+        for item in ["custom:a", "custom:b", *(f"custom:{index}" for index in range(MAX_ITEMS))]:
+            report("dropped-component", "Dropped", item=item)
+    main.extend(list(worker.diagnostics.values()))
+    diagnostic, = main.diagnostics.values()
+    assert diagnostic.count == MAX_ITEMS + 3
+    assert diagnostic.affected == MAX_ITEMS + 2
+    assert diagnostic.items[:2] == ["custom:a", "custom:b"]
+
+def test_export(tmp_path):
+    collector = DiagnosticCollector()
+    with collector.active():
+        report("dropped-component", "Dropped", item="custom:a")
+    collector.export(tmp_path / "diagnostics.json")
+    assert json.loads((tmp_path / "diagnostics.json").read_text()) == {"diagnostics": [
+        {"code": "dropped-component", "message": "Dropped", "severity": "warning", "count": 1, "items": ["custom:a"], "affected": 1}
+    ]}
+
+def test_reports_warn_without_a_collector():
+    with pytest.warns(UserWarning, match="Dropped"):
+        report("dropped-component", "Dropped", item="custom:a")
@@ -0,0 +1,53 @@
+import re
+import beet
+import pytest
+from conftest import SWORD, WAND
+from beetsmith.library.dispatch import DispatchTree
+from beetsmith.library.item import CustomItem
+
+def items(amount: int) -> list[CustomItem]:
+    return [CustomItem(f"custom:item_{i:03}", "Item", "stick") for i in range(amount)]
+
+def test_items_are_indexed_in_order_of_their_ids():
+    tree = DispatchTree(reversed(items(3)))
+    assert tree.index_items() == {"custom:item_000": 1, "custom:item_001": 2, "custom:item_002": 3}
+    assert tree.items[2].components.custom_data == {"id": "custom:item_002", "index": 3}
+
+def dispatch(functions: dict[str, beet.Function], location: str, index: int, depth: int = 0) -> tuple[str, int]:
+    "Follows the tree like the game would for `$index`, returning the leaf command and the depth it was found at."
+    for line in functions[location].lines:
+        low, high, command = re.fullmatch(r"execute if score \$index \S+ matches (\d+)(?:\.\.(\d+))? run return run (.+)", line).groups()
+        if int(low) <= index <= int(high or low):
+            if command.startswith("function "):
+                return dispatch(functions, command.removeprefix("function "), index, depth + 1)
+            return command, depth
+    raise AssertionError(f"Index {index} is not dispatched")
+
+@pytest.mark.parametrize("amount", [1, 2, 3, 7, 100])
+def test_every_index_reaches_its_item_in_logarithmic_depth(amount):
+    tree = DispatchTree(items(amount), base="custom:dispatch")
+    functions = tree.functions()
+    assert set(location.count("/") for location in functions) <= {1, 2}
+    for index, item in enumerate(tree.items, start=1):
+        command, depth = dispatch(functions, "custom:dispatch/give", index)
+        assert command == f"loot give @s loot custom:item/{item.id.split(':')[1]}"
+        assert 2 ** depth <= amount
+        command, _ = dispatch(functions, "custom:dispatch/replace", index)
+        assert command.startswith("loot replace entity @s weapon.mainhand")
+
+def test_only_the_selected_operations_are_generated():
+    functions = DispatchTree(items(4), base="custom:dispatch", operations=["give"]).functions()
+    assert "custom:dispatch/give" in functions and "custom:dispatch/replace" not in functions
+    assert functions["custom:dispatch/load"].lines == ["scoreboard objectives add beetsmith.index dummy"]
+
+def test_builds_generate_the_trees(project):
+    with project({"custom:sword": SWORD, "custom:wand": WAND}, dispatch="custom:dispatch") as ctx:
+        assert "custom:dispatch/give" in ctx.data.functions
+        assert ctx.data.function_tags["minecraft:load"].data["values"] == ["custom:dispatch/load"]
+        entry = ctx.data.loot_tables["custom:item/wand"].data["pools"][0]["entries"][0]
+        assert entry["functions"][0]["components"]["minecraft:custom_data"]["index"] == 2
+
+def test_sharded_builds_cannot_dispatch(project):
+    with pytest.raises(Exception, match="dispatch"):
+        with project({"custom:sword": SWORD}, dispatch="custom:dispatch", shard="1/2"):
+            pass
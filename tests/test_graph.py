@@ -0,0 +1,55 @@
+import pathlib
+from conftest import SWORD, WAND, write_definitions
+from beetsmith.library.plan import BuildPlan
+from beetsmith.toolchain.cli import build
+from beetsmith.toolchain.graph import DependencyGraph, definition_order
+from beetsmith.toolchain.output import MANIFEST
+from beetsmith.toolchain.server import BuildServer
+
+def plan(*operations) -> BuildPlan:
+    plan = BuildPlan(94)
+    for operation in operations:
+        plan.add(*operation)
+    return plan
+
+def test_only_affected_files_are_rendered():
+    graph = DependencyGraph(94)
+    files = graph.patch({
+        "a.yaml": plan(("create", "LootTable", "custom:a", {"pools": []}), ("merge_tag", "ItemTag", "custom:all", {"values": ["custom:a"]})),
+        "b.yaml": plan(("merge_tag", "ItemTag", "custom:all", {"values": ["custom:b"]}))
+    })
+    assert set(files) == {"data/custom/loot_table/a.json", "data/custom/tags/item/all.json"}
+    assert graph.patch({"b.yaml": plan(("merge_tag", "ItemTag", "custom:all", {"values": ["custom:c"]}))}) == {
+        "data/custom/tags/item/all.json": '{\n  "values": [\n    "custom:a",\n    "custom:c"\n  ]\n}\n'
+    }
+    assert graph.patch({"a.yaml": None}) == {"data/custom/loot_table/a.json": None, "data/custom/tags/item/all.json": '{\n  "values": [\n    "custom:c"\n  ]\n}\n'}
+    assert len(graph) == 1
+
+def test_definitions_are_ordered_like_paths():
+    paths = ["src/a-b/sword.yaml", "src/a/sword.yaml", "src/a.b/sword.yaml"]
+    assert sorted(paths, key=definition_order) == [str(path) for path in sorted(map(pathlib.Path, paths))]
+    assert sorted(paths) != [str(path) for path in sorted(map(pathlib.Path, paths))]
+
+def files(directory: pathlib.Path) -> dict[str, bytes]:
+    return {
+        path.relative_to(directory).as_posix(): path.read_bytes()
+        for path in directory.rglob("*")
+        if path.is_file() and path.name not in ("pack.mcmeta", MANIFEST)
+    }
+
+def test_patched_builds_equal_full_builds(tmp_path):
+    source = tmp_path / "src"
+    write_definitions(source, {"custom:sword": SWORD, "custom:wand": WAND})
+    write_definitions(source, {"custom:a/sword": SWORD | {"name": "First"}, "custom:a-b/sword": SWORD | {"name": "Second"}}) # Same id, the later path wins
+    (source / "pack.mcmeta").write_text('{"pack": {"min_format": 94, "max_format": 94, "description": ""}}')
+    server = BuildServer(source, tmp_path / "server")
+    server.rebuild()
+
+    write_definitions(source, {"custom:wand": WAND | {"name": "Staff"}, "custom:a/sword": SWORD | {"name": "Third"}, "custom:bow": SWORD | {"id": "custom:bow"}})
+    (source / "data" / "custom" / "beetsmith" / "sword.yaml").unlink()
+    server.rebuild()
+
+    build(source, tmp_path / "full", name="beetsmith", pack_format=94, jobs=1)
+    patched, full = files(tmp_path / "server" / "beetsmith"), files(tmp_path / "full" / "beetsmith")
+    assert patched == full
+    assert b"Second" in full["data/custom/loot_table/item/sword.json"]
@@ -0,0 +1,53 @@
+import json
+import copy
+import pickle
+import pytest
+from beetsmith.core.interning import ComponentInterner, FrozenDict, FrozenList, freeze, thaw
+from beetsmith.library.components import ItemComponents
+
+TOOL = {"rules": [{"blocks": "#minecraft:mineable/pickaxe", "speed": 8.0}], "can_destroy_blocks_in_creative": False}
+
+def test_identical_values_are_shared():
+    interner = ComponentInterner()
+    a = interner.intern(copy.deepcopy(TOOL))
+    b = interner.intern(copy.deepcopy(TOOL))
+    assert a is b and thaw(a) == TOOL
+    assert a["rules"] is interner.intern([{"blocks": "#minecraft:mineable/pickaxe", "speed": 8.0}])
+    assert interner.intern(a) is a
+    assert interner.hits >= 1
+
+def test_scalars_and_key_order_are_kept_apart():
+    interner = ComponentInterner()
+    assert len({id(interner.intern(value)) for value in [[1], [1.0], [True]]}) == 3
+    a, b = interner.intern({"a": 1, "b": 2}), interner.intern({"b": 2, "a": 1})
+    assert a is not b
+    assert list(b) == ["b", "a"]
+
+def test_interned_values_are_immutable_but_serialize_like_the_original():
+    value = freeze(TOOL)
+    assert isinstance(value, FrozenDict) and isinstance(value["rules"], FrozenList)
+    with pytest.raises(TypeError):
+        value["can_destroy_blocks_in_creative"] = True
+    assert json.dumps(value) == json.dumps(TOOL)
+    assert pickle.loads(pickle.dumps(value)) == value
+    assert copy.deepcopy(value) is value
+    assert hash(value) == hash(freeze(copy.deepcopy(TOOL)))
+
+def test_thawed_values_are_mutable_copies():
+    thawed = thaw(freeze(TOOL))
+    assert thawed == TOOL and type(thawed["rules"]) is list
+    thawed["rules"].append({})
+    assert len(TOOL["rules"]) == 1
+
+def test_interned_components_must_be_replaced():
+    interner = ComponentInterner()
+    first, second = ItemComponents.fromDict({"minecraft:tool": TOOL}), ItemComponents.fromDict({"minecraft:tool": TOOL})
+    first.intern(interner)
+    second.intern(interner)
+    assert first.tool is second.tool
+    assert first.interned(interner) is second.interned(interner)
+    with pytest.raises(TypeError):
+        first.tool["can_destroy_blocks_in_creative"] = True
+    first.tool = thaw(first.tool) | {"can_destroy_blocks_in_creative": True}
+    assert first.asDict()["minecraft:tool"]["can_destroy_blocks_in_creative"] is True
+    assert second.asDict()["minecraft:tool"]["can_destroy_blocks_in_creative"] is False
@@ -0,0 +1,40 @@
+import json
+import pytest
+import pydantic
+from conftest import SWORD, WAND
+from beetsmith.core.metrics import BuildMetrics
+from beetsmith.toolchain.plugin import BeetSmithConfig, auto_item
+
+def test_histograms_are_cumulative():
+    metrics = BuildMetrics()
+    for seconds in [0.0002, 0.003, 0.003, 20.0]:
+        metrics.observe("implement_seconds", seconds)
+    buckets = metrics.asDict()["histograms"]["beetsmith_implement_seconds"][0]["buckets"]
+    assert (buckets["0.00025"], buckets["0.0025"], buckets["0.005"], buckets["10.0"]) == (1, 1, 3, 3)
+
+def test_prometheus_format():
+    metrics = BuildMetrics()
+    metrics.count("items_total", namespace="custom")
+    metrics.count("items_total", 2, namespace="custom")
+    metrics.gauge("interned_values", 5)
+    metrics.observe("build_seconds", 1.5, phase='say "hi"')
+    lines = metrics.asPrometheus().splitlines()
+    assert "# TYPE beetsmith_items_total counter" in lines
+    assert 'beetsmith_items_total{namespace="custom"} 3' in lines
+    assert "beetsmith_interned_values 5" in lines
+    assert 'beetsmith_build_seconds_bucket{phase="say \\"hi\\"",le="+Inf"} 1' in lines
+    assert 'beetsmith_build_seconds_count{phase="say \\"hi\\""} 1' in lines
+
+def test_builds_export_metrics(project, tmp_path):
+    with project({"custom:sword": SWORD, "custom:wand": WAND, "custom:broken": {"type": "CustomItem"}}, metrics="metrics") as ctx:
+        metrics = ctx.meta["beetsmith"]["metrics"]
+    assert metrics.counters["definitions_total"] == {(("status", "loaded"),): 2, (("status", "failed"),): 1}
+    assert sum(metrics.counters["implementations_total"].values()) == 2
+    assert json.loads((tmp_path / "metrics" / "beetsmith_metrics.json").read_text())["counters"]
+    assert (tmp_path / "metrics" / "beetsmith.prom").read_text().startswith("# TYPE")
+
+def test_plugin_takes_the_config_or_its_fields():
+    assert callable(auto_item(BeetSmithConfig(metrics="metrics")))
+    assert callable(auto_item(debug=True, targets=[71]))
+    with pytest.raises(pydantic.ValidationError):
+        auto_item(targets="all")
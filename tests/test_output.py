@@ -0,0 +1,52 @@
+import json
+from beetsmith.toolchain.output import MANIFEST, IncrementalWriter
+
+def test_only_changed_files_are_written(tmp_path):
+    writer = IncrementalWriter(tmp_path)
+    assert writer.write({"data/a.json": "a", "data/b.json": "b"}) == {"written": 2, "unchanged": 0, "deleted": 0}
+    modified = (tmp_path / "data/a.json").stat().st_mtime_ns
+
+    assert writer.write({"data/a.json": "a", "data/b.json": "c"}) == {"written": 1, "unchanged": 1, "deleted": 0}
+    assert (tmp_path / "data/a.json").stat().st_mtime_ns == modified
+    assert (tmp_path / "data/b.json").read_text() == "c"
+
+def test_manifest_holds_content_hashes(tmp_path):
+    IncrementalWriter(tmp_path).write([("data/a.json", "a"), ("pack.png", b"\x89PNG")])
+    manifest = json.loads((tmp_path / MANIFEST).read_text())
+    assert sorted(manifest) == ["data/a.json", "pack.png"]
+    assert manifest["data/a.json"] == "86f7e437faa5a7fce15d1ddcb9eaeaea377667b8" # sha1 of "a"
+    assert IncrementalWriter(tmp_path).manifest() == manifest
+
+def test_stale_files_are_deleted_and_foreign_files_kept(tmp_path):
+    writer = IncrementalWriter(tmp_path)
+    writer.write({"data/custom/a.json": "a", "data/other/b.json": "b"})
+    (tmp_path / "data/custom/foreign.txt").write_text("not generated")
+
+    assert writer.write({"data/custom/a.json": "a"}) == {"written": 0, "unchanged": 1, "deleted": 1}
+    assert not (tmp_path / "data/other").exists() # Emptied directories are removed
+    assert (tmp_path / "data/custom/foreign.txt").read_text() == "not generated"
+
+def test_deleted_files_are_written_again(tmp_path):
+    writer = IncrementalWriter(tmp_path)
+    writer.write({"data/a.json": "a"})
+    (tmp_path / "data/a.json").unlink()
+    assert writer.write({"data/a.json": "a"})["written"] == 1
+
+def test_patch_only_touches_given_files(tmp_path):
+    writer = IncrementalWriter(tmp_path)
+    writer.write({"data/a.json": "a", "data/b.json": "b"})
+    assert writer.patch({"data/a.json": "changed", "data/b.json": None, "data/c.json": "c"}) == {"written": 2, "unchanged": 0, "deleted": 1}
+    assert sorted(writer.manifest()) == ["data/a.json", "data/c.json"]
+    assert not (tmp_path / "data/b.json").exists()
+
+def test_manifest_entries_outside_the_directory_are_never_deleted(tmp_path):
+    outside = tmp_path / "outside.json"
+    outside.write_text("keep")
+    writer = IncrementalWriter(tmp_path / "build")
+    writer.write({"data/a.json": "a"})
+    manifest = writer.manifest() | {"../outside.json": "x", str(outside): "x", "data/../../outside.json": "x"}
+    (tmp_path / "build" / MANIFEST).write_text(json.dumps(manifest))
+
+    assert writer.write({"data/a.json": "a"})["deleted"] == 0
+    assert outside.read_text() == "keep"
+    assert sorted(writer.manifest()) == ["data/a.json"]
@@ -0,0 +1,68 @@
+import beet
+import pytest
+from conftest import WAND
+from beetsmith.library.item import CustomItem
+from beetsmith.library.plan import BuildPlan, DataPackBackend, FileOperation, target_pack
+from beetsmith.toolchain.file import BeetSmithDefinition
+
+def wand() -> CustomItem:
+    return BeetSmithDefinition(**WAND).instance()
+
+def files(datapack: beet.DataPack) -> dict[str, object]:
+    return {path: file.ensure_serialized() for path, file in datapack.list_files()}
+
+def test_lowering_does_not_touch_a_datapack():
+    plan = wand().lower(94)
+    assert plan.pack_format == 94 and len(plan) > 0
+    assert ("LootTable", "custom:item/wand") in plan.files()
+
+def test_implementing_writes_the_lowered_plan():
+    implemented = target_pack("test", 94)
+    plan = wand().implement(implemented)
+    written = target_pack("test", 94)
+    DataPackBackend(written).write(plan)
+    assert files(written) == files(implemented)
+
+def test_plans_round_trip(tmp_path):
+    plan = wand().lower(94)
+    plan.export(tmp_path / "plan.json")
+    assert BuildPlan.load(tmp_path / "plan.json") == BuildPlan.fromDict(plan.asDict())
+    restored = target_pack("test", 94)
+    DataPackBackend(restored).write(BuildPlan.load(tmp_path / "plan.json"))
+    original = target_pack("test", 94)
+    DataPackBackend(original).write(plan)
+    assert files(restored) == files(original)
+    with pytest.raises(ValueError):
+        BuildPlan.fromDict({"version": 0})
+
+def test_plans_of_other_pack_formats_cannot_be_merged():
+    plan = BuildPlan(88)
+    plan.extend(BuildPlan(None, [FileOperation("create", "LootTable", "custom:a", {})]))
+    assert len(plan) == 1
+    with pytest.raises(ValueError):
+        plan.extend(BuildPlan(71))
+
+def test_backend_merges_tags_and_appends_functions():
+    plan = BuildPlan(88)
+    plan.add("merge_tag", "FunctionTag", "minecraft:load", {"values": ["custom:a"]})
+    plan.add("merge_tag", "FunctionTag", "minecraft:load", {"values": ["custom:b"]})
+    plan.add("append_function", "Function", "custom:f", ["say a"])
+    plan.add("append_function", "Function", "custom:f", ["say b"])
+    plan.add("create", "LootTable", "custom:t", {"pools": [1]})
+    plan.add("create", "LootTable", "custom:t", {"pools": [2]})
+    datapack = beet.DataPack()
+    DataPackBackend(datapack).write(plan)
+    assert datapack.function_tags["minecraft:load"].data["values"] == ["custom:a", "custom:b"]
+    assert datapack.functions["custom:f"].lines == ["say a", "say b"]
+    assert datapack.loot_tables["custom:t"].data == {"pools": [2]}
+    assert plan.operations[0].payload == {"values": ["custom:a"]} # Merging never changes the operations
+
+@pytest.mark.parametrize("pack_format", [71, 81, 82, 94])
+def test_target_packs_only_support_their_pack_format(pack_format):
+    pack = target_pack("test", pack_format)
+    assert pack.name == f"test_{pack_format}"
+    mcmeta = pack.mcmeta.data["pack"]
+    if pack_format < beet.DataPack.pack_format_switch_format:
+        assert mcmeta["pack_format"] == pack_format and "min_format" not in mcmeta
+    else:
+        assert mcmeta["min_format"] == mcmeta["max_format"] == pack_format and "pack_format" not in mcmeta
@@ -0,0 +1,32 @@
+import json
+import pytest
+import tracemalloc
+from conftest import SWORD, WAND
+from beetsmith.toolchain.profiling import MemoryProfiler
+
+def test_allocations_are_attributed_to_beetsmith_lines():
+    from beetsmith.library.item import CustomItem
+    profiler = MemoryProfiler(top=5)
+    profiler.start()
+    try:
+        items = [CustomItem(f"custom:item_{i}", "Item", "stick") for i in range(200)]
+        phase = profiler.snapshot("instantiate", items=len(items))
+    finally:
+        profiler.stop()
+    assert phase.traced > 0 and phase.peak >= phase.traced
+    assert 0 < len(phase.top) <= 5
+    assert all(entry["line"].endswith(tuple("0123456789")) for entry in phase.top)
+    assert profiler.bytes_per_item() == phase.traced / 200
+
+def test_builds_write_a_memory_report(project, tmp_path):
+    with project({"custom:sword": SWORD, "custom:wand": WAND}, memory="memory.json"):
+        pass
+    report = json.loads((tmp_path / "memory.json").read_text())
+    assert [phase["phase"] for phase in report["phases"]] == ["instantiate", "implement"]
+    assert not tracemalloc.is_tracing()
+
+def test_failed_builds_stop_profiling(project):
+    with pytest.raises(Exception):
+        with project({"custom:sword": SWORD, "custom:broken": {"type": "CustomItem"}}, memory="memory.json", debug=True):
+            pass
+    assert not tracemalloc.is_tracing()
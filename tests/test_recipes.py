@@ -0,0 +1,80 @@
+import beet
+import pytest
+from beetsmith.core.diagnostics import DiagnosticCollector
+from beetsmith.library.item import CustomItem
+from beetsmith.library.plan import target_pack
+from beetsmith.library.recipes import RecipeGenerator, ShapedRecipe, ShapelessRecipe, SmithingRecipe, StonecuttingRecipe, specs_from_table
+
+def sword() -> CustomItem:
+    item = CustomItem("custom:sword", "Sword", "iron_sword")
+    item.components.set_component("minecraft:swing_animation", {"type": "whack"}) # Introduced in pack format 94
+    return item
+
+def test_shaped_recipes_share_keys_of_identical_ingredients():
+    location, recipe = RecipeGenerator().recipe(ShapedRecipe(sword(), [[None, "diamond", None], [None, "minecraft:diamond", None], [None, "stick", None]]))
+    assert location == "custom:crafting_shaped/sword"
+    assert recipe.data["pattern"] == [" a ", " a ", " b "]
+    assert recipe.data["key"] == {"a": "minecraft:diamond", "b": "minecraft:stick"}
+    assert recipe.data["result"]["id"] == "minecraft:music_disc_11"
+
+def test_other_recipe_kinds():
+    generator = RecipeGenerator()
+    _, shapeless = generator.recipe(ShapelessRecipe(sword(), ["#minecraft:planks", "stick"], count=2))
+    _, smithing = generator.recipe(SmithingRecipe(sword(), "netherite_upgrade_smithing_template", "iron_sword", "netherite_ingot"))
+    _, stonecutting = generator.recipe(StonecuttingRecipe(sword(), "stone", id="custom:cut"))
+    assert shapeless.data["ingredients"] == ["#minecraft:planks", "minecraft:stick"]
+    assert shapeless.data["result"]["count"] == 2
+    assert smithing.data["base"] == "minecraft:iron_sword"
+    assert stonecutting.data["ingredient"] == "minecraft:stone"
+
+def test_too_many_ingredients_are_rejected():
+    pattern = [["a", "b", "c"], ["d", "e", "f"], ["g", "h", "i"]]
+    RecipeGenerator().recipe(ShapedRecipe(sword(), pattern))
+    pattern[2].append("j")
+    with pytest.raises(ValueError):
+        RecipeGenerator().recipe(ShapedRecipe(sword(), pattern))
+
+def test_results_are_copies():
+    item = sword()
+    generator = RecipeGenerator()
+    first, second = generator.result(item), generator.result(item)
+    assert first == second
+    assert first is not second and first["components"] is not second["components"]
+
+def test_results_follow_changes_of_the_item_and_its_components():
+    item = sword()
+    generator = RecipeGenerator()
+    generator.result(item, 2)
+    item.components.rarity = "epic"
+    assert generator.result(item, 2)["components"]["minecraft:rarity"] == "epic"
+    item.item = "minecraft:stick"
+    assert generator.result(item, 2)["id"] == "minecraft:stick"
+
+def test_results_are_emitted_for_the_pack_format_of_the_datapack():
+    item = sword()
+    generator = RecipeGenerator()
+    packs = {pack_format: target_pack("test", pack_format) for pack_format in (88, 94)}
+    collector = DiagnosticCollector()
+    with collector.active():
+        for pack in packs.values():
+            generator.implement(pack, [StonecuttingRecipe(item, "stone")])
+    assert not collector.diagnostics # The same recipe in several target packs isn't a duplicate
+    components = {pack_format: pack.recipes["custom:stonecutting/sword"].data["result"]["components"] for pack_format, pack in packs.items()}
+    assert "minecraft:swing_animation" not in components[88]
+    assert "minecraft:swing_animation" in components[94]
+
+def test_duplicate_recipes_are_reported():
+    collector = DiagnosticCollector()
+    generator = RecipeGenerator()
+    with collector.active():
+        generator.implement(beet.DataPack(), [StonecuttingRecipe(sword(), "stone"), StonecuttingRecipe(sword(), "cobblestone")])
+    assert [diagnostic.code for diagnostic in collector.diagnostics.values()] == ["duplicate-recipe"]
+
+def test_specs_from_table():
+    item = sword()
+    specs = list(specs_from_table([{"type": "stonecutting", "result": "custom:sword", "ingredient": "stone", "count": 3}], [item]))
+    assert specs == [StonecuttingRecipe(item, "stone", count=3)]
+    with pytest.raises(KeyError):
+        list(specs_from_table([{"type": "stonecutting", "result": "custom:missing", "ingredient": "stone"}], [item]))
+    with pytest.raises(ValueError):
+        list(specs_from_table([{"type": "blasting", "result": "custom:sword"}], [item]))
@@ -0,0 +1,84 @@
+import pytest
+from beetsmith.library.item import CustomItem
+from beetsmith.library.search import FIELDS, MAGIC, FORMAT_VERSION, MappedSearchIndex, SearchIndex, _header, tokenize
+
+def items() -> list[CustomItem]:
+    sword = CustomItem("custom:fire_sword", "Fire Sword", "iron_sword")
+    sword.lore("Forged in flames")
+    staff = CustomItem("custom:flame_staff", "Staff", "stick")
+    staff.lore("Burns with fire")
+    staff.right_click_ability(description="Shoots a flare", cooldown=3, function="custom:flare")
+    apple = CustomItem("custom:apple", "Apple", "apple")
+    return [sword, staff, apple]
+
+QUERIES = [
+    ("fire", None),
+    ("fire sword", None),
+    ("fire", ["item_name"]),
+    ("fla*", None),
+    ("fla*", ["lore"]),
+    ("flare", ["description"]),
+    ("apple", None),
+    ("missing", None),
+    ("fire missing", None),
+]
+
+def test_tokenize():
+    assert tokenize("Fire-Sword of <key.use>!") == ["fire", "sword", "of", "<key.use>"]
+
+def test_queries():
+    index = SearchIndex.fromItems(items())
+    assert len(index) == 3
+    assert index.query("fire") == ["custom:fire_sword", "custom:flame_staff"]
+    assert index.query("fire sword") == ["custom:fire_sword"]
+    assert index.query("fire", fields=["item_name"]) == ["custom:fire_sword"]
+    assert index.query("fla*") == ["custom:fire_sword", "custom:flame_staff"]
+    assert index.query("fla*", fields=["description"]) == ["custom:flame_staff"]
+    assert index.query("missing") == []
+
+def test_items_are_replaced_and_removed():
+    index = SearchIndex.fromItems(items())
+    renamed = CustomItem("custom:fire_sword", "Ice Sword", "iron_sword")
+    index.add(renamed)
+    assert index.query("ice") == ["custom:fire_sword"]
+    assert index.query("fire") == ["custom:flame_staff"]
+    index.remove("custom:fire_sword")
+    assert index.query("sword") == []
+    assert len(index) == 2
+
+@pytest.mark.parametrize("text, fields", QUERIES)
+def test_mapped_index_answers_like_the_index(tmp_path, text, fields):
+    index = SearchIndex.fromItems(items())
+    index.remove("custom:apple") # Leaves an unused document number
+    index.export(tmp_path / "search.bin")
+    mapped = MappedSearchIndex(tmp_path / "search.bin")
+    try:
+        assert len(mapped) == len(index)
+        assert mapped.query(text, fields=fields) == index.query(text, fields=fields)
+    finally:
+        mapped.close()
+
+def test_file_format(tmp_path):
+    index = SearchIndex.fromItems(items())
+    index.export(tmp_path / "search.bin")
+    data = (tmp_path / "search.bin").read_bytes()
+    magic, version, documents, terms, terms_offset, strings_offset = _header.unpack_from(data)
+    assert (magic, version, documents, terms) == (MAGIC, FORMAT_VERSION, 3, len(index.postings))
+    assert _header.size < terms_offset < strings_offset < len(data)
+    assert all(id.encode() in data[strings_offset:] for id in index.documents)
+    assert len(FIELDS) <= 32 # Field masks are 32 bit
+
+def test_other_files_are_rejected(tmp_path):
+    (tmp_path / "search.bin").write_bytes(_header.pack(b"NOPE", FORMAT_VERSION, 0, 0, _header.size, _header.size))
+    with pytest.raises(ValueError):
+        MappedSearchIndex(tmp_path / "search.bin")
+
+def test_removed_items_leave_no_postings():
+    index = SearchIndex.fromItems(items())
+    remaining = SearchIndex.fromItems(items()[:1])
+    for item in items()[1:]:
+        index.remove(item.id)
+    assert set(index.postings) == set(remaining.postings)
+    assert index.query("fla*") == remaining.query("fla*")
+    index.remove(items()[0].id)
+    assert index.postings == {} and len(index) == 0
@@ -0,0 +1,57 @@
+import pickle
+import pytest
+from beetsmith.core import serialization
+from beetsmith.core.interning import ComponentInterner
+from beetsmith.core.serialization import dumps, loads
+from beetsmith.library.components import REMOVED, ItemComponents
+from beetsmith.library.item import CustomItem
+
+def item() -> CustomItem:
+    item = CustomItem("custom:wand", "Wand", "stick")
+    item.weapon(attack_damage=3, attack_speed=2, can_sweep=True)
+    item.right_click_ability(description="Casts a spell", cooldown=5, function="custom:spell")
+    item.enchantable(10, ["minecraft:enchantable/weapon"])
+    return item
+
+def test_items_round_trip():
+    original = item()
+    restored = loads(dumps(original))
+    assert restored.id == original.id and restored.item == original.item
+    assert restored.components.asDict() == original.components.asDict()
+    assert restored.required_tags == original.required_tags
+    assert restored._applied_behaviours == original._applied_behaviours
+    assert restored._required_files() == original._required_files()
+    assert restored.lower(94) == original.lower(94)
+
+def test_restored_items_stay_mutable():
+    restored = loads(dumps(item()))
+    restored.components.rarity = "epic"
+    assert restored.asItemStack(94).count('minecraft:rarity="epic"') == 1
+    restored.required_tags += ("minecraft:swords",)
+    assert "minecraft:swords" in [spec.location for spec in restored._required_files()]
+
+def test_removed_stays_identical():
+    components = loads(dumps(ItemComponents.fromDict({"!minecraft:food": {}})))
+    assert components.food is REMOVED
+    assert components.asDict() == {"!minecraft:food": {}}
+
+def test_caches_are_not_serialized():
+    original = item()
+    original.asItemStack(94)
+    original.components.asDict(94)
+    assert len(dumps(original)) == len(dumps(item()))
+
+def test_other_formats_are_rejected(monkeypatch):
+    with pytest.raises(ValueError, match="wasn't written"):
+        loads(pickle.dumps(item()))
+    data = dumps(item())
+    monkeypatch.setattr(serialization, "FORMAT_VERSION", serialization.FORMAT_VERSION + 1)
+    with pytest.raises(ValueError, match="serialization format"):
+        loads(data)
+
+def test_interned_items_round_trip():
+    original = item()
+    original.components.intern(ComponentInterner())
+    restored = loads(dumps(original))
+    assert restored.components.asDict() == original.components.asDict()
+    assert restored.asItemStack(94) == original.asItemStack(94)
@@ -0,0 +1,82 @@
+import socket
+import threading
+import pytest
+from multiprocessing.connection import Client
+from conftest import SWORD, WAND, write_definitions
+from beetsmith.toolchain.server import BuildServer, request
+
+def test_rebuild_only_reloads_changed_definitions(tmp_path):
+    write_definitions(tmp_path / "src", {"custom:sword": SWORD, "custom:wand": WAND})
+    server = BuildServer(tmp_path / "src", tmp_path / "build")
+    report = server.rebuild()
+    assert (report["reloaded"], report["items"], report["errors"]) == (2, 2, {})
+    assert report["files"]["written"] > 0
+
+    assert server.rebuild()["reloaded"] == 0
+    write_definitions(tmp_path / "src", {"custom:sword": SWORD | {"name": "Blade"}})
+    report = server.rebuild()
+    assert (report["reloaded"], report["removed"]) == (1, 0)
+
+    (tmp_path / "src" / "data" / "custom" / "beetsmith" / "wand.yaml").unlink()
+    report = server.rebuild()
+    assert (report["removed"], report["items"]) == (1, 1)
+
+def test_broken_definitions_are_reported(tmp_path):
+    write_definitions(tmp_path / "src", {"custom:sword": SWORD, "custom:broken": {"type": "CustomItem", "id": "custom:broken"}})
+    report = BuildServer(tmp_path / "src", tmp_path / "build").rebuild()
+    assert report["items"] == 1
+    assert list(report["errors"]) == ["custom:broken"]
+
+def free_address():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return ("localhost", s.getsockname()[1])
+
+@pytest.fixture
+def serving(tmp_path):
+    "Starts a server on the definitions in `tmp_path/src` and yields its address and key file."
+    write_definitions(tmp_path / "src", {"custom:sword": SWORD})
+    server = BuildServer(tmp_path / "src", tmp_path / "build")
+    address, key = free_address(), tmp_path / "server.key"
+    thread = threading.Thread(target=server.serve, args=(address, key, 0.2), daemon=True)
+    thread.start()
+    for _ in range(100):
+        try:
+            request("status", address, key)
+            break
+        except (ConnectionRefusedError, FileNotFoundError):
+            thread.join(0.05)
+    yield server, address, key
+    assert request("stop", address, key) == {"stopped": True}
+    thread.join(5)
+    assert not thread.is_alive()
+    assert not key.exists()
+
+def test_requests(serving):
+    server, address, key = serving
+    assert request("status", address, key)["items"] == 1
+    assert request("rebuild", address, key)["reloaded"] == 0
+    assert "error" in request("unknown", address, key)
+
+def test_silent_clients_are_dropped(serving):
+    server, address, key = serving
+    with Client(address) as silent:
+        assert request("status", address, key)["items"] == 1
+        with pytest.raises((EOFError, ConnectionError)):
+            silent.recv_bytes(64)
+            silent.recv_bytes()
+
+def test_wrong_keys_are_rejected(serving, tmp_path):
+    server, address, key = serving
+    (tmp_path / "wrong.key").write_bytes(b"wrong")
+    with pytest.raises((EOFError, ConnectionError)):
+        request("status", address, tmp_path / "wrong.key")
+    assert request("status", address, key)["items"] == 1
+
+def test_failed_rebuilds_are_answered_with_an_error(serving, monkeypatch):
+    server, address, key = serving
+    def fail():
+        raise OSError("Disk full")
+    monkeypatch.setattr(server, "rebuild", fail)
+    assert request("rebuild", address, key) == {"error": "OSError: Disk full"}
+    assert request("status", address, key)["items"] == 1
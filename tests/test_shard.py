@@ -0,0 +1,84 @@
+import pytest
+from conftest import SWORD, write_definitions
+from beetsmith.library.item import CustomItem
+from beetsmith.library.plan import BuildPlan
+from beetsmith.toolchain.backends import plan_datapack
+from beetsmith.toolchain.cli import build, main
+from beetsmith.toolchain.output import pack_files
+from beetsmith.toolchain.shard import MergeConflict, Shard, ShardManifest, merge
+
+def items() -> list[CustomItem]:
+    result = []
+    for namespace in ("alpha", "beta", "gamma", "delta", "epsilon"):
+        for index in range(4):
+            item = CustomItem(f"{namespace}:sword_{index}", f"Sword {index}", "iron_sword")
+            item.weapon(attack_damage=index + 4, attack_speed=1.6, can_sweep=True)
+            result.append(item)
+    return result
+
+def files(plan: BuildPlan) -> dict:
+    return dict(pack_files(plan_datapack(plan)))
+
+def sharded(shards: int, by="namespace") -> list[ShardManifest]:
+    manifests = [ShardManifest("beetsmith", Shard(index, shards, by), plan=BuildPlan(94)) for index in range(1, shards + 1)]
+    for item in items():
+        for manifest in manifests:
+            if manifest.shard.includes(item.id):
+                manifest.items.append(item.id)
+                manifest.plan.extend(item.lower(94))
+    return manifests
+
+@pytest.mark.parametrize("by", ["namespace", "id"])
+def test_merged_shards_equal_a_full_build(by):
+    full = BuildPlan(94)
+    for item in items():
+        full.extend(item.lower(94))
+    manifests = sharded(3, by)
+    assert sum(len(manifest.items) for manifest in manifests) == len(items())
+    assert files(merge(manifests)) == files(full)
+    assert files(merge(manifests[::-1])) == files(full)
+
+def test_manifests_round_trip(tmp_path):
+    manifest = sharded(2)[0]
+    manifest.export(tmp_path / manifest.shard.manifest_name("beetsmith"))
+    loaded = ShardManifest.load(tmp_path / "beetsmith.shard-1-of-2.json")
+    assert loaded.shard == manifest.shard
+    assert sorted(loaded.items) == sorted(manifest.items)
+    assert files(loaded.plan) == files(manifest.plan)
+
+def test_missing_shards_only_merge_partially():
+    manifests = sharded(3)[1:]
+    with pytest.raises(MergeConflict, match=r"Shards \[1\] of 3 are missing"):
+        merge(manifests)
+    assert len(merge(manifests, partial=True))
+
+def test_conflicting_creates_are_reported():
+    first, second = ShardManifest("beetsmith", Shard(1, 2), plan=BuildPlan(94)), ShardManifest("beetsmith", Shard(2, 2), plan=BuildPlan(94))
+    first.plan.add("create", "LootTable", "custom:shared", {"pools": []})
+    second.plan.add("create", "LootTable", "custom:shared", {"pools": [{"rolls": 1}]})
+    with pytest.raises(MergeConflict, match="written differently"):
+        merge([first, second])
+
+    second.plan.operations[0] = second.plan.operations[0]._replace(payload={"pools": []})
+    assert len(merge([first, second])) == 1
+
+def test_shards_are_stable():
+    assert Shard.parse("2/4") == Shard(2, 4)
+    assert [Shard(index, 4).includes("custom:sword") for index in range(1, 5)].count(True) == 1
+    with pytest.raises(ValueError):
+        Shard(5, 4)
+
+def test_sharded_cli_builds_merge_into_a_full_build(tmp_path):
+    write_definitions(tmp_path / "src", {f"{namespace}:sword": SWORD | {"id": f"{namespace}:sword"} for namespace in ("alpha", "beta", "gamma", "delta")})
+    for index in (1, 2):
+        assert main(["build", str(tmp_path / "src"), str(tmp_path / "shards"), "--jobs", "1", "--shard", f"{index}/2", "--target", "94"]) == 0
+    manifests = sorted((tmp_path / "shards").glob("*.json"))
+    assert len(manifests) == 4 # Two shards of two datapacks
+    assert main(["merge", str(tmp_path / "merged"), *map(str, manifests)]) == 0
+
+    build(tmp_path / "src", tmp_path / "full", targets=[94])
+    for name in ("beetsmith", "beetsmith_94"):
+        merged, full = tmp_path / "merged" / name, tmp_path / "full" / name
+        assert sorted(path.relative_to(merged) for path in merged.rglob("*.json")) == sorted(path.relative_to(full) for path in full.rglob("*.json"))
+        for path in full.rglob("*.json"):
+            assert (merged / path.relative_to(full)).read_bytes() == path.read_bytes()
@@ -0,0 +1,37 @@
+import os
+import json
+from conftest import SWORD, WAND, write_definitions
+from beetsmith.core.tracing import Tracer, span
+from beetsmith.toolchain.cli import build
+
+def test_spans_are_only_recorded_by_the_active_tracer():
+    tracer = Tracer()
+    with span("ignored"):
+        pass
+    with tracer.active():
+        with span("build"):
+            with span("implement", item="custom:sword"):
+                pass
+    with span("ignored"):
+        pass
+    assert [event["name"] for event in tracer.events] == ["implement", "build"]
+    implement, build = tracer.events
+    assert implement["args"] == {"item": "custom:sword"}
+    assert build["ts"] <= implement["ts"] and implement["dur"] <= build["dur"]
+
+def test_worker_processes_are_named():
+    tracer = Tracer()
+    tracer.extend([{"name": "lower_file", "ph": "X", "ts": 0, "dur": 1, "pid": -1, "tid": 1, "args": {}}])
+    with tracer.active(), span("build"):
+        pass
+    names = {event["pid"]: event["args"]["name"] for event in tracer.asDict()["traceEvents"] if event["ph"] == "M"}
+    assert names == {-1: "beetsmith worker -1", os.getpid(): "beetsmith"}
+
+def test_builds_merge_the_traces_of_their_workers(tmp_path):
+    write_definitions(tmp_path / "src", {f"custom:sword_{i}": SWORD | {"id": f"custom:sword_{i}"} for i in range(4)} | {"custom:wand": WAND})
+    build(tmp_path / "src", tmp_path / "build", jobs=2, trace=tmp_path / "trace.json")
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    lowered = [event for event in events if event["name"] == "lower_file"]
+    assert len(lowered) == 5
+    assert os.getpid() not in {event["pid"] for event in lowered}
+    assert {"build", "write"} <= {event["name"] for event in events if event["pid"] == os.getpid()}
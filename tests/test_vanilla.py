@@ -0,0 +1,39 @@
+import json
+from conftest import SWORD
+from beetsmith.library.item import CustomItem
+from beetsmith.library.vanilla import VanillaSnapshot
+
+SUMMARY = {
+    "music_disc_11": {"max_stack_size": 1, "jukebox_playable": "minecraft:11", "rarity": "uncommon", "item_model": "minecraft:music_disc_11"},
+    "stick": [{"type": "minecraft:max_stack_size", "value": 64}, {"type": "minecraft:item_model", "value": "minecraft:stick"}]
+}
+
+def test_defaults_of_both_summary_formats():
+    vanilla = VanillaSnapshot(SUMMARY)
+    assert vanilla.defaults("minecraft:music_disc_11")["minecraft:max_stack_size"] == 1
+    assert vanilla.defaults("stick") == {"minecraft:max_stack_size": 64, "minecraft:item_model": "minecraft:stick"}
+    assert vanilla.defaults("minecraft:unknown") == {}
+    assert "minecraft:stick" in vanilla and "minecraft:unknown" not in vanilla
+
+def test_only_components_changing_the_item_are_kept():
+    vanilla = VanillaSnapshot(SUMMARY)
+    components = {"minecraft:max_stack_size": 64, "minecraft:rarity": "uncommon", "!minecraft:jukebox_playable": {}, "!minecraft:tool": {}}
+    assert vanilla.strip(components, "minecraft:music_disc_11") == {"minecraft:max_stack_size": 64, "!minecraft:jukebox_playable": {}}
+    assert vanilla.strip(components, "minecraft:stick") == {"minecraft:rarity": "uncommon"}
+
+def test_items_leave_out_vanilla_defaults():
+    item = CustomItem("custom:disc", "Disc", "stick")
+    item.components.rarity = "uncommon"
+    vanilla = VanillaSnapshot(SUMMARY)
+    emitted = item.emittedComponents(vanilla=vanilla)
+    assert "minecraft:rarity" not in emitted
+    assert emitted["!minecraft:jukebox_playable"] == {}
+    assert "minecraft:rarity" in item.emittedComponents()
+
+def test_builds_strip_vanilla_defaults(project, tmp_path):
+    (tmp_path / "vanilla.json").write_text(json.dumps({"music_disc_11": {"unbreakable": {}}}))
+    with project({"custom:sword": SWORD}, vanilla="vanilla.json") as ctx:
+        entry = ctx.data.loot_tables["custom:item/sword"].data["pools"][0]["entries"][0]
+    components = entry["functions"][0]["components"]
+    assert "minecraft:unbreakable" not in components
+    assert "minecraft:custom_data" in components